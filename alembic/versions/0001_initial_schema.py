@@ -0,0 +1,73 @@
+"""Initial schema
+
+Baseline matching the models before the click rollup tables (0002) and the
+index cleanup in 0003. Databases created before migrations existed can be
+marked as migrated with ``alembic stamp 0001``.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'urls',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('original_url', sa.Text(), nullable=False),
+        sa.Column('short_code', sa.String(50), nullable=False),
+        sa.Column('custom_alias', sa.String(50), nullable=True),
+        sa.Column('title', sa.String(255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_urls_id', 'urls', ['id'])
+    op.create_index('ix_urls_short_code', 'urls', ['short_code'], unique=True)
+    op.create_index('ix_urls_custom_alias', 'urls', ['custom_alias'], unique=True)
+    op.create_index('idx_urls_short_code', 'urls', ['short_code'])
+    op.create_index('idx_urls_custom_alias', 'urls', ['custom_alias'])
+    op.create_index('idx_urls_expires_at', 'urls', ['expires_at'])
+    op.create_index('idx_urls_created_at', 'urls', ['created_at'])
+    
+    op.create_table(
+        'url_clicks',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('url_id', sa.Integer(), nullable=False),
+        sa.Column('ip_address', sa.String(45), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.Column('referer', sa.Text(), nullable=True),
+        sa.Column('country', sa.String(2), nullable=True),
+        sa.Column('city', sa.String(100), nullable=True),
+        sa.Column('clicked_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_url_clicks_id', 'url_clicks', ['id'])
+    op.create_index('ix_url_clicks_url_id', 'url_clicks', ['url_id'])
+    op.create_index('idx_clicks_url_id_clicked_at', 'url_clicks', ['url_id', 'clicked_at'])
+    op.create_index('idx_clicks_clicked_at', 'url_clicks', ['clicked_at'])
+    
+    op.create_table(
+        'counters',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('counters')
+    op.drop_table('url_clicks')
+    op.drop_table('urls')
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Click rollup tables
+
+url_click_rollups holds pre-aggregated click counts per URL, time bucket and
+dimension; url_click_visitors the distinct visitor IPs per URL and bucket that
+keep exact unique counts. Both are filled by app.workers.click_rollup.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'url_click_rollups',
+        sa.Column('url_id', sa.BigInteger(), primary_key=True),
+        sa.Column('granularity', sa.String(5), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(), primary_key=True),
+        sa.Column('dimension', sa.String(10), primary_key=True),
+        sa.Column('dimension_value', sa.String(255), primary_key=True),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.Column('unique_clicks', sa.Integer(), nullable=False),
+    )
+    
+    op.create_table(
+        'url_click_visitors',
+        sa.Column('url_id', sa.BigInteger(), primary_key=True),
+        sa.Column('granularity', sa.String(5), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(), primary_key=True),
+        sa.Column('ip_address', sa.String(45), primary_key=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('url_click_visitors')
+    op.drop_table('url_click_rollups')
\ No newline at end of file
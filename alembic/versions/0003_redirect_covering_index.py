@@ -0,0 +1,77 @@
+"""Covering redirect index, drop redundant indexes, BIGINT ids
+
+- urls.short_code had a unique index and a second plain index, custom_alias
+  likewise, and both tables indexed their primary keys twice. url_clicks.url_id
+  is the leading column of idx_clicks_url_id_clicked_at.
+- The unique short_code index now INCLUDEs the columns a redirect reads, so a
+  cache-miss redirect is an index-only scan (once VACUUM has set the
+  visibility map).
+- ids move to BIGINT, including their sequences, for the 1B URL target.
+
+The type changes rewrite urls and url_clicks under an exclusive lock; run
+this in a maintenance window on large tables.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs widened to BIGINT
+BIGINT_COLUMNS = [
+    ('urls', 'id'),
+    ('url_clicks', 'id'),
+    ('url_clicks', 'url_id'),
+    ('counters', 'value'),
+]
+
+# Sequences behind the serial ids
+SEQUENCES = ['urls_id_seq', 'url_clicks_id_seq']
+
+REDUNDANT_INDEXES = [
+    ('ix_urls_id', 'urls', ['id'], False),
+    ('idx_urls_short_code', 'urls', ['short_code'], False),
+    ('idx_urls_custom_alias', 'urls', ['custom_alias'], False),
+    ('ix_url_clicks_id', 'url_clicks', ['id'], False),
+    ('ix_url_clicks_url_id', 'url_clicks', ['url_id'], False),
+]
+
+
+def upgrade() -> None:
+    for table, column in BIGINT_COLUMNS:
+        op.alter_column(table, column, type_=sa.BigInteger(), existing_type=sa.Integer())
+    for sequence in SEQUENCES:
+        op.execute(f'ALTER SEQUENCE {sequence} AS BIGINT')
+    
+    for name, table, _, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table)
+    
+    # Build the covering index before dropping the old one so short_code
+    # stays unique throughout
+    op.create_index(
+        'ix_urls_short_code_covering', 'urls', ['short_code'],
+        unique=True, postgresql_include=['id', 'original_url', 'is_active', 'expires_at']
+    )
+    op.drop_index('ix_urls_short_code', table_name='urls')
+
+
+def downgrade() -> None:
+    op.create_index('ix_urls_short_code', 'urls', ['short_code'], unique=True)
+    op.drop_index('ix_urls_short_code_covering', table_name='urls')
+    
+    for name, table, columns, unique in REDUNDANT_INDEXES:
+        op.create_index(name, table, columns, unique=unique)
+    
+    for sequence in SEQUENCES:
+        op.execute(f'ALTER SEQUENCE {sequence} AS INTEGER')
+    for table, column in BIGINT_COLUMNS:
+        op.alter_column(table, column, type_=sa.Integer(), existing_type=sa.BigInteger())
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Range partition url_clicks by clicked_at
+
+The existing table becomes the first partition, url_clicks_legacy, covering
+everything up to the end of the current day. It is not copied, but its primary
+key index is rebuilt and attaching it scans it once, under an exclusive lock;
+run this in a maintenance window on large tables. Daily partitions follow, and
+app.workers.click_partitions keeps creating them and drops expired ones.
+
+The primary key becomes (id, clicked_at), as PostgreSQL requires the partition
+key in every unique index. idx_clicks_clicked_at is dropped: time ranges are
+served by partition pruning.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+PREMAKE_DAYS = 7
+ID_DEFAULT = sa.text("nextval('url_clicks_id_seq')")
+
+
+def click_columns():
+    return [
+        sa.Column('id', sa.BigInteger(), server_default=ID_DEFAULT, nullable=False),
+        sa.Column('url_id', sa.BigInteger(), nullable=False),
+        sa.Column('ip_address', sa.String(45), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.Column('referer', sa.Text(), nullable=True),
+        sa.Column('country', sa.String(2), nullable=True),
+        sa.Column('city', sa.String(100), nullable=True),
+        sa.Column('clicked_at', sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.rename_table('url_clicks', 'url_clicks_legacy')
+    # A partition's primary key must match its parent's
+    op.execute('CREATE UNIQUE INDEX url_clicks_legacy_pkey_new ON url_clicks_legacy (id, clicked_at)')
+    op.execute('ALTER TABLE url_clicks_legacy DROP CONSTRAINT url_clicks_pkey')
+    op.execute(
+        'ALTER TABLE url_clicks_legacy ADD CONSTRAINT url_clicks_legacy_pkey '
+        'PRIMARY KEY USING INDEX url_clicks_legacy_pkey_new'
+    )
+    op.execute('ALTER INDEX idx_clicks_url_id_clicked_at RENAME TO url_clicks_legacy_url_id_clicked_at_idx')
+    op.drop_index('idx_clicks_clicked_at', table_name='url_clicks_legacy')
+    op.alter_column('url_clicks_legacy', 'id', server_default=None)
+    
+    op.create_table(
+        'url_clicks',
+        *click_columns(),
+        sa.PrimaryKeyConstraint('id', 'clicked_at', name='url_clicks_pkey'),
+        postgresql_partition_by='RANGE (clicked_at)'
+    )
+    op.execute('ALTER SEQUENCE url_clicks_id_seq OWNED BY url_clicks.id')
+    # The matching legacy indexes are attached rather than rebuilt
+    op.create_index('idx_clicks_url_id_clicked_at', 'url_clicks', ['url_id', 'clicked_at'])
+    
+    # clicked_at is naive UTC
+    latest = op.get_bind().execute(sa.text(
+        "SELECT greatest(max(clicked_at), now() AT TIME ZONE 'UTC') FROM url_clicks_legacy"
+    )).scalar()
+    cutover = latest.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    op.execute(
+        f"ALTER TABLE url_clicks ATTACH PARTITION url_clicks_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')"
+    )
+    
+    start = cutover
+    while start <= datetime.utcnow() + timedelta(days=PREMAKE_DAYS):
+        end = start + timedelta(days=1)
+        op.execute(
+            f"CREATE TABLE url_clicks_p{start:%Y%m%d} PARTITION OF url_clicks "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+
+def downgrade() -> None:
+    columns = click_columns()
+    op.create_table(
+        'url_clicks_unpartitioned',
+        *columns,
+        sa.PrimaryKeyConstraint('id', name='url_clicks_unpartitioned_pkey')
+    )
+    names = ', '.join(column.name for column in columns)
+    op.execute(f'INSERT INTO url_clicks_unpartitioned ({names}) SELECT {names} FROM url_clicks')
+    # Move the sequence off the partitioned table before dropping it
+    op.execute('ALTER SEQUENCE url_clicks_id_seq OWNED BY url_clicks_unpartitioned.id')
+    op.drop_table('url_clicks')
+    
+    op.rename_table('url_clicks_unpartitioned', 'url_clicks')
+    op.execute('ALTER TABLE url_clicks RENAME CONSTRAINT url_clicks_unpartitioned_pkey TO url_clicks_pkey')
+    op.create_index('idx_clicks_url_id_clicked_at', 'url_clicks', ['url_id', 'clicked_at'])
+    op.create_index('idx_clicks_clicked_at', 'url_clicks', ['clicked_at'])
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Soft-deleted URLs
+
+Adds urls.deleted_at. The unique short_code and custom_alias indexes become
+partial (live URLs only), so redirects stay index-only scans and a deleted
+alias can be reused before the purger removes the old row. Each replacement
+index is built before the old one is dropped.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text('deleted_at IS NULL')
+REDIRECT_COLUMNS = ['id', 'original_url', 'is_active', 'expires_at']
+
+
+def upgrade() -> None:
+    op.add_column('urls', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    
+    op.create_index(
+        'ix_urls_short_code_live', 'urls', ['short_code'], unique=True,
+        postgresql_include=REDIRECT_COLUMNS, postgresql_where=LIVE
+    )
+    op.drop_index('ix_urls_short_code_covering', table_name='urls')
+    op.execute('ALTER INDEX ix_urls_short_code_live RENAME TO ix_urls_short_code_covering')
+    
+    op.create_index('ix_urls_custom_alias_live', 'urls', ['custom_alias'], unique=True, postgresql_where=LIVE)
+    op.drop_index('ix_urls_custom_alias', table_name='urls')
+    op.execute('ALTER INDEX ix_urls_custom_alias_live RENAME TO ix_urls_custom_alias')
+    
+    op.create_index(
+        'idx_urls_deleted_at', 'urls', ['deleted_at'],
+        postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    # Deleted URLs would break the full unique indexes; run the purger first
+    # or their clicks are left behind
+    op.execute('DELETE FROM urls WHERE deleted_at IS NOT NULL')
+    op.drop_index('idx_urls_deleted_at', table_name='urls')
+    
+    op.create_index('ix_urls_custom_alias_all', 'urls', ['custom_alias'], unique=True)
+    op.drop_index('ix_urls_custom_alias', table_name='urls')
+    op.execute('ALTER INDEX ix_urls_custom_alias_all RENAME TO ix_urls_custom_alias')
+    
+    op.create_index(
+        'ix_urls_short_code_all', 'urls', ['short_code'], unique=True,
+        postgresql_include=REDIRECT_COLUMNS
+    )
+    op.drop_index('ix_urls_short_code_covering', table_name='urls')
+    op.execute('ALTER INDEX ix_urls_short_code_all RENAME TO ix_urls_short_code_covering')
+    
+    op.drop_column('urls', 'deleted_at')
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""Index url_clicks by (url_id, id)
+
+Analytics reads add a URL's clicks past the rollup watermark (url_id = ? AND
+id > watermark) to its rollups. That predicate can't prune partitions, so
+without this index every partition reads all of the URL's clicks to find the
+few past the watermark. The index is created on each partition under a lock
+that blocks click inserts; run this in a maintenance window on large tables.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_clicks_url_id_id', 'url_clicks', ['url_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_clicks_url_id_id', table_name='url_clicks')
\ No newline at end of file
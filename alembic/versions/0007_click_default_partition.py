@@ -0,0 +1,29 @@
+"""DEFAULT partition for url_clicks
+
+Clicks whose day has no partition yet (partition maintenance fell behind, or
+clocks far ahead) land in url_clicks_default instead of failing the insert.
+ClickPartitionManager moves them out when it creates the partition for their
+range.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE TABLE url_clicks_default PARTITION OF url_clicks DEFAULT')
+
+
+def downgrade() -> None:
+    # Clicks still in it are dropped with it; run partition maintenance first
+    op.drop_table('url_clicks_default')
\ No newline at end of file
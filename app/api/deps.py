@@ -1,12 +1,25 @@
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.db.redis_client import get_redis_client
+from typing import Optional
+from app.db.database import get_db, get_read_db, get_async_db, get_async_read_db
+from app.db.redis_client import get_redis_client, get_async_redis_client
 from app.services.url_service import URLService
+from app.services.async_url_service import AsyncURLService
+from app.cache.local import get_local_cache
 
 
 def get_url_service(
     db: Session = Depends(get_db),
+    read_db: Optional[Session] = Depends(get_read_db),
     redis_client = Depends(get_redis_client)
 ) -> URLService:
-    return URLService(db, redis_client)
\ No newline at end of file
+    return URLService(db, redis_client, local_cache=get_local_cache(), read_db=read_db)
+
+
+def get_async_url_service(
+    db: AsyncSession = Depends(get_async_db),
+    read_db: Optional[AsyncSession] = Depends(get_async_read_db),
+    redis_client = Depends(get_async_redis_client)
+) -> AsyncURLService:
+    return AsyncURLService(db, redis_client, local_cache=get_local_cache(), read_db=read_db)
\ No newline at end of file
@@ -1,16 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import List
-from app.schemas.url import URLCreate, URLResponse, URLUpdate, URLClickCreate
+from app.schemas.url import (
+    URLCreate, URLResponse, URLUpdate, URLClickCreate,
+    URLBulkCreate, URLBulkCreateResponse, URLBulkItemResult
+)
 from app.services.url_service import URLService
-from app.api.deps import get_url_service
+from app.services.async_url_service import AsyncURLService
+from app.api.deps import get_url_service, get_async_url_service
 from app.core.config import settings
+from app.services.click_writer import get_click_writer
+from app.services.click_stream import publish_click_async
 
 router = APIRouter()
 
 
 @router.post("/", response_model=URLResponse)
-async def create_short_url(
+def create_short_url(
     url_data: URLCreate,
     url_service: URLService = Depends(get_url_service)
 ):
@@ -39,14 +46,69 @@ async def create_short_url(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=URLBulkCreateResponse)
+def create_short_urls_bulk(
+    bulk_data: URLBulkCreate,
+    url_service: URLService = Depends(get_url_service)
+):
+    """Create many shortened URLs in one request, reporting failures per item"""
+    if len(bulk_data.urls) > settings.bulk_create_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.bulk_create_max_items} URLs per request"
+        )
+    
+    results: List[URLBulkItemResult] = [None] * len(bulk_data.urls)
+    
+    # Validate each item on its own so one bad item doesn't fail the batch
+    valid_items = []
+    for index, item in enumerate(bulk_data.urls):
+        try:
+            valid_items.append((index, URLCreate.model_validate(item)))
+        except ValidationError as e:
+            results[index] = URLBulkItemResult(index=index, success=False, error=e.errors()[0]["msg"])
+    
+    created = url_service.create_urls([url_data for _, url_data in valid_items])
+    
+    for (index, _), (url, error) in zip(valid_items, created):
+        if error:
+            results[index] = URLBulkItemResult(index=index, success=False, error=error)
+            continue
+        results[index] = URLBulkItemResult(
+            index=index,
+            success=True,
+            url=URLResponse(
+                id=url.id,
+                original_url=url.original_url,
+                short_code=url.short_code,
+                short_url=f"{settings.base_url}/{url.short_code}",
+                custom_alias=url.custom_alias,
+                title=url.title,
+                description=url.description,
+                is_active=url.is_active,
+                expires_at=url.expires_at,
+                created_at=url.created_at,
+                updated_at=url.updated_at,
+                click_count=0
+            )
+        )
+    
+    created_count = sum(1 for result in results if result.success)
+    return URLBulkCreateResponse(
+        created=created_count,
+        failed=len(results) - created_count,
+        results=results
+    )
+
+
 @router.get("/{short_code}")
 async def redirect_to_original_url(
     short_code: str,
     request: Request,
-    url_service: URLService = Depends(get_url_service)
+    url_service: AsyncURLService = Depends(get_async_url_service)
 ):
     """Redirect to the original URL"""
-    url = url_service.get_url_by_short_code(short_code)
+    url = await url_service.get_redirect_target(short_code)
     
     if not url:
         raise HTTPException(status_code=404, detail="URL not found")
@@ -63,7 +125,12 @@ async def redirect_to_original_url(
         user_agent=request.headers.get("user-agent"),
         referer=request.headers.get("referer")
     )
-    url_service.record_click(url.id, click_data)
+    if settings.click_recording_mode == "buffered":
+        await get_click_writer().submit(url.id, click_data)
+    elif settings.click_recording_mode == "stream":
+        await publish_click_async(url_service.redis, url.id, click_data)
+    else:
+        await url_service.record_click(url.id, click_data)
     
     # Redirect to original URL
     from fastapi.responses import RedirectResponse
@@ -73,17 +140,16 @@ async def redirect_to_original_url(
 @router.get("/{short_code}/info", response_model=URLResponse)
 async def get_url_info(
     short_code: str,
-    url_service: URLService = Depends(get_url_service)
+    url_service: AsyncURLService = Depends(get_async_url_service)
 ):
     """Get information about a shortened URL"""
-    url = url_service.get_url_by_short_code(short_code)
+    url = await url_service.get_url_by_short_code(short_code)
     
     if not url:
         raise HTTPException(status_code=404, detail="URL not found")
     
     # Get click count
-    click_count = url_service.redis.get(f"clicks:{url.id}")
-    click_count = int(click_count) if click_count else 0
+    click_count = await url_service.get_click_count(url.id)
     
     short_url = f"{settings.base_url}/{url.short_code}"
     
@@ -104,7 +170,7 @@ async def get_url_info(
 
 
 @router.put("/{url_id}", response_model=URLResponse)
-async def update_url(
+def update_url(
     url_id: int,
     url_data: URLUpdate,
     url_service: URLService = Depends(get_url_service)
@@ -134,7 +200,7 @@ async def update_url(
 
 
 @router.delete("/{url_id}")
-async def delete_url(
+def delete_url(
     url_id: int,
     url_service: URLService = Depends(get_url_service)
 ):
@@ -148,7 +214,7 @@ async def delete_url(
 
 
 @router.get("/{url_id}/analytics")
-async def get_url_analytics(
+def get_url_analytics(
     url_id: int,
     url_service: URLService = Depends(get_url_service)
 ):
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Optional
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+from app.cache.local import LocalCache
+from app.db.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+
+def publish_invalidation(redis_client: RedisClient, short_code: str):
+    """Tell every worker to drop a short code from its local cache"""
+    try:
+        redis_client.publish(settings.cache_invalidation_channel, short_code)
+    except redis.RedisError:
+        # Other workers fall back to the local cache TTL
+        logger.warning("Failed to publish cache invalidation for %s", short_code)
+
+
+class InvalidationSubscriber:
+    """
+    Background listener that applies cross-worker cache invalidations.
+    
+    Redis pub/sub is fire-and-forget, so anything published while this worker
+    is not subscribed is lost. To keep staleness bounded the local cache is
+    suspended (bypassed) whenever the subscription is down and cleared on every
+    (re)subscribe. While connected, staleness is bounded by pub/sub delivery
+    latency; in every case it is bounded by the local cache TTL.
+    """
+    
+    def __init__(
+        self,
+        local_cache: LocalCache,
+        redis_url: Optional[str] = None,
+        channel: Optional[str] = None
+    ):
+        self.local_cache = local_cache
+        self.redis_url = redis_url or settings.redis_url
+        self.channel = channel or settings.cache_invalidation_channel
+        self.connected = False
+        
+        # Counters
+        self.invalidations = 0
+        self.reconnects = 0
+    
+    async def run(self):
+        """Subscribe and apply invalidations until cancelled, reconnecting on errors"""
+        delay = settings.cache_invalidation_reconnect_min_delay
+        
+        while True:
+            client = aioredis.from_url(self.redis_url, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                
+                # Anything published before this point may have been missed
+                self.local_cache.clear()
+                self.local_cache.suspended = False
+                self.connected = True
+                delay = settings.cache_invalidation_reconnect_min_delay
+                
+                await self._listen(pubsub)
+            except asyncio.CancelledError:
+                raise
+            except (redis.RedisError, OSError) as e:
+                logger.warning("Cache invalidation subscription lost: %s", e)
+            finally:
+                self._disconnected()
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except (redis.RedisError, OSError):
+                    pass
+            
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.cache_invalidation_reconnect_max_delay)
+    
+    async def _listen(self, pubsub):
+        idle_timeout = settings.cache_invalidation_ping_interval
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=idle_timeout
+            )
+            if message is None:
+                # Quiet channel: make sure the connection is still alive
+                await pubsub.ping()
+                continue
+            if message["type"] == "message":
+                self.local_cache.delete(message["data"])
+                self.invalidations += 1
+    
+    def _disconnected(self):
+        self.connected = False
+        self.local_cache.suspended = True
+        self.local_cache.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "invalidations": self.invalidations,
+            "reconnects": self.reconnects
+        }
\ No newline at end of file
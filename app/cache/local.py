@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from app.core.config import settings
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL"""
+    
+    def __init__(self, max_size: int = 10000, ttl: float = 5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Bypass the cache entirely, e.g. while invalidations can't be received
+        self.suspended = False
+        
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss or an expired entry"""
+        if self.suspended:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        if self.suspended:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> dict:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "suspended": self.suspended,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+# Per-worker cache for redirect lookups
+_local_cache: Optional[LocalCache] = None
+
+
+def get_local_cache() -> Optional[LocalCache]:
+    """Get the per-worker URL cache, or None when local caching is disabled"""
+    global _local_cache
+    if not settings.local_cache_enabled:
+        return None
+    if _local_cache is None:
+        _local_cache = LocalCache(
+            max_size=settings.local_cache_max_size,
+            ttl=settings.local_cache_ttl
+        )
+    return _local_cache
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Storage layouts for the redirect cache.
+
+"keys" stores each entry under its own key, url:{short_code}, with a Redis
+TTL. "buckets" packs entries into small hashes, urlb:{n}, picked by a hash of
+the code, so Redis keeps them in its compact listpack encoding instead of
+paying 50-90 bytes of per-key overhead for each URL. Size the bucket count so
+buckets hold about 100 entries, and raise hash-max-listpack-value to fit them
+(256 covers most URLs); a bucket holding a longer entry falls back to the
+regular hash encoding.
+
+Hash fields don't expire on their own, so a bucketed value starts with its
+deadline (u32 epoch seconds). Expired fields read as misses and every write
+sweeps them from its bucket; a bucket nothing has been written to for the
+longest entry TTL expires whole.
+"""
+import struct
+import time
+import zlib
+from typing import List, Optional, Tuple, Union
+from app.core.config import settings
+
+LAYOUTS = ("keys", "buckets")
+
+_DEADLINE = struct.Struct(">I")
+
+# Drop expired fields from the bucket, then write the entry and push the
+# bucket's own expiry past it
+SET_SCRIPT = """
+local now = tonumber(ARGV[3])
+local entries = redis.call('HGETALL', KEYS[1])
+for i = 1, #entries, 2 do
+    local b1, b2, b3, b4 = string.byte(entries[i + 1], 1, 4)
+    if b4 == nil or ((b1 * 256 + b2) * 256 + b3) * 256 + b4 <= now then
+        redis.call('HDEL', KEYS[1], entries[i])
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# Rewrite an entry with a new deadline only if it still holds the value that
+# was read, so a renewal can't resurrect a deleted or updated link
+RENEW_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current or string.sub(current, 5) ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[4]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+Value = Union[str, bytes]
+
+
+def pack_entry(value: Value, ttl: int, now: float) -> bytes:
+    """Prefix a bucketed value with its deadline"""
+    if isinstance(value, str):
+        value = value.encode()
+    return _DEADLINE.pack(int(now) + ttl) + value
+
+
+def unpack_entry(data: Optional[bytes], now: float) -> Tuple[Optional[bytes], int]:
+    """Value and remaining TTL in milliseconds, or (None, -2) if missing or expired"""
+    if data is None or len(data) < _DEADLINE.size:
+        return None, -2
+    ttl = int((_DEADLINE.unpack_from(data)[0] - now) * 1000)
+    if ttl <= 0:
+        return None, -2
+    return data[_DEADLINE.size:], ttl
+
+
+class _RedirectCacheLayout:
+    """Key naming and settings shared by the sync and async caches"""
+    
+    def __init__(
+        self,
+        redis_client,
+        layout: str = "keys",
+        buckets: int = 4_194_304,
+        max_ttl: int = 86400,
+        key_prefix: str = "url"
+    ):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown redirect cache layout: {layout}")
+        self.redis = redis_client
+        self.layout = layout
+        self.buckets = buckets
+        self.max_ttl = max_ttl
+        self.key_prefix = key_prefix
+        self._set_script = (
+            redis_client.redis_client.register_script(SET_SCRIPT) if layout == "buckets" else None
+        )
+        self._renew_script = (
+            redis_client.redis_client.register_script(RENEW_SCRIPT) if layout == "buckets" else None
+        )
+    
+    @property
+    def bucketed(self) -> bool:
+        return self.layout == "buckets"
+    
+    def key(self, short_code: str) -> str:
+        """The Redis key holding a code's entry"""
+        if self.bucketed:
+            return f"{self.key_prefix}b:{zlib.crc32(short_code.encode()) % self.buckets}"
+        return f"{self.key_prefix}:{short_code}"
+    
+    def _set_args(self, short_code: str, value: Value, ttl: int) -> dict:
+        now = time.time()
+        return {
+            "keys": [self.key(short_code)],
+            "args": [short_code, pack_entry(value, ttl, now), int(now), max(ttl, self.max_ttl)]
+        }
+
+
+class RedirectCache(_RedirectCacheLayout):
+    """Redirect cache entries over a RedisClient"""
+    
+    def get(self, short_code: str) -> Optional[bytes]:
+        """Undecoded entry, or None on a miss"""
+        if not self.bucketed:
+            return self.redis.get_bytes(self.key(short_code))
+        return unpack_entry(self.redis.hget_bytes(self.key(short_code), short_code), time.time())[0]
+    
+    def set(self, short_code: str, value: Value, ttl: int):
+        if not self.bucketed:
+            self.redis.set(self.key(short_code), value, ex=ttl)
+        else:
+            self._set_script(**self._set_args(short_code, value, ttl))
+    
+    def set_many(self, entries: List[Tuple[str, Value, int]]):
+        """Write (short_code, value, ttl) entries in one pipeline"""
+        pipe = self.redis.pipeline()
+        for short_code, value, ttl in entries:
+            if not self.bucketed:
+                pipe.set(self.key(short_code), value, ex=ttl)
+            else:
+                self._set_script(client=pipe, **self._set_args(short_code, value, ttl))
+        pipe.execute()
+    
+    def delete(self, short_code: str):
+        if not self.bucketed:
+            self.redis.delete(self.key(short_code))
+        else:
+            self.redis.hdel(self.key(short_code), short_code)
+
+
+class AsyncRedirectCache(_RedirectCacheLayout):
+    """Redirect cache entries over an AsyncRedisClient"""
+    
+    async def get(self, short_code: str) -> Optional[bytes]:
+        """Undecoded entry, or None on a miss"""
+        if not self.bucketed:
+            return await self.redis.get_bytes(self.key(short_code))
+        return unpack_entry(await self.redis.hget_bytes(self.key(short_code), short_code), time.time())[0]
+    
+    async def get_with_ttl(self, short_code: str) -> Tuple[Optional[bytes], int]:
+        """Undecoded entry and remaining TTL in milliseconds, in one round trip"""
+        if not self.bucketed:
+            return await self.redis.get_with_ttl(self.key(short_code))
+        return unpack_entry(await self.redis.hget_bytes(self.key(short_code), short_code), time.time())
+    
+    async def set(self, short_code: str, value: Value, ttl: int):
+        if not self.bucketed:
+            await self.redis.set(self.key(short_code), value, ex=ttl)
+        else:
+            await self._set_script(**self._set_args(short_code, value, ttl))
+    
+    async def renew(self, short_code: str, value: bytes, ttl: int):
+        """Extend an entry's TTL; bucketed entries are rewritten unless changed since read"""
+        if not self.bucketed:
+            await self.redis.expire(self.key(short_code), ttl)
+        else:
+            now = time.time()
+            await self._renew_script(
+                keys=[self.key(short_code)],
+                args=[short_code, value, pack_entry(value, ttl, now), max(ttl, self.max_ttl)]
+            )
+    
+    async def delete(self, short_code: str):
+        if not self.bucketed:
+            await self.redis.delete(self.key(short_code))
+        else:
+            await self.redis.hdel(self.key(short_code), short_code)
+
+
+def redirect_cache_options() -> dict:
+    """RedirectCache/AsyncRedirectCache arguments from settings"""
+    return {
+        "layout": settings.redirect_cache_layout,
+        "buckets": settings.redirect_cache_buckets,
+        "max_ttl": settings.cache_ttl_max
+    }
\ No newline at end of file
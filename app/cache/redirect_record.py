@@ -0,0 +1,76 @@
+"""
+Compact binary encoding of redirect cache entries.
+
+An entry holds only what a redirect needs, big-endian:
+
+    version  u8     RECORD_VERSION
+    flags    u8     bit 0: active, bit 1: has an expiry
+    id       u64
+    expires  i64    microseconds since the epoch (naive UTC), if flagged
+    target   utf-8  the original URL, to the end
+
+The short code is the cache key, so it isn't stored. Entries in any other
+format (including the JSON of earlier releases) decode as None and are
+reloaded, so the format can change without flushing the cache.
+"""
+import struct
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from app.cache.short_code_filter import NOT_FOUND
+
+RECORD_VERSION = 1
+
+# NOT_FOUND as read back from Redis without decoding
+NOT_FOUND_BYTES = NOT_FOUND.encode()
+
+ACTIVE = 0x01
+HAS_EXPIRY = 0x02
+
+_HEADER = struct.Struct(">BBQ")
+_EXPIRY = struct.Struct(">q")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class RedirectRecord(NamedTuple):
+    """What a redirect needs; stands in for a URL on the redirect path"""
+    id: int
+    short_code: str
+    original_url: str
+    is_active: bool
+    expires_at: Optional[datetime]
+
+
+def to_record(url) -> RedirectRecord:
+    """Copy a URL's redirect fields into a record that outlives its session"""
+    return RedirectRecord(url.id, url.short_code, url.original_url, url.is_active, url.expires_at)
+
+
+def encode_record(url) -> bytes:
+    """Encode a URL or RedirectRecord for the redirect cache"""
+    flags = ACTIVE if url.is_active else 0
+    if url.expires_at is None:
+        return _HEADER.pack(RECORD_VERSION, flags, url.id) + url.original_url.encode()
+    expires = (url.expires_at - _EPOCH) // _MICROSECOND
+    return (
+        _HEADER.pack(RECORD_VERSION, flags | HAS_EXPIRY, url.id)
+        + _EXPIRY.pack(expires)
+        + url.original_url.encode()
+    )
+
+
+def decode_record(short_code: str, data: bytes) -> Optional[RedirectRecord]:
+    """Decode a cache entry, or None if it isn't a record this version reads"""
+    if not data or data[0] != RECORD_VERSION:
+        return None
+    try:
+        _, flags, url_id = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        expires_at = None
+        if flags & HAS_EXPIRY:
+            expires_at = _EPOCH + _EXPIRY.unpack_from(data, offset)[0] * _MICROSECOND
+            offset += _EXPIRY.size
+        original_url = data[offset:].decode()
+    except (struct.error, UnicodeDecodeError):
+        return None
+    return RedirectRecord(url_id, short_code, original_url, bool(flags & ACTIVE), expires_at)
\ No newline at end of file
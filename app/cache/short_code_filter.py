@@ -0,0 +1,187 @@
+"""
+Bloom filter over existing short codes, kept in Redis.
+
+Lookups for codes the filter has never seen are answered as misses without
+querying the database. The filter is a plain Redis bitmap (no modules needed),
+built by app.workers.short_code_filter and extended as URLs are created.
+Deleted codes stay set until the next rebuild and fall through to the
+database (then the negative cache) like any other false positive.
+"""
+import hashlib
+import math
+from typing import Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.redis_client import RedisClient, get_redis_client
+from app.models.url import URL
+
+# Cached in place of a URL payload for codes known not to exist
+NOT_FOUND = "-"
+
+# Redis strings hold at most 2**32 bits
+MAX_BITS = 2 ** 32
+
+# Set the given bit offsets in each key that exists. A filter that hasn't been
+# built must stay missing, since an empty bitmap would reject every code.
+ADD_SCRIPT = """
+local added = 0
+for i = 1, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        for j = 1, #ARGV do
+            redis.call('SETBIT', KEYS[i], ARGV[j], 1)
+        end
+        added = added + 1
+    end
+end
+return added
+"""
+
+ADD_CHUNK = 1000
+
+
+def filter_size(capacity: int, error_rate: float) -> tuple:
+    """Optimal (bits, hash count) for `capacity` items at `error_rate`"""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits = min(bits, MAX_BITS)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class ShortCodeFilter:
+    """
+    Bloom filter of short codes (custom aliases are short codes too).
+    
+    The key name encodes the filter's geometry, so changing its capacity or
+    error rate points at a filter that doesn't exist yet instead of
+    misreading an old one. Until it is built, every code is a possible hit.
+    """
+    
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        capacity: int = 100_000_000,
+        error_rate: float = 0.01,
+        key_prefix: str = "shortcodes:bloom"
+    ):
+        self.redis = redis_client
+        self.bits, self.hashes = filter_size(capacity, error_rate)
+        self.key = f"{key_prefix}:{self.bits}:{self.hashes}"
+        self.staging_key = f"{self.key}:staging"
+        self.lock_key = f"{self.key}:lock"
+        self._add_script = redis_client.redis_client.register_script(ADD_SCRIPT)
+        
+        # Counters
+        self.checks = 0
+        self.rejected = 0
+        self.unavailable = 0
+    
+    def offsets(self, short_code: str) -> List[int]:
+        """Bit positions for a code, by double hashing"""
+        digest = hashlib.blake2b(short_code.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+    
+    def contains_commands(self, pipe, short_code: str):
+        """Queue a membership check on a (sync or asyncio) pipeline"""
+        args = []
+        for offset in self.offsets(short_code):
+            args.extend(("GET", "u1", offset))
+        pipe.exists(self.key)
+        pipe.execute_command("BITFIELD", self.key, *args)
+    
+    def contains_result(self, exists: int, bits: List[int]) -> bool:
+        """False only if the code is definitely absent"""
+        self.checks += 1
+        if not exists:
+            self.unavailable += 1
+            return True
+        if all(bits):
+            return True
+        self.rejected += 1
+        return False
+    
+    def might_contain(self, short_code: str) -> bool:
+        pipe = self.redis.pipeline()
+        self.contains_commands(pipe, short_code)
+        return self.contains_result(*pipe.execute())
+    
+    def might_contain_many(self, short_codes: List[str]) -> List[bool]:
+        """Check many codes in one round trip"""
+        pipe = self.redis.pipeline()
+        for short_code in short_codes:
+            self.contains_commands(pipe, short_code)
+        results = pipe.execute()
+        return [
+            self.contains_result(results[i], results[i + 1])
+            for i in range(0, len(results), 2)
+        ]
+    
+    def add(self, short_codes: Iterable[str]):
+        """Add codes to the filter, and to one being rebuilt"""
+        self._add(list(short_codes), [self.key, self.staging_key])
+    
+    def rebuild(self, db: Session, batch_size: int = 10000) -> Optional[int]:
+        """
+        Rebuild the filter from the live URLs; returns codes added, or None
+        if another rebuild holds the lock.
+        
+        The staging bitmap is created before the scan starts, and add() writes
+        to it from then on, so URLs created during the scan are never lost.
+        """
+        if not self.redis.redis_client.set(self.lock_key, "1", nx=True, ex=3600):
+            return None
+        try:
+            self.redis.delete(self.staging_key)
+            self.redis.redis_client.setbit(self.staging_key, self.bits - 1, 0)
+            
+            added = 0
+            rows = db.execute(
+                select(URL.short_code).where(URL.deleted_at.is_(None)).execution_options(yield_per=batch_size)
+            )
+            for batch in rows.partitions():
+                self._add([row.short_code for row in batch], [self.staging_key])
+                added += len(batch)
+            
+            self.redis.redis_client.rename(self.staging_key, self.key)
+            return added
+        finally:
+            self.redis.delete(self.lock_key)
+    
+    def _add(self, short_codes: List[str], keys: List[str]):
+        for start in range(0, len(short_codes), ADD_CHUNK):
+            offsets = [
+                offset
+                for short_code in short_codes[start:start + ADD_CHUNK]
+                for offset in self.offsets(short_code)
+            ]
+            self._add_script(keys=keys, args=offsets)
+    
+    def stats(self) -> dict:
+        """Get filter geometry and this worker's counters"""
+        return {
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "unavailable": self.unavailable,
+        }
+
+
+# Global filter instance
+_short_code_filter: Optional[ShortCodeFilter] = None
+
+
+def get_short_code_filter() -> Optional[ShortCodeFilter]:
+    """Get the short code filter, or None when disabled"""
+    global _short_code_filter
+    if not settings.short_code_filter_enabled:
+        return None
+    if _short_code_filter is None:
+        _short_code_filter = ShortCodeFilter(
+            get_redis_client(),
+            capacity=settings.short_code_filter_capacity,
+            error_rate=settings.short_code_filter_error_rate
+        )
+    return _short_code_filter
\ No newline at end of file
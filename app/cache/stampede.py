@@ -0,0 +1,132 @@
+"""
+Cache stampede protection for the redirect lookup.
+
+Three layers keep a hot key's expiry from turning into a burst of identical
+database queries:
+
+- single-flight: concurrent misses for one key in a worker share one load;
+- a short Redis lock: one worker loads while the others wait for its result;
+- probabilistic early refresh (XFetch): a request occasionally reloads a hot
+  entry shortly before it expires, so it never expires under load.
+"""
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.core.config import settings
+
+# Weight of the newest sample in the load time average
+LOAD_TIME_SMOOTHING = 0.1
+
+
+class StampedeGuard:
+    """Per-worker single-flight table, lock settings and XFetch state"""
+    
+    def __init__(
+        self,
+        lock_ttl: float = 2.0,
+        lock_wait: float = 1.0,
+        lock_poll_interval: float = 0.02,
+        early_refresh_beta: float = 1.0
+    ):
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self.lock_poll_interval = lock_poll_interval
+        self.early_refresh_beta = early_refresh_beta
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        # Moving average of how long a load takes, XFetch's "delta"
+        self.load_seconds = 0.005
+        
+        # Counters
+        self.loads = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+        self.lock_wait_timeouts = 0
+        self.early_refreshes = 0
+    
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Run load() once for all concurrent callers with the same key"""
+        while True:
+            future = self._flights.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The loader's request went away; take over unless it's us
+                if not future.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; don't warn when there are none
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+    
+    def record_load(self, seconds: float):
+        self.loads += 1
+        self.load_seconds += LOAD_TIME_SMOOTHING * (seconds - self.load_seconds)
+    
+    def should_refresh_early(self, ttl_seconds: float) -> bool:
+        """XFetch: refresh with a probability that rises as expiry approaches"""
+        if self.early_refresh_beta <= 0 or ttl_seconds < 0:
+            return False
+        gap = -self.load_seconds * self.early_refresh_beta * math.log(1.0 - random.random())
+        if gap >= ttl_seconds:
+            self.early_refreshes += 1
+            return True
+        return False
+    
+    async def wait_for(self, fetch: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Poll fetch() while another worker holds the lock; None on timeout"""
+        self.lock_waits += 1
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            result = await fetch()
+            if result is not None:
+                return result
+        self.lock_wait_timeouts += 1
+        return None
+    
+    def stats(self) -> dict:
+        """Get load and coalescing counters"""
+        return {
+            "in_flight": len(self._flights),
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "lock_waits": self.lock_waits,
+            "lock_wait_timeouts": self.lock_wait_timeouts,
+            "early_refreshes": self.early_refreshes,
+            "avg_load_ms": self.load_seconds * 1000
+        }
+
+
+# Global guard instance
+_stampede_guard: Optional[StampedeGuard] = None
+
+
+def get_stampede_guard() -> StampedeGuard:
+    """Get this worker's stampede guard"""
+    global _stampede_guard
+    if _stampede_guard is None:
+        _stampede_guard = StampedeGuard(
+            lock_ttl=settings.cache_lock_ttl,
+            lock_wait=settings.cache_lock_wait,
+            early_refresh_beta=settings.cache_early_refresh_beta
+        )
+    return _stampede_guard
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Adaptive TTLs for redirect cache entries.
+
+Each recent hit on a link buys its Redis entry another `min_ttl` seconds, up
+to `max_ttl`: a long-tail link clicked once is gone in minutes, while a hot
+one stays cached for hours and is renewed as it is read (sliding expiry).
+TTLs never run past a link's expires_at.
+
+Hits are counted per worker over the last one to two `hit_window`s, so counts
+(and `renew_hits`) are per worker rather than fleet-wide.
+"""
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from app.core.config import settings
+from app.cache.redirect_record import NOT_FOUND_BYTES
+
+
+class CacheTTLPolicy:
+    """Per-worker hit counts and the TTLs they earn"""
+    
+    def __init__(
+        self,
+        min_ttl: int = 300,
+        max_ttl: int = 86400,
+        hit_window: float = 60.0,
+        renew_hits: int = 10,
+        max_tracked: int = 100_000
+    ):
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.hit_window = hit_window
+        self.renew_hits = renew_hits
+        self.max_tracked = max_tracked
+        self._current: Dict[str, int] = {}
+        self._previous: Dict[str, int] = {}
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+        
+        # Counters
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.renewals = 0
+        self.untracked = 0
+    
+    def record_lookup(self, short_code: str, cached: Optional[bytes]):
+        """Count a Redis lookup and, if it found the link, a hit on it"""
+        if cached is None:
+            self.misses += 1
+            return
+        if cached == NOT_FOUND_BYTES:
+            self.negative_hits += 1
+            return
+        self.hits += 1
+        self.record_hit(short_code)
+    
+    def record_hit(self, short_code: str):
+        with self._lock:
+            self._rotate()
+            if short_code not in self._current and len(self._current) >= self.max_tracked:
+                # Too many distinct codes this window; the rest count as cold
+                self.untracked += 1
+                return
+            self._current[short_code] = self._current.get(short_code, 0) + 1
+    
+    def recent_hits(self, short_code: str) -> int:
+        with self._lock:
+            self._rotate()
+            return self._current.get(short_code, 0) + self._previous.get(short_code, 0)
+    
+    def ttl_for(self, short_code: str, expires_at: Optional[datetime] = None) -> int:
+        """Seconds to cache a link for, given its recent hits and expiry"""
+        ttl = min(self.max_ttl, self.min_ttl * (1 + self.recent_hits(short_code)))
+        if expires_at is not None:
+            remaining = (expires_at - datetime.utcnow()).total_seconds()
+            # Expired links are still cached, briefly, to answer 410s
+            ttl = min(ttl, math.ceil(remaining)) if remaining > 0 else self.min_ttl
+        return max(1, ttl)
+    
+    def renewal_ttl(
+        self,
+        short_code: str,
+        remaining_seconds: float,
+        expires_at: Optional[datetime] = None
+    ) -> Optional[int]:
+        """New TTL for a hot entry past half its TTL, or None to leave it be"""
+        if remaining_seconds <= 0 or self.recent_hits(short_code) < self.renew_hits:
+            return None
+        ttl = self.ttl_for(short_code, expires_at)
+        if remaining_seconds >= ttl / 2:
+            return None
+        self.renewals += 1
+        return ttl
+    
+    def _rotate(self):
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.hit_window:
+            return
+        # Keep the window that just ended unless it's stale too
+        self._previous = self._current if elapsed < 2 * self.hit_window else {}
+        self._current = {}
+        self._window_start = time.monotonic()
+    
+    def stats(self) -> dict:
+        """Get Redis hit ratio and renewal counters"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            "renewals": self.renewals,
+            "tracked_codes": len(self._current) + len(self._previous),
+            "untracked": self.untracked
+        }
+
+
+# Global policy instance
+_cache_ttl_policy: Optional[CacheTTLPolicy] = None
+
+
+def get_cache_ttl_policy() -> CacheTTLPolicy:
+    """Get this worker's cache TTL policy"""
+    global _cache_ttl_policy
+    if _cache_ttl_policy is None:
+        _cache_ttl_policy = CacheTTLPolicy(
+            min_ttl=settings.cache_ttl_min,
+            max_ttl=settings.cache_ttl_max,
+            hit_window=settings.cache_hit_window,
+            renew_hits=settings.cache_renew_hits
+        )
+    return _cache_ttl_policy
\ No newline at end of file
@@ -0,0 +1,132 @@
+import logging
+import time
+from typing import List, Optional, Tuple, Union
+import redis
+from app.core.rate_limiter import (
+    AsyncLocalRateLimiter, AsyncRateLimiter, RateLimitPolicyTable, RateLimitResult,
+    default_policy_table, rate_limit_key
+)
+from app.core.security_middleware import SECURITY_HEADERS
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+_RATE_LIMITED_BODY = b'{"detail":"Rate limit exceeded. Please try again later."}'
+_RATE_LIMITED_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_RATE_LIMITED_BODY)).encode("latin-1")),
+]
+
+
+def encode_headers(headers: dict) -> Headers:
+    """Convert a header dict to ASGI (name, value) byte pairs"""
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+    ]
+
+
+class EdgeMiddleware:
+    """
+    Security headers, rate limiting and X-Process-Time as one pure ASGI
+    layer. Unlike @app.middleware("http") functions, it doesn't wrap the
+    request and response in extra tasks and streams; it only appends
+    headers to the response start message.
+    """
+    
+    def __init__(
+        self,
+        app,
+        limiter: Optional[Union[AsyncRateLimiter, AsyncLocalRateLimiter]] = None,
+        policies: Optional[RateLimitPolicyTable] = None,
+        security_headers: bool = True,
+        process_time: bool = True
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.policies = policies or default_policy_table()
+        self.static_headers = encode_headers(SECURITY_HEADERS) if security_headers else []
+        self.process_time = process_time
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        headers = self.static_headers
+        if self.limiter is not None:
+            result = await self._check(scope)
+            if result is not None:
+                headers = headers + encode_headers(result.headers())
+                if not result.allowed:
+                    await self._reject(send, headers, start)
+                    return
+        
+        if not headers and not self.process_time:
+            await self.app(scope, receive, send)
+            return
+        
+        process_time = self.process_time
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                response_headers = list(message.get("headers", ()))
+                response_headers.extend(headers)
+                if process_time:
+                    elapsed = time.perf_counter() - start
+                    response_headers.append((b"x-process-time", str(elapsed).encode("latin-1")))
+                message = {**message, "headers": response_headers}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+    
+    async def _check(self, scope) -> Optional[RateLimitResult]:
+        """Apply the matching rate limit policy, or return None if exempt"""
+        forwarded_for = real_ip = api_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                forwarded_for = value
+            elif name == b"x-real-ip":
+                real_ip = value
+            elif name == b"x-api-key":
+                api_key = value.decode("latin-1")
+        
+        policy = self.policies.match(scope["method"], scope["path"], api_key)
+        if policy.exempt:
+            return None
+        
+        # Prefer forwarded headers (for reverse proxy setups)
+        if forwarded_for:
+            client_ip = forwarded_for.decode("latin-1").split(",")[0].strip()
+        elif real_ip:
+            client_ip = real_ip.decode("latin-1")
+        else:
+            client = scope.get("client")
+            client_ip = client[0] if client else "unknown"
+        
+        try:
+            return await self.limiter.check(
+                rate_limit_key(policy, client_ip, api_key),
+                policy.limit,
+                policy.window,
+                policy.burst
+            )
+        except redis.RedisError:
+            # Fail open: a limiter outage shouldn't take the service down
+            logger.warning("Rate limiter unavailable, allowing request")
+            return None
+    
+    async def _reject(self, send, headers: Headers, start: float):
+        """Send a 429 response without calling the app"""
+        response_headers = _RATE_LIMITED_HEADERS + headers
+        if self.process_time:
+            elapsed = time.perf_counter() - start
+            response_headers.append((b"x-process-time", str(elapsed).encode("latin-1")))
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": response_headers
+        })
+        await send({"type": "http.response.body", "body": _RATE_LIMITED_BODY})
\ No newline at end of file
@@ -1,104 +1,482 @@
-from fastapi import Request, HTTPException
-from typing import Optional
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+import hashlib
+import math
+import re
+import threading
 import time
-from app.db.redis_client import RedisClient
+from app.core.config import settings
+from app.db.redis_client import AsyncRedisClient, RedisClient, get_async_redis_client
+
+# Generic cell rate algorithm (GCRA), evaluated atomically in Redis.
+#
+# The key holds a single number, the "theoretical arrival time" (TAT) in ms.
+# Each request pushes the TAT forward by one emission interval (window / limit);
+# a request is allowed while the TAT stays within `capacity` ms of now, where
+# capacity = interval * burst. Memory is O(1) per key and the key expires as
+# soon as the bucket is full again.
+#
+# KEYS[1] = limiter key
+# ARGV[1] = emission interval in ms
+# ARGV[2] = capacity in ms
+# ARGV[3] = cost (0 to peek without consuming)
+# ARGV[4] = requests already admitted elsewhere (e.g. by a local tier), always
+#           charged before the decision, but never beyond a full bucket
+#
+# Returns {allowed, remaining, reset_after_ms, retry_after_ms}
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local pending = tonumber(ARGV[4] or '0')
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+if pending > 0 then
+    tat = math.min(tat + interval * pending, now + capacity)
+end
+
+local new_tat = tat + interval * cost
+local debt = new_tat - now
+if debt > capacity then
+    if pending > 0 then
+        redis.call('SET', KEYS[1], tostring(tat), 'PX', math.max(1, math.ceil(tat - now)))
+    end
+    return {0, math.floor((capacity - (tat - now)) / interval), math.ceil(tat - now), math.ceil(debt - capacity)}
+end
+
+if cost + pending > 0 then
+    redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil(debt)))
+end
+return {1, math.floor((capacity - debt) / interval), math.ceil(debt), 0}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # Seconds until the full burst is available again
+    retry_after: float  # Seconds until a request would be allowed, 0 if allowed
+    
+    def headers(self) -> dict:
+        """X-RateLimit-* headers describing this result"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after))
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+def _gcra_args(limit: int, window: int, burst: Optional[int], cost: int, pending: int) -> list:
+    """GCRA_SCRIPT arguments for a limit of `limit` requests per `window` seconds"""
+    interval = window * 1000 / limit
+    return [interval, interval * (burst or limit), cost, pending]
+
+
+def _gcra_result(limit: int, reply: List[int]) -> RateLimitResult:
+    allowed, remaining, reset_after, retry_after = reply
+    return RateLimitResult(
+        allowed=bool(allowed),
+        limit=limit,
+        remaining=remaining,
+        reset_after=reset_after / 1000,
+        retry_after=retry_after / 1000
+    )
 
 
 class RateLimiter:
     def __init__(self, redis_client: RedisClient):
         self.redis = redis_client
+        # Sent with EVALSHA, falling back to EVAL the first time
+        self._script = self.redis.redis_client.register_script(GCRA_SCRIPT)
+        self.redis_calls = 0
     
-    def is_rate_limited(
-        self, 
-        key: str, 
-        limit: int, 
-        window: int = 60
-    ) -> bool:
+    def check(
+        self,
+        key: str,
+        limit: int,
+        window: int = 60,
+        burst: Optional[int] = None,
+        cost: int = 1,
+        pending: int = 0
+    ) -> RateLimitResult:
         """
-        Check if a key has exceeded the rate limit
+        Consume `cost` requests from a key's quota in one round trip
         
         Args:
             key: Unique identifier for rate limiting (e.g., IP address)
-            limit: Maximum number of requests allowed
+            limit: Sustained number of requests allowed per window
             window: Time window in seconds
+            burst: Maximum number of requests allowed at once (defaults to limit)
+            cost: Number of requests to consume, 0 to only read the quota
+            pending: Requests already admitted without asking Redis
         
         Returns:
-            True if rate limited, False otherwise
+            The decision and remaining quota
         """
-        current_time = int(time.time())
-        window_start = current_time - window
-        
-        # Use sliding window approach
-        pipe = self.redis.redis_client.pipeline()
-        
-        # Remove old entries
-        pipe.zremrangebyscore(key, 0, window_start)
-        
-        # Count current entries
-        pipe.zcard(key)
-        
-        # Add current request
-        pipe.zadd(key, {str(current_time): current_time})
-        
-        # Set expiration
-        pipe.expire(key, window)
-        
-        results = pipe.execute()
-        current_count = results[1]
-        
-        return current_count >= limit
+        self.redis_calls += 1
+        reply = self._script(keys=[key], args=_gcra_args(limit, window, burst, cost, pending))
+        return _gcra_result(limit, reply)
     
-    def get_rate_limit_info(self, key: str, window: int = 60) -> dict:
-        """Get rate limit information for a key"""
-        current_time = int(time.time())
-        window_start = current_time - window
-        
-        # Clean old entries and count current ones
-        self.redis.redis_client.zremrangebyscore(key, 0, window_start)
-        current_count = self.redis.redis_client.zcard(key)
-        
+    def is_rate_limited(
+        self, 
+        key: str, 
+        limit: int, 
+        window: int = 60,
+        burst: Optional[int] = None
+    ) -> bool:
+        """Check if a key has exceeded the rate limit, counting this request"""
+        return not self.check(key, limit, window, burst).allowed
+    
+    def get_rate_limit_info(
+        self,
+        key: str,
+        limit: int,
+        window: int = 60,
+        burst: Optional[int] = None
+    ) -> dict:
+        """Get rate limit information for a key without consuming quota"""
+        result = self.check(key, limit, window, burst, cost=0)
         return {
-            "current_requests": current_count,
+            "limit": result.limit,
+            "remaining": result.remaining,
             "window_seconds": window,
-            "reset_time": current_time + window
+            "reset_after": result.reset_after
         }
+    
+    def stats(self) -> dict:
+        """Get limiter counters"""
+        return {"mode": "redis", "redis_calls": self.redis_calls}
 
 
-def get_client_ip(request: Request) -> str:
-    """Extract client IP address from request"""
-    # Check for forwarded headers first (for reverse proxy setups)
-    forwarded_for = request.headers.get("X-Forwarded-For")
-    if forwarded_for:
-        return forwarded_for.split(",")[0].strip()
-    
-    real_ip = request.headers.get("X-Real-IP")
-    if real_ip:
-        return real_ip
-    
-    # Fallback to direct connection IP
-    return request.client.host if request.client else "unknown"
-
-
-def rate_limit_middleware(
-    limit: int = 100,
-    window: int = 60,
-    redis_client: Optional[RedisClient] = None
-):
-    """Rate limiting middleware factory"""
-    def middleware(request: Request, call_next):
-        if redis_client:
-            limiter = RateLimiter(redis_client)
-            client_ip = get_client_ip(request)
-            rate_limit_key = f"rate_limit:{client_ip}"
-            
-            if limiter.is_rate_limited(rate_limit_key, limit, window):
-                raise HTTPException(
-                    status_code=429,
-                    detail="Rate limit exceeded. Please try again later.",
-                    headers={"Retry-After": str(window)}
-                )
+class AsyncRateLimiter:
+    """redis.asyncio counterpart of RateLimiter, so checks don't block the event loop"""
+    
+    def __init__(self, redis_client: AsyncRedisClient):
+        self.redis = redis_client
+        self._script = self.redis.redis_client.register_script(GCRA_SCRIPT)
+        self.redis_calls = 0
+    
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window: int = 60,
+        burst: Optional[int] = None,
+        cost: int = 1,
+        pending: int = 0
+    ) -> RateLimitResult:
+        """Consume `cost` requests from a key's quota in one round trip (see RateLimiter.check)"""
+        self.redis_calls += 1
+        reply = await self._script(keys=[key], args=_gcra_args(limit, window, burst, cost, pending))
+        return _gcra_result(limit, reply)
+    
+    def stats(self) -> dict:
+        """Get limiter counters"""
+        return {"mode": "redis", "redis_calls": self.redis_calls}
+
+
+class _LocalBucket:
+    """Last quota seen in Redis for a key, plus requests admitted since"""
+    
+    __slots__ = ("remaining", "reset_after", "synced_at", "denied_until", "pending")
+    
+    def __init__(self):
+        self.remaining = 0
+        self.reset_after = 0.0
+        self.synced_at = 0.0
+        self.denied_until = 0.0
+        self.pending = 0
+
+
+class LocalRateLimiter:
+    """
+    Two-tier limiter: admits most requests from an in-process view of each
+    key's quota and only asks Redis when the view is stale, has accumulated
+    `max_pending` unreported requests, or shows the key within
+    `sync_threshold` requests of its limit. Requests admitted locally are
+    reported on the next sync, so a key may overshoot its limit by at most
+    roughly `max_pending` requests per worker.
+    """
+    
+    def __init__(
+        self,
+        limiter: Union[RateLimiter, AsyncRateLimiter],
+        max_keys: int = 100000,
+        sync_interval: float = 1.0,
+        max_pending: int = 10,
+        sync_threshold: int = 20
+    ):
+        self.limiter = limiter
+        self.max_keys = max_keys
+        self.sync_interval = sync_interval
+        self.max_pending = max_pending
+        self.sync_threshold = sync_threshold
+        self._buckets: "OrderedDict[str, _LocalBucket]" = OrderedDict()
+        self._lock = threading.Lock()
         
-        response = call_next(request)
-        return response
+        # Counters
+        self.local_admits = 0
+        self.local_denies = 0
+        self.syncs = 0
+        self.evictions = 0
+        self.dropped_pending = 0
+    
+    def check(
+        self,
+        key: str,
+        limit: int,
+        window: int = 60,
+        burst: Optional[int] = None
+    ) -> RateLimitResult:
+        """Consume one request from a key's quota, asking Redis only when needed"""
+        now = time.monotonic()
+        result, pending = self._check_local(key, limit, window, now)
+        if result is not None:
+            return result
+        try:
+            result = self.limiter.check(key, limit, window, burst, pending=pending)
+        except Exception:
+            self._restore_pending(key, pending)
+            raise
+        self._synced(key, result, now)
+        return result
+    
+    def _check_local(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        now: float
+    ) -> Tuple[Optional[RateLimitResult], int]:
+        """Decide from the local view if possible; otherwise the requests to report on sync"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return None, 0
+            self._buckets.move_to_end(key)
+            age = now - bucket.synced_at
+            
+            # Still inside the Retry-After Redis gave us
+            if bucket.denied_until > now:
+                self.local_denies += 1
+                return RateLimitResult(
+                    allowed=False,
+                    limit=limit,
+                    remaining=0,
+                    reset_after=max(bucket.reset_after - age, 0.0),
+                    retry_after=bucket.denied_until - now
+                ), 0
+            
+            if (
+                age < self.sync_interval
+                and bucket.pending < self.max_pending
+                and bucket.remaining - bucket.pending > self.sync_threshold
+            ):
+                bucket.pending += 1
+                self.local_admits += 1
+                return RateLimitResult(
+                    allowed=True,
+                    limit=limit,
+                    remaining=bucket.remaining - bucket.pending,
+                    reset_after=max(
+                        bucket.reset_after + bucket.pending * window / limit - age,
+                        0.0
+                    ),
+                    retry_after=0.0
+                ), 0
+            
+            # Report what was admitted locally along with this request
+            pending = bucket.pending
+            bucket.pending = 0
+            return None, pending
+    
+    def _restore_pending(self, key: str, pending: int):
+        """Keep unreported requests after a failed sync"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pending += pending
+    
+    def _synced(self, key: str, result: RateLimitResult, now: float):
+        """Refresh the local view from a Redis decision"""
+        with self._lock:
+            self.syncs += 1
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = _LocalBucket()
+                self._buckets[key] = bucket
+                while len(self._buckets) > self.max_keys:
+                    _, evicted = self._buckets.popitem(last=False)
+                    self.evictions += 1
+                    self.dropped_pending += evicted.pending
+            bucket.remaining = result.remaining
+            bucket.reset_after = result.reset_after
+            bucket.synced_at = now
+            bucket.denied_until = 0.0 if result.allowed else now + result.retry_after
+    
+    def stats(self) -> dict:
+        """Get local tier counters"""
+        decisions = self.local_admits + self.local_denies + self.syncs
+        avoided = self.local_admits + self.local_denies
+        return {
+            "mode": "local",
+            "keys": len(self._buckets),
+            "max_keys": self.max_keys,
+            "local_admits": self.local_admits,
+            "local_denies": self.local_denies,
+            "redis_calls": self.limiter.redis_calls,
+            "redis_calls_avoided": avoided,
+            "redis_call_ratio": self.syncs / decisions if decisions else 0.0,
+            "evictions": self.evictions,
+            "dropped_pending": self.dropped_pending
+        }
+
+
+class AsyncLocalRateLimiter(LocalRateLimiter):
+    """LocalRateLimiter over an AsyncRateLimiter"""
+    
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window: int = 60,
+        burst: Optional[int] = None
+    ) -> RateLimitResult:
+        """Consume one request from a key's quota, asking Redis only when needed"""
+        now = time.monotonic()
+        result, pending = self._check_local(key, limit, window, now)
+        if result is not None:
+            return result
+        try:
+            result = await self.limiter.check(key, limit, window, burst, pending=pending)
+        except Exception:
+            self._restore_pending(key, pending)
+            raise
+        self._synced(key, result, now)
+        return result
+
+
+# Per-worker limiter shared by the middleware and /metrics
+_rate_limiter: Optional[Union[AsyncRateLimiter, AsyncLocalRateLimiter]] = None
+
+
+def get_rate_limiter() -> Union[AsyncRateLimiter, AsyncLocalRateLimiter]:
+    """Get the per-worker rate limiter, with the local tier when enabled"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        limiter = AsyncRateLimiter(get_async_redis_client())
+        if settings.rate_limit_local_enabled:
+            limiter = AsyncLocalRateLimiter(
+                limiter,
+                max_keys=settings.rate_limit_local_max_keys,
+                sync_interval=settings.rate_limit_local_sync_interval,
+                max_pending=settings.rate_limit_local_max_pending,
+                sync_threshold=settings.rate_limit_local_sync_threshold
+            )
+        _rate_limiter = limiter
+    return _rate_limiter
+
+
+class RateLimitPolicy(NamedTuple):
+    name: str
+    path: str  # Regex matched against the request path
+    methods: FrozenSet[str] = frozenset()  # Empty matches any method
+    limit: int = 0  # Requests per window; 0 exempts matching requests
+    window: int = 60
+    burst: Optional[int] = None
+    api_key: Optional[str] = None  # Only match requests presenting this X-API-Key
+    
+    @property
+    def exempt(self) -> bool:
+        return self.limit <= 0
+
+
+class RateLimitPolicyTable:
+    """Ordered policy table; the first matching policy wins"""
+    
+    def __init__(self, policies: Iterable[RateLimitPolicy], default: RateLimitPolicy):
+        self.policies = list(policies)
+        self.default = default
+        self._compiled = [(re.compile(policy.path), policy) for policy in self.policies]
     
-    return middleware
\ No newline at end of file
+    def match(
+        self,
+        method: str,
+        path: str,
+        api_key: Optional[str] = None
+    ) -> RateLimitPolicy:
+        """Find the policy for a request"""
+        for pattern, policy in self._compiled:
+            if policy.methods and method not in policy.methods:
+                continue
+            if policy.api_key is not None and policy.api_key != api_key:
+                continue
+            if pattern.match(path):
+                return policy
+        return self.default
+
+
+def default_policy_table() -> RateLimitPolicyTable:
+    """Build the policy table from settings"""
+    api = "/api/v1/urls"
+    custom = [
+        RateLimitPolicy(**{
+            **policy,
+            "methods": frozenset(method.upper() for method in policy.get("methods", ()))
+        })
+        for policy in settings.rate_limit_policies
+    ]
+    return RateLimitPolicyTable(
+        custom + [
+            RateLimitPolicy("health", r"^/(health|metrics)?$"),
+            RateLimitPolicy("docs", r"^/(docs|redoc|openapi\.json)"),
+            RateLimitPolicy(
+                "bulk_create", rf"^{api}/bulk$", frozenset({"POST"}),
+                settings.rate_limit_bulk_create_per_minute, 60,
+                settings.rate_limit_bulk_create_burst
+            ),
+            RateLimitPolicy(
+                "create", rf"^{api}/?$", frozenset({"POST"}),
+                settings.rate_limit_create_per_minute, 60,
+                settings.rate_limit_create_burst
+            ),
+            RateLimitPolicy(
+                "analytics", rf"^{api}/[^/]+/analytics$", frozenset({"GET"}),
+                settings.rate_limit_analytics_per_minute, 60,
+                settings.rate_limit_analytics_burst
+            ),
+            RateLimitPolicy(
+                "redirect", rf"^{api}/[^/]+(/info)?$", frozenset({"GET", "HEAD"}),
+                settings.rate_limit_redirect_per_minute, 60,
+                settings.rate_limit_redirect_burst
+            ),
+        ],
+        default=RateLimitPolicy(
+            "default", "", limit=settings.rate_limit_per_minute,
+            burst=settings.rate_limit_burst
+        )
+    )
+
+
+def rate_limit_key(
+    policy: RateLimitPolicy,
+    client_ip: str,
+    api_key: Optional[str] = None
+) -> str:
+    """Redis key holding a client's quota under a policy"""
+    if policy.api_key is not None and api_key is not None:
+        # Never put the key itself in Redis
+        subject = "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    else:
+        subject = client_ip
+    return f"rate_limit:gcra:{policy.name}:{subject}"
\ No newline at end of file
@@ -1,9 +1,17 @@
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
 import re
 from typing import List
 
 
+# Headers added to every response
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Content-Security-Policy": "default-src 'self'",
+}
+
+
 class SecurityMiddleware:
     """Security middleware for URL shortener"""
     
@@ -52,36 +60,26 @@ class SecurityMiddleware:
         r'<wbr',
     ]
     
-    # Suspicious domains
-    SUSPICIOUS_DOMAINS = [
+    # Hosts that are always blocked, on top of the URL blocklist file
+    # (other schemes such as file:// and ftp:// are rejected by validate_url)
+    BLOCKED_HOSTS = [
         'localhost',
         '127.0.0.1',
         '0.0.0.0',
         '::1',
-        'file://',
-        'ftp://',
     ]
     
     @classmethod
     def validate_url(cls, url: str) -> bool:
         """Validate URL for security threats"""
-        url_lower = url.lower()
-        
-        # Check for malicious patterns
-        for pattern in cls.MALICIOUS_PATTERNS:
-            if re.search(pattern, url_lower, re.IGNORECASE):
-                return False
-        
-        # Check for suspicious domains
-        for domain in cls.SUSPICIOUS_DOMAINS:
-            if domain in url_lower:
-                return False
+        from app.core.url_scanner import get_url_scanner
         
         # Check for valid URL format
         if not url.startswith(('http://', 'https://')):
             return False
         
-        return True
+        # Malicious patterns and blocked domains, in one pass
+        return get_url_scanner().is_safe(url)
     
     @classmethod
     def sanitize_input(cls, input_str: str) -> str:
@@ -117,19 +115,4 @@ class SecurityMiddleware:
         if alias.lower() in reserved_words:
             return False
         
-        return True
-
-
-def security_middleware(request: Request, call_next):
-    """Security middleware for all requests"""
-    # Add security headers
-    response = call_next(request)
-    
-    # Security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = "default-src 'self'"
-    
-    return response
\ No newline at end of file
+        return True
\ No newline at end of file
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Iterable, Optional, Pattern
+from urllib.parse import urlsplit
+from app.core.config import settings
+from app.core.security_middleware import SecurityMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+def compile_literals(literals: Iterable[str]) -> Pattern:
+    """
+    Compile literal strings into one case-insensitive regex shaped like a
+    trie, so a single search tests every literal at each position without
+    backtracking through a flat alternation
+    """
+    trie: dict = {}
+    for literal in literals:
+        node = trie
+        for char in literal.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node: dict) -> str:
+        # A literal ends here: any longer literal sharing this prefix is redundant
+        if "" in node:
+            return ""
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+    
+    return re.compile(build(trie) if trie else r"(?!)", re.IGNORECASE)
+
+
+def normalize_domain(entry: str) -> Optional[str]:
+    """Normalize a blocklist line: plain domains and hosts-file lines are accepted"""
+    entry = entry.split("#", 1)[0].strip()
+    if not entry:
+        return None
+    # "0.0.0.0 evil.example" (hosts file format)
+    entry = entry.split()[-1].lower()
+    if entry.startswith("*."):
+        entry = entry[2:]
+    return entry.rstrip(".") or None
+
+
+def load_blocklist(path: str) -> frozenset:
+    """Read a domain blocklist file, one entry per line"""
+    with open(path, encoding="utf-8", errors="replace") as blocklist:
+        return frozenset(filter(None, map(normalize_domain, blocklist)))
+
+
+class URLScanner:
+    """
+    Single-pass URL threat scanner.
+    
+    Content patterns are compiled into one trie-shaped regex; blocked domains
+    live in a set and a host matches if it, or any parent domain, is listed.
+    The blocklist is an immutable snapshot that reloads build off to the
+    side and swap in, so scans never wait on a reload.
+    """
+    
+    def __init__(
+        self,
+        patterns: Iterable[str] = SecurityMiddleware.MALICIOUS_PATTERNS,
+        blocked_domains: Iterable[str] = SecurityMiddleware.BLOCKED_HOSTS,
+        blocklist_path: Optional[str] = None
+    ):
+        self.pattern = compile_literals(patterns)
+        self.builtin_domains = frozenset(filter(None, map(normalize_domain, blocked_domains)))
+        self.blocklist_path = blocklist_path
+        self.domains = self.builtin_domains
+        self._blocklist_stamp = None
+        
+        # Counters
+        self.scans = 0
+        self.blocked = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.loaded_at: Optional[float] = None
+        
+        if blocklist_path:
+            try:
+                self.reload()
+            except OSError:
+                self.reload_errors += 1
+                logger.exception("Could not load URL blocklist %s", blocklist_path)
+    
+    def scan(self, url: str) -> Optional[str]:
+        """Return why a URL is unsafe, or None if it is clean"""
+        self.scans += 1
+        match = self.pattern.search(url)
+        if match:
+            self.blocked += 1
+            return f"contains '{match.group().lower()}'"
+        
+        domain = self._blocked_domain(urlsplit(url).hostname)
+        if domain:
+            self.blocked += 1
+            return f"domain '{domain}' is blocked"
+        return None
+    
+    def is_safe(self, url: str) -> bool:
+        return self.scan(url) is None
+    
+    def _blocked_domain(self, host: Optional[str]) -> Optional[str]:
+        """Find the listed domain covering a host, checking each parent domain"""
+        if not host:
+            return None
+        # One snapshot per lookup, even if a reload swaps it meanwhile
+        domains = self.domains
+        host = host.rstrip(".")
+        if host in domains:
+            return host
+        dot = host.find(".")
+        while dot != -1:
+            parent = host[dot + 1:]
+            if parent in domains:
+                return parent
+            dot = host.find(".", dot + 1)
+        return None
+    
+    def reload(self) -> int:
+        """Load the blocklist file and swap it in; returns the number of domains"""
+        stat = os.stat(self.blocklist_path)
+        domains = self.builtin_domains | load_blocklist(self.blocklist_path)
+        self.domains = domains
+        self._blocklist_stamp = (stat.st_mtime_ns, stat.st_size)
+        self.loaded_at = time.time()
+        self.reloads += 1
+        logger.info("Loaded %d blocked domains from %s", len(domains), self.blocklist_path)
+        return len(domains)
+    
+    def reload_if_changed(self) -> bool:
+        """Reload the blocklist if the file was modified since the last load"""
+        stat = os.stat(self.blocklist_path)
+        if (stat.st_mtime_ns, stat.st_size) == self._blocklist_stamp:
+            return False
+        self.reload()
+        return True
+    
+    async def watch(self, interval: float):
+        """Poll the blocklist file and reload it in a worker thread when it changes"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.reload_if_changed)
+            except Exception:
+                self.reload_errors += 1
+                logger.exception("Could not reload URL blocklist %s", self.blocklist_path)
+    
+    def stats(self) -> dict:
+        """Get scanner counters"""
+        return {
+            "blocked_domains": len(self.domains),
+            "blocklist_path": self.blocklist_path,
+            "loaded_at": self.loaded_at,
+            "scans": self.scans,
+            "blocked": self.blocked,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+
+
+_url_scanner: Optional[URLScanner] = None
+
+
+def get_url_scanner() -> URLScanner:
+    """Get the shared URL scanner"""
+    global _url_scanner
+    if _url_scanner is None:
+        _url_scanner = URLScanner(blocklist_path=settings.url_blocklist_path or None)
+    return _url_scanner
\ No newline at end of file
@@ -1,15 +1,99 @@
+import itertools
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .redis_client import get_redis_client
+from sqlalchemy.orm import Session, sessionmaker
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from .pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from .redis_client import get_redis_client, get_async_redis_client
 from app.core.config import settings
 
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping
+    }
+
+
+# Engines by name ("primary", "replica-0", ...), for pool metrics
+engines: Dict[str, Engine] = {}
+
 # PostgreSQL database
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, poolclass=TimedQueuePool, **_pool_options())
+engines["primary"] = engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas, used round-robin for lookups that tolerate replication lag
+ReplicaSessions: List[sessionmaker] = []
+for _index, _replica_url in enumerate(settings.database_replica_urls):
+    _replica_engine = create_engine(_replica_url, poolclass=TimedQueuePool, **_pool_options())
+    engines[f"replica-{_index}"] = _replica_engine
+    ReplicaSessions.append(sessionmaker(autocommit=False, autoflush=False, bind=_replica_engine))
+_replica_cycle = itertools.cycle(ReplicaSessions)
+
 Base = declarative_base()
 
+# asyncio drivers for each sync URL scheme
+_ASYNC_DRIVERS = (
+    ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+    ("postgresql://", "postgresql+asyncpg://"),
+    ("sqlite://", "sqlite+aiosqlite://"),
+)
+
+
+def to_async_database_url(url: str) -> str:
+    """Map a sync database URL to its asyncio driver"""
+    for prefix, async_prefix in _ASYNC_DRIVERS:
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def _async_session_factory(name: str, url: str) -> async_sessionmaker:
+    async_engine = create_async_engine(
+        url, poolclass=TimedAsyncAdaptedQueuePool, **_pool_options()
+    )
+    engines[f"async-{name}"] = async_engine.sync_engine
+    # Objects stay usable after commit without an (awaited) refresh
+    return async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+
+# Created on first use so sync-only processes (workers, migrations) don't
+# need the asyncio driver installed
+_async_session_factory_primary: Optional[async_sessionmaker] = None
+_async_replica_cycle: Optional[Iterator[async_sessionmaker]] = None
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Get the AsyncSession factory, creating the async engine on first use"""
+    global _async_session_factory_primary
+    if _async_session_factory_primary is None:
+        _async_session_factory_primary = _async_session_factory(
+            "primary",
+            settings.async_database_url or to_async_database_url(settings.database_url)
+        )
+    return _async_session_factory_primary
+
+
+def get_async_replica_session_factory() -> Optional[async_sessionmaker]:
+    """Get the next replica's AsyncSession factory, or None without replicas"""
+    global _async_replica_cycle
+    if not settings.database_replica_urls:
+        return None
+    if _async_replica_cycle is None:
+        _async_replica_cycle = itertools.cycle([
+            _async_session_factory(f"replica-{index}", to_async_database_url(url))
+            for index, url in enumerate(settings.database_replica_urls)
+        ])
+    return next(_async_replica_cycle)
+
 
 def get_db():
     """Dependency to get database session"""
@@ -20,6 +104,44 @@ def get_db():
         db.close()
 
 
+def get_read_db() -> Iterator[Optional[Session]]:
+    """Dependency to get a replica session, or None when there are no replicas"""
+    if not ReplicaSessions:
+        yield None
+        return
+    db = next(_replica_cycle)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an asyncio database session"""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncIterator[Optional[AsyncSession]]:
+    """Dependency to get an asyncio replica session, or None without replicas"""
+    factory = get_async_replica_session_factory()
+    if factory is None:
+        yield None
+        return
+    async with factory() as db:
+        yield db
+
+
+def pool_stats() -> dict:
+    """Connection pool usage and checkout wait times per engine"""
+    return {name: pool_engine.pool.stats() for name, pool_engine in engines.items()}
+
+
 def get_redis():
     """Dependency to get Redis client"""
-    return get_redis_client()
\ No newline at end of file
+    return get_redis_client()
+
+
+def get_async_redis():
+    """Dependency to get the asyncio Redis client"""
+    return get_async_redis_client()
\ No newline at end of file
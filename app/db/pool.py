@@ -0,0 +1,83 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Checkouts slower than this are counted separately
+SLOW_CHECKOUT_SECONDS = 0.01
+
+
+class PoolWaitStats:
+    """How long checkouts waited for a pooled connection"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+            if seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def stats(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+
+class _TimedPoolMixin:
+    """Times every checkout, including waits for a free connection and connects"""
+    
+    wait_stats: PoolWaitStats
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record_timeout()
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+    
+    def recreate(self):
+        # Keep the counters when the engine disposes and replaces the pool
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+    
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            **self.wait_stats.stats()
+        }
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
\ No newline at end of file
@@ -1,7 +1,21 @@
+import time
 import redis
-from typing import Optional
+import redis.asyncio as aioredis
+from redis.client import NEVER_DECODE
+from typing import Optional, Tuple, Union
 from app.core.config import settings
 
+# Seconds /metrics reuses the INFO output for
+MEMORY_STATS_TTL = 5.0
+
+# Delete a lock only if the caller still holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class RedisClient:
     def __init__(self):
@@ -10,7 +24,18 @@ class RedisClient:
     def get(self, key: str) -> Optional[str]:
         return self.redis_client.get(key)
     
-    def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """GET without decoding, for binary values"""
+        return self.redis_client.execute_command("GET", key, **{NEVER_DECODE: True})
+    
+    def hget_bytes(self, key: str, field: str) -> Optional[bytes]:
+        """HGET without decoding, for binary values"""
+        return self.redis_client.execute_command("HGET", key, field, **{NEVER_DECODE: True})
+    
+    def hdel(self, key: str, field: str) -> bool:
+        return bool(self.redis_client.hdel(key, field))
+    
+    def set(self, key: str, value: Union[str, bytes], ex: Optional[int] = None) -> bool:
         return self.redis_client.set(key, value, ex=ex)
     
     def delete(self, key: str) -> bool:
@@ -22,16 +47,116 @@ class RedisClient:
     def increment(self, key: str) -> int:
         return self.redis_client.incr(key)
     
+    def pipeline(self, transaction: bool = False):
+        return self.redis_client.pipeline(transaction=transaction)
+    
     def expire(self, key: str, seconds: int) -> bool:
         return bool(self.redis_client.expire(key, seconds))
+    
+    def publish(self, channel: str, message: str) -> int:
+        return self.redis_client.publish(channel, message)
+
+
+class AsyncRedisClient:
+    """redis.asyncio counterpart of RedisClient"""
+    
+    def __init__(self):
+        self.redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+        self._release_lock = self.redis_client.register_script(RELEASE_LOCK_SCRIPT)
+        self._memory_stats: Optional[dict] = None
+        self._memory_stats_at = 0.0
+    
+    async def get(self, key: str) -> Optional[str]:
+        return await self.redis_client.get(key)
+    
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """GET without decoding, for binary values"""
+        return await self.redis_client.execute_command("GET", key, **{NEVER_DECODE: True})
+    
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[bytes], int]:
+        """Undecoded value and remaining TTL in milliseconds (-2 if missing, -1 if none), in one round trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.execute_command("GET", key, **{NEVER_DECODE: True})
+        pipe.pttl(key)
+        value, ttl = await pipe.execute()
+        return value, ttl
+    
+    async def hget_bytes(self, key: str, field: str) -> Optional[bytes]:
+        """HGET without decoding, for binary values"""
+        return await self.redis_client.execute_command("HGET", key, field, **{NEVER_DECODE: True})
+    
+    async def hdel(self, key: str, field: str) -> bool:
+        return bool(await self.redis_client.hdel(key, field))
+    
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        """Take a lock that expires after `ttl` seconds unless released"""
+        return bool(await self.redis_client.set(key, token, px=int(ttl * 1000), nx=True))
+    
+    async def release_lock(self, key: str, token: str) -> bool:
+        return bool(await self._release_lock(keys=[key], args=[token]))
+    
+    async def set(self, key: str, value: Union[str, bytes], ex: Optional[int] = None) -> bool:
+        return await self.redis_client.set(key, value, ex=ex)
+    
+    async def delete(self, key: str) -> bool:
+        return bool(await self.redis_client.delete(key))
+    
+    async def exists(self, key: str) -> bool:
+        return bool(await self.redis_client.exists(key))
+    
+    async def increment(self, key: str) -> int:
+        return await self.redis_client.incr(key)
+    
+    def pipeline(self, transaction: bool = False):
+        # Commands are queued synchronously; only execute() is awaited
+        return self.redis_client.pipeline(transaction=transaction)
+    
+    async def expire(self, key: str, seconds: int) -> bool:
+        return bool(await self.redis_client.expire(key, seconds))
+    
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.redis_client.publish(channel, message)
+    
+    async def memory_stats(self) -> dict:
+        """
+        Server memory use, and the hit, expiry and eviction counters. Read in
+        one round trip and reused for MEMORY_STATS_TTL seconds, so scraping
+        /metrics doesn't put an INFO on the server per request.
+        """
+        now = time.monotonic()
+        if self._memory_stats is not None and now - self._memory_stats_at < MEMORY_STATS_TTL:
+            return self._memory_stats
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.info("memory")
+        pipe.info("stats")
+        memory, stats = await pipe.execute()
+        lookups = stats["keyspace_hits"] + stats["keyspace_misses"]
+        self._memory_stats = {
+            "used_memory": memory["used_memory"],
+            "maxmemory": memory["maxmemory"],
+            "maxmemory_policy": memory["maxmemory_policy"],
+            "keyspace_hit_ratio": stats["keyspace_hits"] / lookups if lookups else 0.0,
+            "expired_keys": stats["expired_keys"],
+            "evicted_keys": stats["evicted_keys"]
+        }
+        self._memory_stats_at = now
+        return self._memory_stats
 
 
-# Global Redis client instance
+# Global Redis client instances
 _redis_client: Optional[RedisClient] = None
+_async_redis_client: Optional[AsyncRedisClient] = None
 
 
 def get_redis_client() -> RedisClient:
     global _redis_client
     if _redis_client is None:
         _redis_client = RedisClient()
-    return _redis_client
\ No newline at end of file
+    return _redis_client
+
+
+def get_async_redis_client() -> AsyncRedisClient:
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = AsyncRedisClient()
+    return _async_redis_client
\ No newline at end of file
@@ -2,12 +2,22 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import redis
 from app.api.urls import router as url_router
 from app.core.config import settings
-from app.core.security_middleware import security_middleware
-from app.core.rate_limiter import rate_limit_middleware
-from app.db.redis_client import get_redis_client
-import time
+from app.core.middleware import EdgeMiddleware
+from app.core.rate_limiter import default_policy_table, get_rate_limiter
+from app.core.url_scanner import get_url_scanner
+from app.db.database import pool_stats
+from app.db.redis_client import get_async_redis_client
+from app.cache.local import get_local_cache
+from app.cache.invalidation import InvalidationSubscriber
+from app.cache.short_code_filter import get_short_code_filter
+from app.cache.stampede import get_stampede_guard
+from app.cache.ttl_policy import get_cache_ttl_policy
+from app.services.click_writer import get_click_writer
+from app.services.id_allocator import get_id_allocator
+import asyncio
 
 app = FastAPI(
     title="URL Shortener",
@@ -32,26 +42,49 @@ app.add_middleware(
     allowed_hosts=["*"]  # Configure appropriately for production
 )
 
-# Security middleware
-app.middleware("http")(security_middleware)
-
-# Rate limiting middleware
-redis_client = get_redis_client()
-app.middleware("http")(rate_limit_middleware(
-    limit=settings.rate_limit_per_minute,
-    window=60,
-    redis_client=redis_client
-))
+# Security headers, rate limiting and X-Process-Time (outermost)
+app.add_middleware(
+    EdgeMiddleware,
+    limiter=get_rate_limiter(),
+    policies=default_policy_table()
+)
 
 
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add processing time header"""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start per-worker background tasks"""
+    local_cache = get_local_cache()
+    if local_cache is not None:
+        # Bypass the local cache until invalidations can be received
+        local_cache.suspended = True
+        subscriber = InvalidationSubscriber(local_cache)
+        app.state.invalidation_subscriber = subscriber
+        app.state.invalidation_task = asyncio.create_task(subscriber.run())
+    
+    if settings.url_blocklist_path:
+        app.state.blocklist_task = asyncio.create_task(
+            get_url_scanner().watch(settings.url_blocklist_reload_interval)
+        )
+    
+    if settings.click_recording_mode == "buffered":
+        await get_click_writer().start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """Stop per-worker background tasks"""
+    for name in ("invalidation_task", "blocklist_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    if settings.click_recording_mode == "buffered":
+        # Flush queued clicks before the worker exits
+        await get_click_writer().stop()
 
 
 @app.exception_handler(404)
@@ -88,6 +121,34 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Per-worker cache and pipeline metrics"""
+    local_cache = get_local_cache()
+    subscriber = getattr(app.state, "invalidation_subscriber", None)
+    short_code_filter = get_short_code_filter()
+    try:
+        redis_memory = await get_async_redis_client().memory_stats()
+    except redis.RedisError:
+        redis_memory = None
+    return {
+        "local_cache": local_cache.stats() if local_cache else None,
+        "cache_invalidation": subscriber.stats() if subscriber else None,
+        "id_allocator": get_id_allocator().stats(),
+        "db_pools": pool_stats(),
+        "rate_limiter": get_rate_limiter().stats(),
+        "url_scanner": get_url_scanner().stats(),
+        "short_code_filter": short_code_filter.stats() if short_code_filter else None,
+        "redirect_cache": get_cache_ttl_policy().stats(),
+        "redirect_cache_loads": get_stampede_guard().stats(),
+        "redis_memory": redis_memory,
+        "click_writer": (
+            get_click_writer().stats()
+            if settings.click_recording_mode == "buffered" else None
+        )
+    }
+
+
 # Include routers
 app.include_router(url_router, prefix="/api/v1/urls", tags=["urls"])
 
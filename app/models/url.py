@@ -1,40 +1,75 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, foreign
 from app.db.database import Base
 
+# 64-bit IDs; SQLite only auto-increments a column declared INTEGER PRIMARY KEY
+BigIntID = BigInteger().with_variant(Integer, "sqlite")
+
+# Columns a redirect needs, stored in the short_code index so cache-miss
+# redirects are index-only scans
+REDIRECT_COLUMNS = ("id", "original_url", "is_active", "expires_at")
+
 
 class URL(Base):
     __tablename__ = "urls"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntID, primary_key=True)
     original_url = Column(Text, nullable=False)
-    short_code = Column(String(50), unique=True, index=True, nullable=False)
-    custom_alias = Column(String(50), unique=True, index=True, nullable=True)
+    short_code = Column(String(50), nullable=False)
+    custom_alias = Column(String(50), nullable=True)
     title = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    # Set on delete; the row and its clicks are purged later by app.workers.url_purger
+    deleted_at = Column(DateTime, nullable=True)
     
-    # Analytics relationship
-    clicks = relationship("URLClick", back_populates="url", cascade="all, delete-orphan")
+    # Analytics relationship. Never cascades: a URL can have millions of
+    # clicks, which the purger deletes in chunks instead.
+    clicks = relationship(
+        "URLClick",
+        primaryjoin=lambda: URL.id == foreign(URLClick.url_id),
+        back_populates="url",
+        passive_deletes="all"
+    )
     
-    # Indexes for performance
+    # Indexes for performance. short_code and custom_alias are only unique
+    # among live URLs, so a deleted alias is free again straight away.
     __table_args__ = (
-        Index('idx_urls_short_code', 'short_code'),
-        Index('idx_urls_custom_alias', 'custom_alias'),
+        Index(
+            'ix_urls_short_code_covering', 'short_code',
+            unique=True, postgresql_include=list(REDIRECT_COLUMNS),
+            postgresql_where=deleted_at.is_(None), sqlite_where=deleted_at.is_(None)
+        ),
+        Index(
+            'ix_urls_custom_alias', 'custom_alias', unique=True,
+            postgresql_where=deleted_at.is_(None), sqlite_where=deleted_at.is_(None)
+        ),
         Index('idx_urls_expires_at', 'expires_at'),
         Index('idx_urls_created_at', 'created_at'),
+        # Small: only deleted URLs waiting for the purger
+        Index(
+            'idx_urls_deleted_at', 'deleted_at',
+            postgresql_where=deleted_at.isnot(None), sqlite_where=deleted_at.isnot(None)
+        ),
     )
 
 
 class URLClick(Base):
+    """
+    One row per click.
+    
+    In PostgreSQL the table is range partitioned by clicked_at, with primary
+    key (id, clicked_at) (alembic revision 0004); id alone stays the ORM
+    identity so SQLite can still autoincrement it.
+    """
     __tablename__ = "url_clicks"
     
-    id = Column(Integer, primary_key=True, index=True)
-    url_id = Column(Integer, nullable=False, index=True)
+    id = Column(BigIntID, primary_key=True)
+    url_id = Column(BigInteger, nullable=False)  # Indexed by idx_clicks_url_id_clicked_at
     ip_address = Column(String(45), nullable=True)  # IPv6 support
     user_agent = Column(Text, nullable=True)
     referer = Column(Text, nullable=True)
@@ -43,12 +78,17 @@ class URLClick(Base):
     clicked_at = Column(DateTime, default=func.now(), nullable=False)
     
     # Relationship
-    url = relationship("URL", back_populates="clicks")
+    url = relationship(
+        "URL",
+        primaryjoin=lambda: URL.id == foreign(URLClick.url_id),
+        back_populates="clicks"
+    )
     
-    # Indexes for analytics queries
+    # Indexes for analytics queries; time ranges are served by partition pruning.
+    # (url_id, id) serves the clicks not rolled up yet (AnalyticsService).
     __table_args__ = (
         Index('idx_clicks_url_id_clicked_at', 'url_id', 'clicked_at'),
-        Index('idx_clicks_clicked_at', 'clicked_at'),
+        Index('idx_clicks_url_id_id', 'url_id', 'id'),
     )
 
 
@@ -57,5 +97,28 @@ class Counter(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(50), unique=True, nullable=False)
-    value = Column(Integer, default=0, nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    value = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class URLClickRollup(Base):
+    """Pre-aggregated click counts per URL, time bucket and dimension"""
+    __tablename__ = "url_click_rollups"
+    
+    url_id = Column(BigInteger, primary_key=True)
+    granularity = Column(String(5), primary_key=True)  # "hour", "day" or "all"
+    bucket_start = Column(DateTime, primary_key=True)  # ROLLUP_EPOCH for "all"
+    dimension = Column(String(10), primary_key=True)  # "total", "country" or "referer"
+    dimension_value = Column(String(255), primary_key=True)  # "" for "total"
+    clicks = Column(Integer, default=0, nullable=False)
+    unique_clicks = Column(Integer, default=0, nullable=False)  # Only kept for "total"
+
+
+class URLClickVisitor(Base):
+    """Distinct visitor IPs per URL and bucket, used to keep unique counts exact"""
+    __tablename__ = "url_click_visitors"
+    
+    url_id = Column(BigInteger, primary_key=True)
+    granularity = Column(String(5), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    ip_address = Column(String(45), primary_key=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, validator
-from typing import Optional
+from typing import Optional, List, Any
 from datetime import datetime
 
 
@@ -22,14 +22,20 @@ class URLBase(BaseModel):
         if v is not None:
             from app.utils.url_encoder import URLEncoder
             if not URLEncoder.is_valid_custom_alias(v):
-                raise ValueError('Custom alias can only contain alphanumeric characters')
+                raise ValueError('Custom alias can only contain alphanumeric characters, hyphens and underscores')
             if len(v) < 3:
                 raise ValueError('Custom alias must be at least 3 characters long')
         return v
 
 
 class URLCreate(URLBase):
-    pass
+    @validator('original_url')
+    def check_url_threats(cls, v):
+        from app.core.url_scanner import get_url_scanner
+        reason = get_url_scanner().scan(v)
+        if reason:
+            raise ValueError(f'URL is not allowed: {reason}')
+        return v
 
 
 class URLResponse(URLBase):
@@ -45,6 +51,24 @@ class URLResponse(URLBase):
         from_attributes = True
 
 
+class URLBulkCreate(BaseModel):
+    # Items are validated one by one so a bad item doesn't reject the batch
+    urls: List[Any]
+
+
+class URLBulkItemResult(BaseModel):
+    index: int
+    success: bool
+    url: Optional[URLResponse] = None
+    error: Optional[str] = None
+
+
+class URLBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[URLBulkItemResult]
+
+
 class URLUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -58,6 +82,7 @@ class URLClickCreate(BaseModel):
     referer: Optional[str] = None
     country: Optional[str] = None
     city: Optional[str] = None
+    clicked_at: Optional[datetime] = None
 
 
 class URLClickResponse(BaseModel):
@@ -78,6 +103,7 @@ class URLAnalytics(BaseModel):
     total_clicks: int
     unique_clicks: int
     clicks_by_day: list
+    clicks_by_hour: list
     clicks_by_country: list
     clicks_by_referer: list
     recent_clicks: list[URLClickResponse]
\ No newline at end of file
@@ -0,0 +1,300 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.url import Counter, URLClick, URLClickRollup, URLClickVisitor
+from app.schemas.url import URLClickResponse
+from app.services.unique_visitors import UniqueVisitorCounter, HLL_STANDARD_ERROR
+
+# Bucket start used for all-time ("all") rollups
+ROLLUP_EPOCH = datetime(1970, 1, 1)
+
+WATERMARK_COUNTER = "click_rollup_watermark"
+HORIZON_COUNTER = "click_rollup_horizon"
+MAX_DIMENSION_LENGTH = 255
+VISITOR_LOOKUP_CHUNK = 500
+
+RollupKey = Tuple[int, str, datetime, str, str]
+VisitorKey = Tuple[int, str, datetime, str]
+
+
+def _buckets(clicked_at: datetime) -> List[Tuple[str, datetime]]:
+    hour = clicked_at.replace(minute=0, second=0, microsecond=0)
+    return [("hour", hour), ("day", hour.replace(hour=0)), ("all", ROLLUP_EPOCH)]
+
+
+def _dimensions(country: Optional[str], referer: Optional[str]) -> List[Tuple[str, str]]:
+    dimensions = [("total", "")]
+    if country:
+        dimensions.append(("country", country))
+    if referer:
+        dimensions.append(("referer", referer[:MAX_DIMENSION_LENGTH]))
+    return dimensions
+
+
+class AnalyticsService:
+    """
+    Click analytics backed by incremental rollups.
+    
+    rollup_pending() folds raw url_clicks rows into url_click_rollups, tracking
+    the last processed click ID as a watermark in the counters table. Reads
+    combine the rollups with the (small) tail of clicks past the watermark, so
+    results are exact whether or not the rollup job has caught up.
+    
+    Click IDs are taken at insert time but can commit out of order, so the
+    watermark never passes an ID that might still be uncommitted: the job
+    records the highest click ID as a horizon and only rolls up to it once
+    `settle_seconds` have passed, by which time every insert that took a lower
+    ID has committed (or rolled back).
+    
+    With a visitor_counter, unique visitors come from HyperLogLog sketches
+    maintained at click time and the exact visitor table is not maintained.
+    """
+    
+    def __init__(self, db: Session, visitor_counter: Optional[UniqueVisitorCounter] = None):
+        self.db = db
+        self.visitor_counter = visitor_counter
+    
+    def rollup_pending(
+        self,
+        batch_size: int = 10000,
+        settle_seconds: float = 60.0,
+        now: Optional[datetime] = None
+    ) -> int:
+        """Fold the next batch of settled raw clicks into the rollups; returns clicks processed"""
+        watermark = self._watermark(for_update=True)
+        horizon = self._horizon(watermark.value, settle_seconds, now or datetime.utcnow())
+        clicks = self.db.query(
+            URLClick.id,
+            URLClick.url_id,
+            URLClick.ip_address,
+            URLClick.country,
+            URLClick.referer,
+            URLClick.clicked_at
+        ).filter(
+            URLClick.id > watermark.value,
+            URLClick.id <= horizon
+        ).order_by(URLClick.id).limit(batch_size).all()
+        
+        if not clicks:
+            # Keeps a newly recorded horizon
+            self.db.commit()
+            return 0
+        
+        counts: Dict[RollupKey, int] = defaultdict(int)
+        visitors = set()
+        for click in clicks:
+            for granularity, bucket_start in _buckets(click.clicked_at):
+                for dimension, value in _dimensions(click.country, click.referer):
+                    counts[(click.url_id, granularity, bucket_start, dimension, value)] += 1
+                if click.ip_address and self.visitor_counter is None:
+                    visitors.add((click.url_id, granularity, bucket_start, click.ip_address))
+        
+        # Unique counts only grow for visitors not seen in the bucket before
+        uniques: Dict[RollupKey, int] = defaultdict(int)
+        new_visitors = visitors - self._existing_visitors(visitors) if visitors else set()
+        for url_id, granularity, bucket_start, _ in new_visitors:
+            uniques[(url_id, granularity, bucket_start, "total", "")] += 1
+        
+        if new_visitors:
+            self.db.execute(
+                self._insert(URLClickVisitor),
+                [
+                    {"url_id": url_id, "granularity": granularity, "bucket_start": bucket_start, "ip_address": ip}
+                    for url_id, granularity, bucket_start, ip in new_visitors
+                ]
+            )
+        
+        statement = self._insert(URLClickRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                URLClickRollup.url_id,
+                URLClickRollup.granularity,
+                URLClickRollup.bucket_start,
+                URLClickRollup.dimension,
+                URLClickRollup.dimension_value
+            ],
+            set_={
+                "clicks": URLClickRollup.clicks + statement.excluded.clicks,
+                "unique_clicks": URLClickRollup.unique_clicks + statement.excluded.unique_clicks
+            }
+        )
+        self.db.execute(statement, [
+            {
+                "url_id": url_id,
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "dimension": dimension,
+                "dimension_value": value,
+                "clicks": count,
+                "unique_clicks": uniques.get((url_id, granularity, bucket_start, dimension, value), 0)
+            }
+            for (url_id, granularity, bucket_start, dimension, value), count in counts.items()
+        ])
+        
+        # Advance the watermark in the same transaction as the rollups
+        watermark.value = clicks[-1].id
+        self.db.commit()
+        return len(clicks)
+    
+    def get_url_analytics(self, url_id: int) -> dict:
+        """Get analytics for a URL from rollups plus clicks not yet rolled up"""
+        now = datetime.utcnow()
+        # Whole days, starting 30 days ago
+        first_day = (now - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+        first_hour = (now - timedelta(hours=24)).replace(minute=0, second=0, microsecond=0)
+        
+        totals = {"clicks": 0, "unique_clicks": 0}
+        by_day: Dict[datetime, int] = defaultdict(int)
+        by_hour: Dict[datetime, int] = defaultdict(int)
+        by_country: Dict[str, int] = defaultdict(int)
+        by_referer: Dict[str, int] = defaultdict(int)
+        
+        rollups = self.db.query(URLClickRollup).filter(
+            URLClickRollup.url_id == url_id,
+            (URLClickRollup.granularity == "all") |
+            ((URLClickRollup.granularity == "day") & (URLClickRollup.bucket_start >= first_day) & (URLClickRollup.dimension == "total")) |
+            ((URLClickRollup.granularity == "hour") & (URLClickRollup.bucket_start >= first_hour) & (URLClickRollup.dimension == "total"))
+        ).all()
+        for rollup in rollups:
+            if rollup.granularity == "day":
+                by_day[rollup.bucket_start] += rollup.clicks
+            elif rollup.granularity == "hour":
+                by_hour[rollup.bucket_start] += rollup.clicks
+            elif rollup.dimension == "total":
+                totals["clicks"] += rollup.clicks
+                totals["unique_clicks"] += rollup.unique_clicks
+            elif rollup.dimension == "country":
+                by_country[rollup.dimension_value] += rollup.clicks
+            else:
+                by_referer[rollup.dimension_value] += rollup.clicks
+        
+        # Clicks past the watermark haven't been rolled up yet
+        tail = self.db.query(
+            URLClick.ip_address,
+            URLClick.country,
+            URLClick.referer,
+            URLClick.clicked_at
+        ).filter(
+            URLClick.url_id == url_id,
+            URLClick.id > self._watermark().value
+        ).all()
+        
+        tail_ips = set()
+        for click in tail:
+            buckets = dict(_buckets(click.clicked_at))
+            totals["clicks"] += 1
+            if buckets["day"] >= first_day:
+                by_day[buckets["day"]] += 1
+            if buckets["hour"] >= first_hour:
+                by_hour[buckets["hour"]] += 1
+            if click.country:
+                by_country[click.country] += 1
+            if click.referer:
+                by_referer[click.referer[:MAX_DIMENSION_LENGTH]] += 1
+            if click.ip_address and self.visitor_counter is None:
+                tail_ips.add((url_id, "all", ROLLUP_EPOCH, click.ip_address))
+        
+        if self.visitor_counter is None:
+            totals["unique_clicks"] += len(tail_ips - self._existing_visitors(tail_ips))
+        else:
+            totals["unique_clicks"] = self.visitor_counter.count(url_id)
+        
+        # Get recent clicks. The upper bound prunes the empty future partitions;
+        # the rest are read newest first until 10 clicks are found.
+        recent_clicks = self.db.query(URLClick).filter(
+            URLClick.url_id == url_id,
+            URLClick.clicked_at <= now
+        ).order_by(URLClick.clicked_at.desc()).limit(10).all()
+        
+        clicks_by_day = [
+            {"date": str(day.date()), "count": count} for day, count in sorted(by_day.items())
+        ]
+        
+        analytics = {
+            "total_clicks": totals["clicks"],
+            "unique_clicks": totals["unique_clicks"],
+            "clicks_by_day": clicks_by_day,
+            "clicks_by_hour": [
+                {"hour": hour.isoformat(), "count": count} for hour, count in sorted(by_hour.items())
+            ],
+            "clicks_by_country": [
+                {"country": country, "count": count}
+                for country, count in sorted(by_country.items(), key=lambda item: -item[1])
+            ],
+            "clicks_by_referer": [
+                {"referer": referer, "count": count}
+                for referer, count in sorted(by_referer.items(), key=lambda item: -item[1])
+            ],
+            "recent_clicks": [URLClickResponse.model_validate(click) for click in recent_clicks]
+        }
+        
+        if self.visitor_counter is not None:
+            # Approximate uniques per day and over the whole window, merged server-side
+            days = sorted(by_day)
+            uniques = self.visitor_counter.count_by_day(url_id, [day.date() for day in days])
+            for item, day in zip(clicks_by_day, days):
+                item["unique"] = uniques[day.date()]
+            analytics["unique_clicks_last_30_days"] = self.visitor_counter.count_range(
+                url_id, first_day.date(), now.date()
+            )
+            analytics["unique_clicks_error"] = HLL_STANDARD_ERROR
+        
+        return analytics
+    
+    def _watermark(self, for_update: bool = False) -> Counter:
+        # Locking it serializes concurrent rollup jobs
+        return self._counter(WATERMARK_COUNTER, for_update)
+    
+    def _horizon(self, watermark: int, settle_seconds: float, now: datetime) -> int:
+        """Highest click ID that can be rolled up without skipping a later commit"""
+        horizon = self._counter(HORIZON_COUNTER, for_update=True)
+        settled = horizon.updated_at is not None and horizon.updated_at <= now - timedelta(seconds=settle_seconds)
+        if settled and horizon.value > watermark:
+            return horizon.value
+        if horizon.updated_at is None or settled:
+            # Caught up; start settling the IDs handed out since
+            horizon.value = self.db.query(func.max(URLClick.id)).scalar() or 0
+            horizon.updated_at = now
+            if settle_seconds <= 0:
+                return horizon.value
+        return watermark
+    
+    def _counter(self, name: str, for_update: bool = False) -> Counter:
+        query = self.db.query(Counter).filter(Counter.name == name)
+        if for_update:
+            query = query.with_for_update()
+        counter = query.first()
+        if counter is None:
+            counter = Counter(name=name, value=0)
+            if for_update:
+                self.db.add(counter)
+        return counter
+    
+    def _existing_visitors(self, visitors: Iterable[VisitorKey]) -> set:
+        visitors = list(visitors)
+        key = tuple_(
+            URLClickVisitor.url_id,
+            URLClickVisitor.granularity,
+            URLClickVisitor.bucket_start,
+            URLClickVisitor.ip_address
+        )
+        existing = set()
+        # Chunked to keep the number of bound parameters per query bounded
+        for start in range(0, len(visitors), VISITOR_LOOKUP_CHUNK):
+            rows = self.db.query(
+                URLClickVisitor.url_id,
+                URLClickVisitor.granularity,
+                URLClickVisitor.bucket_start,
+                URLClickVisitor.ip_address
+            ).filter(key.in_(visitors[start:start + VISITOR_LOOKUP_CHUNK])).all()
+            existing.update(tuple(row) for row in rows)
+        return existing
+    
+    def _insert(self, model):
+        """Dialect-specific INSERT, for ON CONFLICT support"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            return sqlite.insert(model)
+        return postgresql.insert(model)
\ No newline at end of file
@@ -0,0 +1,195 @@
+import time
+import uuid
+from datetime import datetime
+from functools import partial
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.url import URL, URLClick
+from app.schemas.url import URLClickCreate
+from app.db.redis_client import AsyncRedisClient
+from app.cache.local import LocalCache
+from app.cache.redirect_cache import AsyncRedirectCache, redirect_cache_options
+from app.cache.redirect_record import NOT_FOUND_BYTES, RedirectRecord, decode_record, encode_record
+from app.cache.short_code_filter import NOT_FOUND, get_short_code_filter
+from app.cache.stampede import get_stampede_guard
+from app.cache.ttl_policy import get_cache_ttl_policy
+from app.core.config import settings
+from app.services.url_service import URLService, redirect_target_query
+from app.services.unique_visitors import get_visitor_counter
+
+
+class AsyncURLService:
+    """
+    asyncio counterpart of URLService for the request hot path: lookups and
+    click recording await the database and Redis instead of blocking the
+    event loop. Reads and writes the same cache entries as URLService.
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        redis_client: AsyncRedisClient,
+        local_cache: Optional[LocalCache] = None,
+        read_db: Optional[AsyncSession] = None
+    ):
+        self.db = db
+        # Replica session for reads that tolerate replication lag
+        self.read_db = read_db or db
+        self.redis = redis_client
+        self.cache = AsyncRedirectCache(redis_client, **redirect_cache_options())
+        self.local_cache = local_cache
+        self.visitor_counter = get_visitor_counter(redis_client)
+        self.short_code_filter = get_short_code_filter()
+        self.stampede_guard = get_stampede_guard()
+        self.ttl_policy = get_cache_ttl_policy()
+    
+    # Pure helper shared with the sync service
+    is_url_expired = URLService.is_url_expired
+    
+    async def get_redirect_target(self, short_code: str) -> Optional[RedirectRecord]:
+        """
+        Get what a redirect needs (id, original_url, is_active, expires_at)
+        with local and Redis caching
+        """
+        
+        # Try the per-worker cache first
+        if self.local_cache is not None:
+            url = self.local_cache.get(short_code)
+            if url is not None:
+                self.ttl_policy.record_hit(short_code)
+                return url
+        
+        # Then Redis
+        cached, ttl = await self.cache.get_with_ttl(short_code)
+        self.ttl_policy.record_lookup(short_code, cached)
+        if cached == NOT_FOUND_BYTES:
+            return None
+        # Entries in an older format are reloaded
+        url = decode_record(short_code, cached) if cached else None
+        if url is not None:
+            # Now and then reload an entry shortly before it expires, so it
+            # doesn't expire under load; hot entries just have their TTL extended
+            if ttl > 0 and self.stampede_guard.should_refresh_early(ttl / 1000):
+                url = await self.stampede_guard.do(
+                    short_code, partial(self._load_redirect_target, short_code, stale=url)
+                )
+            else:
+                renewal = self.ttl_policy.renewal_ttl(short_code, ttl / 1000, url.expires_at)
+                if renewal is not None:
+                    await self.cache.renew(short_code, cached, renewal)
+            if url is not None:
+                self._cache_local(url)
+            return url
+        
+        # Codes the filter has never seen don't exist
+        if not await self._might_exist(short_code):
+            return None
+        
+        # Concurrent misses in this worker share one load
+        url = await self.stampede_guard.do(short_code, partial(self._load_redirect_target, short_code))
+        if url is not None:
+            self._cache_local(url)
+        return url
+    
+    async def get_url_by_short_code(self, short_code: str) -> Optional[URL]:
+        """Get the full URL record by short code, from a replica if configured"""
+        if not await self._might_exist(short_code):
+            return None
+        query = select(URL).where(URL.short_code == short_code, URL.deleted_at.is_(None)).limit(1)
+        url = await self.read_db.scalar(query)
+        if url is None and self.read_db is not self.db:
+            url = await self.db.scalar(query)
+        return url
+    
+    async def get_url_by_id(self, url_id: int) -> Optional[URL]:
+        """Get URL by ID"""
+        return await self.db.scalar(select(URL).where(URL.id == url_id, URL.deleted_at.is_(None)))
+    
+    async def get_click_count(self, url_id: int) -> int:
+        """Get the click counter kept in Redis"""
+        click_count = await self.redis.get(f"clicks:{url_id}")
+        return int(click_count) if click_count else 0
+    
+    async def record_click(self, url_id: int, click_data: URLClickCreate) -> URLClick:
+        """Record a click on a URL"""
+        click = URLClick(
+            url_id=url_id,
+            ip_address=click_data.ip_address,
+            user_agent=click_data.user_agent,
+            referer=click_data.referer,
+            country=click_data.country,
+            city=click_data.city,
+            # Set client-side: a server default would need an awaited refresh
+            clicked_at=click_data.clicked_at or datetime.utcnow()
+        )
+        
+        self.db.add(click)
+        await self.db.commit()
+        
+        # Update the click counter and visitor sketches in one round trip
+        pipe = self.redis.pipeline()
+        pipe.incr(f"clicks:{url_id}")
+        if self.visitor_counter is not None:
+            self.visitor_counter.add_commands(pipe, url_id, click_data.ip_address, click.clicked_at)
+        await pipe.execute()
+        
+        return click
+    
+    def _cache_local(self, record: RedirectRecord):
+        """Cache a redirect record in the per-worker cache"""
+        if self.local_cache is not None:
+            self.local_cache.set(record.short_code, record)
+    
+    async def _might_exist(self, short_code: str) -> bool:
+        """False if the filter has definitely never seen the code"""
+        if self.short_code_filter is None:
+            return True
+        pipe = self.redis.pipeline()
+        self.short_code_filter.contains_commands(pipe, short_code)
+        return self.short_code_filter.contains_result(*await pipe.execute())
+    
+    async def _load_redirect_target(
+        self,
+        short_code: str,
+        stale: Optional[RedirectRecord] = None
+    ) -> Optional[RedirectRecord]:
+        """
+        Query a redirect target and cache it (or the miss) under a short Redis
+        lock, so one worker queries per key. If another worker holds the lock,
+        serve `stale` or wait for that worker's cache entry.
+        """
+        lock_key = f"lock:url:{short_code}"
+        token = uuid.uuid4().hex
+        locked = await self.redis.acquire_lock(lock_key, token, self.stampede_guard.lock_ttl)
+        if not locked:
+            if stale is not None:
+                return stale
+            cached = await self.stampede_guard.wait_for(partial(self.cache.get, short_code))
+            if cached is not None:
+                return None if cached == NOT_FOUND_BYTES else decode_record(short_code, cached)
+            # The holder is slow or gone; query anyway
+        
+        try:
+            # Index-only lookup on a replica, then on the primary in case the
+            # URL was just created and hasn't replicated yet
+            started = time.perf_counter()
+            query = redirect_target_query(short_code)
+            row = (await self.read_db.execute(query)).first()
+            if row is None and self.read_db is not self.db:
+                row = (await self.db.execute(query)).first()
+            self.stampede_guard.record_load(time.perf_counter() - started)
+            
+            if row is None:
+                # Remember the miss briefly, for codes the filter couldn't rule out
+                if settings.negative_cache_ttl > 0:
+                    await self.cache.set(short_code, NOT_FOUND, settings.negative_cache_ttl)
+                return None
+            
+            url = RedirectRecord(short_code=short_code, **row._asdict())
+            # Cache for future requests
+            await self.cache.set(short_code, encode_record(url), self.ttl_policy.ttl_for(short_code, url.expires_at))
+            return url
+        finally:
+            if locked:
+                await self.redis.release_lock(lock_key, token)
\ No newline at end of file
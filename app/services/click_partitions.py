@@ -0,0 +1,217 @@
+"""
+url_clicks partition maintenance (PostgreSQL).
+
+url_clicks is range partitioned by clicked_at (see alembic revision 0004).
+Partitions are created ahead of time and old ones are dropped whole once they
+fall out of the retention window, instead of DELETEing rows. Clicks for a day
+without a partition land in the DEFAULT partition (revision 0007) and are
+moved out when that day's partition is created.
+"""
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.services.analytics_service import WATERMARK_COUNTER
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "url_clicks"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_INTERVALS = ("day", "month")
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class ClickPartition(NamedTuple):
+    name: str
+    start: Optional[datetime]  # None for MINVALUE
+    end: Optional[datetime]  # None for MAXVALUE
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Start of the day or month containing moment"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day.replace(day=1) if interval == "month" else day
+
+
+def next_period_start(moment: datetime, interval: str) -> datetime:
+    """Start of the first day or month after the one containing moment"""
+    start = period_start(moment, interval)
+    if interval == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def parse_bound(expression: str) -> List[Optional[datetime]]:
+    """Parse "FOR VALUES FROM (...) TO (...)" into [start, end]"""
+    match = _BOUND_RE.search(expression)
+    if match is None:
+        raise ValueError(f"Not a range partition bound: {expression}")
+    bounds = []
+    for value in match.groups():
+        if value in ("MINVALUE", "MAXVALUE"):
+            bounds.append(None)
+        else:
+            bounds.append(datetime.fromisoformat(value.strip("'")))
+    return bounds
+
+
+def plan_partitions(
+    existing: List[ClickPartition],
+    now: datetime,
+    interval: str = "day",
+    premake_days: int = 7
+) -> List[ClickPartition]:
+    """Partitions to create so clicks up to now + premake_days have a home"""
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(f"Unknown partition interval: {interval}")
+    
+    # Extend contiguously from the newest partition; switching intervals
+    # only changes the size of the partitions that follow
+    ends = [partition.end for partition in existing if partition.end is not None]
+    start = max(ends) if ends else period_start(now, interval)
+    horizon = now + timedelta(days=premake_days)
+    
+    planned = []
+    while start <= horizon:
+        end = next_period_start(start, interval)
+        planned.append(ClickPartition(partition_name(start), start, end))
+        start = end
+    return planned
+
+
+def expired_partitions(
+    existing: List[ClickPartition],
+    now: datetime,
+    retention_days: int
+) -> List[ClickPartition]:
+    """Partitions holding only clicks older than the retention window"""
+    if retention_days <= 0:
+        return []
+    cutoff = now - timedelta(days=retention_days)
+    return [
+        partition for partition in existing
+        if partition.end is not None and partition.end <= cutoff
+    ]
+
+
+class ClickPartitionManager:
+    """
+    Creates future url_clicks partitions and drops expired ones.
+    
+    A partition is only dropped once the rollup job has processed every click
+    in it, so all-time analytics totals survive retention.
+    """
+    
+    def __init__(
+        self,
+        db: Session,
+        interval: str = "day",
+        premake_days: int = 7,
+        retention_days: int = 90,
+        lock_timeout_ms: int = 5000
+    ):
+        self.db = db
+        self.interval = interval
+        self.premake_days = premake_days
+        self.retention_days = retention_days
+        self.lock_timeout_ms = lock_timeout_ms
+    
+    def partitions(self) -> List[ClickPartition]:
+        """Attached range partitions, oldest first; the DEFAULT partition is left out"""
+        rows = self.db.execute(text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ), {"parent": PARENT_TABLE}).all()
+        partitions = [
+            ClickPartition(name, *parse_bound(bound)) for name, bound in rows if bound != "DEFAULT"
+        ]
+        return sorted(partitions, key=lambda partition: partition.start or datetime.min)
+    
+    def create_future(self, now: Optional[datetime] = None) -> List[str]:
+        """Create missing partitions up to the premake horizon; returns their names"""
+        now = now or datetime.utcnow()
+        planned = plan_partitions(self.partitions(), now, self.interval, self.premake_days)
+        has_default = self._has_default_partition()
+        for partition in planned:
+            self._set_lock_timeout()
+            if has_default:
+                self._split_default(partition)
+            else:
+                self.db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+                ))
+            self.db.commit()
+            logger.info("Created click partition %s", partition.name)
+        return [partition.name for partition in planned]
+    
+    def drop_expired(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop partitions past the retention window; returns their names"""
+        now = now or datetime.utcnow()
+        dropped = []
+        for partition in expired_partitions(self.partitions(), now, self.retention_days):
+            if self._has_unrolled_clicks(partition):
+                logger.warning("Keeping click partition %s until it is rolled up", partition.name)
+                continue
+            self._set_lock_timeout()
+            self.db.execute(text(f"DROP TABLE {partition.name}"))
+            self.db.commit()
+            dropped.append(partition.name)
+            logger.info("Dropped click partition %s", partition.name)
+        return dropped
+    
+    def run(self, now: Optional[datetime] = None) -> dict:
+        """Create future partitions, then drop expired ones"""
+        return {"created": self.create_future(now), "dropped": self.drop_expired(now)}
+    
+    def _split_default(self, partition: ClickPartition):
+        """Create a partition, moving its clicks out of the DEFAULT partition first"""
+        bounds = {"start": partition.start, "end": partition.end}
+        # Attaching scans the default partition for rows in the new range; hold
+        # off inserts into it until then so none slip in after the move
+        self.db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+        self.db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition.name} "
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        moved = self.db.execute(text(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE clicked_at >= :start AND clicked_at < :end RETURNING *"
+            f") INSERT INTO {partition.name} SELECT * FROM moved"
+        ), bounds).rowcount
+        self.db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {partition.name} "
+            f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+        ))
+        if moved:
+            # Maintenance fell behind far enough that clicks had no partition
+            logger.warning("Moved %d clicks from %s into %s", moved, DEFAULT_PARTITION, partition.name)
+    
+    def _has_default_partition(self) -> bool:
+        return self.db.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}
+        ).scalar()
+    
+    def _has_unrolled_clicks(self, partition: ClickPartition) -> bool:
+        watermark = self.db.execute(
+            text("SELECT value FROM counters WHERE name = :name"), {"name": WATERMARK_COUNTER}
+        ).scalar() or 0
+        return self.db.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {partition.name} WHERE id > :watermark)"),
+            {"watermark": watermark}
+        ).scalar()
+    
+    def _set_lock_timeout(self):
+        # DDL on a partition locks the parent; give up rather than queue
+        # inserts behind a long-running query
+        self.db.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
\ No newline at end of file
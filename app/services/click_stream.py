@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Dict, Tuple
+from app.core.config import settings
+from app.db.redis_client import AsyncRedisClient, RedisClient
+from app.schemas.url import URLClickCreate
+from app.services.unique_visitors import get_visitor_counter
+
+CLICK_FIELDS = ("ip_address", "user_agent", "referer", "country", "city")
+
+
+def encode_click(url_id: int, click_data: URLClickCreate) -> Dict[str, str]:
+    """Flatten a click into stream entry fields (Redis has no null values)"""
+    clicked_at = click_data.clicked_at or datetime.utcnow()
+    fields = {"url_id": str(url_id), "clicked_at": clicked_at.isoformat()}
+    for field in CLICK_FIELDS:
+        value = getattr(click_data, field)
+        if value is not None:
+            fields[field] = value
+    return fields
+
+
+def decode_click(fields: Dict[str, str]) -> Tuple[int, URLClickCreate]:
+    """Rebuild a click from stream entry fields"""
+    click_data = URLClickCreate(
+        clicked_at=datetime.fromisoformat(fields["clicked_at"]),
+        **{field: fields.get(field) for field in CLICK_FIELDS}
+    )
+    return int(fields["url_id"]), click_data
+
+
+def _queue_click(pipe, redis_client, url_id: int, click_data: URLClickCreate):
+    """Queue the stream append and counter updates for one click"""
+    if click_data.clicked_at is None:
+        click_data.clicked_at = datetime.utcnow()
+    
+    pipe.xadd(
+        settings.click_stream_key,
+        encode_click(url_id, click_data),
+        maxlen=settings.click_stream_maxlen,
+        approximate=True
+    )
+    pipe.incr(f"clicks:{url_id}")
+    visitor_counter = get_visitor_counter(redis_client)
+    if visitor_counter is not None:
+        visitor_counter.add_commands(pipe, url_id, click_data.ip_address, click_data.clicked_at)
+
+
+def publish_click(redis_client: RedisClient, url_id: int, click_data: URLClickCreate):
+    """Append a click to the click stream and bump its counters in one round trip"""
+    pipe = redis_client.pipeline()
+    _queue_click(pipe, redis_client, url_id, click_data)
+    pipe.execute()
+
+
+async def publish_click_async(redis_client: AsyncRedisClient, url_id: int, click_data: URLClickCreate):
+    """asyncio version of publish_click"""
+    pipe = redis_client.pipeline()
+    _queue_click(pipe, redis_client, url_id, click_data)
+    await pipe.execute()
\ No newline at end of file
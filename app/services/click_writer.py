@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.redis_client import RedisClient, get_redis_client
+from app.schemas.url import URLClickCreate
+from app.services.url_service import URLService
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+# Queued by stop() to tell the flusher to drain and exit
+_STOP = object()
+
+
+class ClickBatchWriter:
+    """
+    Buffers clicks in a bounded in-memory queue and writes them to url_clicks
+    in multi-row batches from a background task.
+    
+    A batch is flushed when it reaches batch_size or flush_interval seconds
+    after its first click, whichever comes first. When the queue is full the
+    drop policy decides what happens to new clicks:
+    
+    - drop_newest: reject the new click
+    - drop_oldest: discard the oldest queued click to make room
+    - block: wait up to block_timeout for space, then reject
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        redis_client: Optional[RedisClient] = None,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        drop_policy: str = "drop_newest",
+        block_timeout: float = 0.05
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}'")
+        
+        self.session_factory = session_factory
+        self.redis = redis_client or get_redis_client()
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # Counters
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+    
+    async def start(self):
+        """Start the background flusher"""
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop accepting clicks and flush everything still queued"""
+        if self._task is None:
+            return
+        self._closed = True
+        await self.queue.put(_STOP)
+        await self._task
+        self._task = None
+    
+    async def submit(self, url_id: int, click_data: URLClickCreate) -> bool:
+        """Queue a click for writing; returns False if it was dropped"""
+        if self.queue is None or self._closed:
+            self.dropped += 1
+            return False
+        
+        if click_data.clicked_at is None:
+            click_data.clicked_at = datetime.utcnow()
+        item = (url_id, click_data)
+        
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            if not await self._handle_full(item):
+                self.dropped += 1
+                return False
+        
+        self.enqueued += 1
+        return True
+    
+    async def _handle_full(self, item) -> bool:
+        if self.drop_policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(item)
+            return True
+        
+        if self.drop_policy == "block":
+            try:
+                await asyncio.wait_for(self.queue.put(item), self.block_timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+        
+        return False
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                break
+            
+            # Collect until the batch is full or the flush interval elapses
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+        
+        # Drain whatever is left after the stop marker
+        batch = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[Tuple[int, URLClickCreate]]):
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+        try:
+            # Database writes are blocking; keep them off the event loop
+            await loop.run_in_executor(None, self._write_batch, batch)
+            self.flushed += len(batch)
+        except Exception:
+            logger.exception("Failed to write batch of %d clicks", len(batch))
+            self.failed += len(batch)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.batches += 1
+            self.last_flush_seconds = elapsed
+            self.total_flush_seconds += elapsed
+    
+    def _write_batch(self, batch: List[Tuple[int, URLClickCreate]]):
+        db = self.session_factory()
+        try:
+            URLService(db, self.redis).record_clicks(batch)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def stats(self) -> dict:
+        """Get queue and flush metrics"""
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "drop_policy": self.drop_policy,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_seconds": self.last_flush_seconds,
+            "avg_flush_seconds": self.total_flush_seconds / self.batches if self.batches else 0.0
+        }
+
+
+# Per-worker click writer
+_click_writer: Optional[ClickBatchWriter] = None
+
+
+def get_click_writer() -> ClickBatchWriter:
+    global _click_writer
+    if _click_writer is None:
+        _click_writer = ClickBatchWriter(
+            max_queue_size=settings.click_buffer_max_size,
+            batch_size=settings.click_batch_size,
+            flush_interval=settings.click_flush_interval,
+            drop_policy=settings.click_drop_policy,
+            block_timeout=settings.click_block_timeout
+        )
+    return _click_writer
\ No newline at end of file
@@ -0,0 +1,151 @@
+import threading
+from typing import Callable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.redis_client import RedisClient, get_redis_client
+from app.models.url import Counter
+
+# Leases `count` IDs and returns the last ID of the leased range
+BlockLeaser = Callable[[int], int]
+
+
+class IDAllocator:
+    """
+    Hi/lo ID allocator.
+    
+    Each worker leases a block of block_size IDs from a shared counter in one
+    round trip and then hands them out locally. IDs are unique across workers
+    but only roughly ordered, and the unused part of a block is lost when a
+    worker exits.
+    """
+    
+    def __init__(self, lease_block: BlockLeaser, block_size: int = 1000):
+        if block_size < 1:
+            raise ValueError("Block size must be positive")
+        self.lease_block = lease_block
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0  # Exclusive
+        self._lock = threading.Lock()
+        
+        # Counters
+        self.blocks_leased = 0
+        self.ids_issued = 0
+    
+    def next_id(self) -> int:
+        """Get the next ID, leasing a new block when the current one runs out"""
+        with self._lock:
+            if self._next >= self._end:
+                self._lease(self.block_size)
+            value = self._next
+            self._next += 1
+            self.ids_issued += 1
+            return value
+    
+    def allocate(self, count: int) -> List[int]:
+        """Get `count` IDs, leasing at most one extra block for the remainder"""
+        with self._lock:
+            ids = list(range(self._next, min(self._next + count, self._end)))
+            self._next += len(ids)
+            
+            missing = count - len(ids)
+            if missing:
+                self._lease(max(missing, self.block_size))
+                ids.extend(range(self._next, self._next + missing))
+                self._next += missing
+            
+            self.ids_issued += count
+            return ids
+    
+    def _lease(self, count: int):
+        last = self.lease_block(count)
+        self._next = last - count + 1
+        self._end = last + 1
+        self.blocks_leased += 1
+    
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "blocks_leased": self.blocks_leased,
+            "ids_issued": self.ids_issued,
+            "remaining_in_block": self._end - self._next
+        }
+
+
+def postgres_leaser(
+    session_factory: Callable[[], Session] = SessionLocal,
+    counter_name: str = "url_counter"
+) -> BlockLeaser:
+    """Lease blocks with one atomic upsert on the counters row"""
+    def lease(count: int) -> int:
+        statement = insert(Counter).values(name=counter_name, value=count)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Counter.name],
+            set_={"value": Counter.value + count, "updated_at": func.now()}
+        ).returning(Counter.value)
+        
+        db = session_factory()
+        try:
+            last = db.execute(statement).scalar_one()
+            db.commit()
+            return last
+        finally:
+            db.close()
+    
+    return lease
+
+
+def redis_leaser(
+    redis_client: RedisClient,
+    session_factory: Callable[[], Session] = SessionLocal,
+    counter_name: str = "url_counter"
+) -> BlockLeaser:
+    """
+    Lease blocks with INCRBY on a Redis counter.
+    
+    The Postgres counters row is kept as a high-water mark so the Redis
+    counter can be safely reseeded if Redis loses its data.
+    """
+    key = f"id_counter:{counter_name}"
+    
+    def high_water_mark(db: Session) -> int:
+        counter = db.query(Counter).filter(Counter.name == counter_name).first()
+        return counter.value if counter else 0
+    
+    def lease(count: int) -> int:
+        db = session_factory()
+        try:
+            if not redis_client.exists(key):
+                redis_client.redis_client.set(key, high_water_mark(db), nx=True)
+            last = redis_client.redis_client.incrby(key, count)
+            
+            statement = insert(Counter).values(name=counter_name, value=last)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Counter.name],
+                set_={"value": func.greatest(Counter.value, last), "updated_at": func.now()}
+            )
+            db.execute(statement)
+            db.commit()
+            return last
+        finally:
+            db.close()
+    
+    return lease
+
+
+# Per-worker short code ID allocator
+_id_allocator: Optional[IDAllocator] = None
+
+
+def get_id_allocator() -> IDAllocator:
+    global _id_allocator
+    if _id_allocator is None:
+        if settings.id_allocator_backend == "redis":
+            leaser = redis_leaser(get_redis_client())
+        else:
+            leaser = postgres_leaser()
+        _id_allocator = IDAllocator(leaser, block_size=settings.id_block_size)
+    return _id_allocator
\ No newline at end of file
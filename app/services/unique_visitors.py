@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.db.redis_client import RedisClient, get_redis_client
+
+# Standard error of Redis HyperLogLog counts (1.04 / sqrt(16384 registers))
+HLL_STANDARD_ERROR = 0.0081
+
+
+def _all_time_key(url_id: int) -> str:
+    return f"hll:{url_id}"
+
+
+def _day_key(url_id: int, day: date) -> str:
+    return f"hll:{url_id}:{day.isoformat()}"
+
+
+class UniqueVisitorCounter:
+    """
+    Approximate unique visitors per URL using Redis HyperLogLog sketches.
+    
+    Each click adds the visitor IP to an all-time sketch and a per-day sketch
+    (about 12KB each at most). Counts are constant time with a standard error
+    of 0.81%, and day sketches merge server-side so any date range is a single
+    PFCOUNT.
+    """
+    
+    def __init__(self, redis_client: RedisClient):
+        self.redis = redis_client
+    
+    def add_commands(self, pipe, url_id: int, ip_address: Optional[str], clicked_at: Optional[datetime] = None):
+        """Queue the sketch updates for one click on a pipeline"""
+        if not ip_address:
+            return
+        day_key = _day_key(url_id, (clicked_at or datetime.utcnow()).date())
+        pipe.pfadd(_all_time_key(url_id), ip_address)
+        pipe.pfadd(day_key, ip_address)
+        pipe.expire(day_key, settings.unique_visitor_day_retention_days * 86400, nx=True)
+    
+    def delete_commands(self, pipe, url_id: int):
+        """Queue removal of a URL's all-time sketch; day sketches expire on their own"""
+        pipe.delete(_all_time_key(url_id))
+    
+    def count(self, url_id: int) -> int:
+        """Approximate all-time unique visitors"""
+        return self.redis.redis_client.pfcount(_all_time_key(url_id))
+    
+    def count_range(self, url_id: int, start: date, end: date) -> int:
+        """Approximate unique visitors between two dates, inclusive"""
+        keys = [_day_key(url_id, start + timedelta(days=i)) for i in range((end - start).days + 1)]
+        if not keys:
+            return 0
+        return self.redis.redis_client.pfcount(*keys)
+    
+    def count_by_day(self, url_id: int, days: List[date]) -> Dict[date, int]:
+        """Approximate unique visitors for each day, in one round trip"""
+        pipe = self.redis.pipeline()
+        for day in days:
+            pipe.pfcount(_day_key(url_id, day))
+        return dict(zip(days, pipe.execute()))
+
+
+def get_visitor_counter(redis_client: Optional[RedisClient] = None) -> Optional[UniqueVisitorCounter]:
+    """Get the HyperLogLog counter, or None when unique visitors are counted exactly"""
+    if settings.unique_visitor_counting != "hll":
+        return None
+    return UniqueVisitorCounter(redis_client or get_redis_client())
\ No newline at end of file
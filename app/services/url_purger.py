@@ -0,0 +1,108 @@
+"""
+Purging of soft-deleted URLs.
+
+delete_url only marks a URL deleted. The purger later removes its clicks,
+rollups and visitor rows with set-based DELETEs of bounded size, one
+transaction each, so no statement holds locks or memory for long, and finally
+removes the URL row itself.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session
+from app.db.redis_client import RedisClient
+from app.models.url import URL, URLClick, URLClickRollup, URLClickVisitor
+from app.services.unique_visitors import get_visitor_counter
+
+logger = logging.getLogger(__name__)
+
+# Per-URL tables, each with the columns identifying a row
+CHILD_TABLES = [
+    (URLClick, (URLClick.id, URLClick.clicked_at)),
+    (URLClickRollup, (
+        URLClickRollup.granularity,
+        URLClickRollup.bucket_start,
+        URLClickRollup.dimension,
+        URLClickRollup.dimension_value
+    )),
+    (URLClickVisitor, (
+        URLClickVisitor.granularity,
+        URLClickVisitor.bucket_start,
+        URLClickVisitor.ip_address
+    )),
+]
+
+
+class URLPurger:
+    """
+    Deletes soft-deleted URLs and everything recorded against them.
+    
+    URLs are only purged once deleted for `grace_seconds`, so clicks still in
+    a buffer or stream when the URL was deleted land (and get rolled up)
+    before their rows are removed.
+    """
+    
+    def __init__(
+        self,
+        db: Session,
+        redis_client: Optional[RedisClient] = None,
+        chunk_size: int = 10000,
+        grace_seconds: float = 3600.0
+    ):
+        self.db = db
+        self.redis = redis_client
+        self.chunk_size = chunk_size
+        self.grace_seconds = grace_seconds
+        self.visitor_counter = get_visitor_counter(redis_client) if redis_client else None
+    
+    def pending(self, limit: int = 100, now: Optional[datetime] = None) -> List[int]:
+        """IDs of deleted URLs past the grace period, oldest deletion first"""
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=self.grace_seconds)
+        ids = self.db.scalars(
+            select(URL.id).where(URL.deleted_at.isnot(None), URL.deleted_at <= cutoff)
+            .order_by(URL.deleted_at).limit(limit)
+        ).all()
+        self.db.rollback()
+        return ids
+    
+    def purge_pending(self, limit: int = 100, now: Optional[datetime] = None) -> int:
+        """Purge up to `limit` deleted URLs; returns how many were purged"""
+        url_ids = self.pending(limit, now)
+        for url_id in url_ids:
+            self.purge_url(url_id)
+        return len(url_ids)
+    
+    def purge_url(self, url_id: int) -> int:
+        """Delete a deleted URL's rows chunk by chunk, then the URL; returns rows deleted"""
+        deleted = 0
+        for model, key_columns in CHILD_TABLES:
+            while True:
+                count = self._delete_chunk(model, key_columns, url_id)
+                self.db.commit()
+                deleted += count
+                if count < self.chunk_size:
+                    break
+        
+        # Never removes a live URL, whatever the caller passed
+        self.db.execute(delete(URL).where(URL.id == url_id, URL.deleted_at.isnot(None)))
+        self.db.commit()
+        
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.delete(f"clicks:{url_id}")
+            if self.visitor_counter is not None:
+                self.visitor_counter.delete_commands(pipe, url_id)
+            pipe.execute()
+        
+        logger.info("Purged URL %d and %d related rows", url_id, deleted)
+        return deleted
+    
+    def _delete_chunk(self, model, key_columns, url_id: int) -> int:
+        # DELETE has no portable LIMIT; pick the next chunk's keys in a subquery
+        chunk = select(*key_columns).where(model.url_id == url_id).limit(self.chunk_size)
+        result = self.db.execute(
+            delete(model).where(model.url_id == url_id, tuple_(*key_columns).in_(chunk)),
+            execution_options={"synchronize_session": False}
+        )
+        return result.rowcount
\ No newline at end of file
@@ -1,26 +1,68 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional, List
-from datetime import datetime, timedelta
-from app.models.url import URL, URLClick, Counter
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Select
+from typing import Optional, List, Tuple, Union
+from datetime import datetime
+from app.models.url import URL, URLClick, REDIRECT_COLUMNS
 from app.schemas.url import URLCreate, URLUpdate, URLClickCreate
-from app.utils.url_encoder import generate_short_code, URLEncoder
+from app.utils.url_encoder import generate_short_code, generate_short_codes, URLEncoder
 from app.core.config import settings
 from app.db.redis_client import RedisClient
+from app.cache.local import LocalCache
+from app.cache.invalidation import publish_invalidation
+from app.cache.redirect_cache import RedirectCache, redirect_cache_options
+from app.cache.redirect_record import RedirectRecord, encode_record
+from app.cache.short_code_filter import NOT_FOUND, get_short_code_filter
+from app.cache.ttl_policy import get_cache_ttl_policy
+from app.services.id_allocator import IDAllocator, get_id_allocator
+from app.services.analytics_service import AnalyticsService
+from app.services.unique_visitors import get_visitor_counter
+
+
+def redirect_target_query(short_code: str) -> Select:
+    """Select only what a redirect needs, so Postgres answers from the covering index"""
+    return select(*(getattr(URL, column) for column in REDIRECT_COLUMNS)).where(
+        URL.short_code == short_code,
+        URL.deleted_at.is_(None)
+    )
 
 
 class URLService:
-    def __init__(self, db: Session, redis_client: RedisClient):
+    def __init__(
+        self,
+        db: Session,
+        redis_client: RedisClient,
+        local_cache: Optional[LocalCache] = None,
+        id_allocator: Optional[IDAllocator] = None,
+        read_db: Optional[Session] = None
+    ):
         self.db = db
+        # Replica session for reads that tolerate replication lag
+        self.read_db = read_db or db
         self.redis = redis_client
+        self.cache = RedirectCache(redis_client, **redirect_cache_options())
+        self.local_cache = local_cache
+        self._id_allocator = id_allocator
+        self.visitor_counter = get_visitor_counter(redis_client)
+        self.short_code_filter = get_short_code_filter()
+        self.ttl_policy = get_cache_ttl_policy()
+    
+    @property
+    def id_allocator(self) -> IDAllocator:
+        if self._id_allocator is None:
+            self._id_allocator = get_id_allocator()
+        return self._id_allocator
     
     def create_url(self, url_data: URLCreate) -> URL:
         """Create a new shortened URL"""
         
-        # Check if custom alias is provided and available
-        if url_data.custom_alias:
+        # Check if custom alias is provided and available; the filter rules
+        # out most new aliases without a query
+        if url_data.custom_alias and self._might_exist([url_data.custom_alias])[0]:
             existing_url = self.db.query(URL).filter(
-                URL.custom_alias == url_data.custom_alias
+                URL.custom_alias == url_data.custom_alias,
+                URL.deleted_at.is_(None)
             ).first()
             if existing_url:
                 raise ValueError("Custom alias already exists")
@@ -29,14 +71,8 @@ class URLService:
         if url_data.custom_alias:
             short_code = url_data.custom_alias
         else:
-            # Get next counter value
-            counter = self.db.query(Counter).filter(Counter.name == "url_counter").first()
-            if not counter:
-                counter = Counter(name="url_counter", value=0)
-                self.db.add(counter)
-            
-            counter.value += 1
-            short_code = generate_short_code(counter.value)
+            # Take the next ID from this worker's leased block
+            short_code = generate_short_code(self.id_allocator.next_id())
         
         # Create URL record
         url = URL(
@@ -54,35 +90,91 @@ class URLService:
         
         # Cache the URL in Redis
         self._cache_url(url)
+        self._remember_codes([url.short_code])
         
         return url
     
-    def get_url_by_short_code(self, short_code: str) -> Optional[URL]:
-        """Get URL by short code with Redis caching"""
+    def create_urls(self, urls_data: List[URLCreate]) -> List[Tuple[Optional[URL], Optional[str]]]:
+        """
+        Create many shortened URLs at once.
         
-        # Try Redis cache first
-        cache_key = f"url:{short_code}"
-        cached_url = self.redis.get(cache_key)
+        Runs one alias lookup, one ID allocation, one multi-row insert and one
+        pipelined cache write for the whole batch. Returns a (url, error) pair
+        per item, in input order.
+        """
+        results: List[Tuple[Optional[URL], Optional[str]]] = [(None, None)] * len(urls_data)
         
-        if cached_url:
-            # Parse cached data and return URL object
-            import json
-            url_data = json.loads(cached_url)
-            url = URL(**url_data)
-            return url
+        # Check all custom aliases the filter can't rule out in a single query
+        aliases = [url_data.custom_alias for url_data in urls_data if url_data.custom_alias]
+        aliases = [alias for alias, maybe in zip(aliases, self._might_exist(aliases)) if maybe]
+        taken = set()
+        if aliases:
+            taken = {
+                row.custom_alias for row in self.db.query(URL.custom_alias).filter(
+                    URL.custom_alias.in_(aliases),
+                    URL.deleted_at.is_(None)
+                )
+            }
         
-        # Fallback to database
-        url = self.db.query(URL).filter(URL.short_code == short_code).first()
+        pending = []
+        for index, url_data in enumerate(urls_data):
+            alias = url_data.custom_alias
+            if alias:
+                if alias in taken:
+                    results[index] = (None, "Custom alias already exists")
+                    continue
+                taken.add(alias)
+            pending.append(index)
         
-        if url:
-            # Cache for future requests
-            self._cache_url(url)
+        if not pending:
+            return results
         
-        return url
+        # Allocate IDs for every generated code in one step
+        generated = [index for index in pending if not urls_data[index].custom_alias]
+        short_codes = dict(zip(generated, generate_short_codes(self.id_allocator.allocate(len(generated)))))
+        
+        rows = [
+            {
+                "original_url": urls_data[index].original_url,
+                "short_code": urls_data[index].custom_alias or short_codes[index],
+                "custom_alias": urls_data[index].custom_alias,
+                "title": urls_data[index].title,
+                "description": urls_data[index].description,
+                "expires_at": urls_data[index].expires_at
+            }
+            for index in pending
+        ]
+        
+        # Aliases taken concurrently since the lookup are skipped rather than
+        # failing the batch, and reported as taken. Rows are matched on
+        # (short_code, custom_alias) so an alias that equals a generated code
+        # in the same batch is only reported for the row that was kept.
+        inserted = {
+            (url.short_code, url.custom_alias): url for url in self.db.scalars(
+                insert(URL).on_conflict_do_nothing().returning(URL),
+                rows
+            ).all()
+        }
+        self.db.commit()
+        urls = list(inserted.values())
+        
+        # Cache the new URLs in a single round trip
+        self._cache_urls(urls)
+        self._remember_codes([url.short_code for url in urls])
+        
+        for index, row in zip(pending, rows):
+            url = inserted.get((row["short_code"], row["custom_alias"]))
+            if url is not None:
+                results[index] = (url, None)
+            elif row["custom_alias"]:
+                results[index] = (None, "Custom alias already exists")
+            else:
+                results[index] = (None, "Short code already exists")
+        return results
     
     def get_url_by_id(self, url_id: int) -> Optional[URL]:
         """Get URL by ID"""
-        return self.db.query(URL).filter(URL.id == url_id).first()
+        return self.db.query(URL).filter(URL.id == url_id, URL.deleted_at.is_(None)).first()
     
     def update_url(self, url_id: int, url_data: URLUpdate) -> Optional[URL]:
         """Update URL"""
@@ -98,21 +190,27 @@ class URLService:
         
         # Update cache
         self._cache_url(url)
+        self._invalidate_local(url.short_code)
         
         return url
     
     def delete_url(self, url_id: int) -> bool:
-        """Delete URL"""
+        """Soft-delete URL; its clicks are purged in the background"""
         url = self.get_url_by_id(url_id)
         if not url:
             return False
         
-        # Remove from cache
-        cache_key = f"url:{url.short_code}"
-        self.redis.delete(cache_key)
-        
-        self.db.delete(url)
+        short_code = url.short_code
+        url.deleted_at = datetime.utcnow()
         self.db.commit()
+        
+        # Replace the cached URL once the delete is visible to other readers;
+        # the filter can't forget the code, so cache the miss instead
+        if settings.negative_cache_ttl > 0:
+            self._cache_not_found(short_code)
+        else:
+            self.cache.delete(short_code)
+        self._invalidate_local(short_code)
         return True
     
     def record_click(self, url_id: int, click_data: URLClickCreate) -> URLClick:
@@ -123,87 +221,116 @@ class URLService:
             user_agent=click_data.user_agent,
             referer=click_data.referer,
             country=click_data.country,
-            city=click_data.city
+            city=click_data.city,
+            # Set client-side: refreshing a server default would look the
+            # click up by id alone, probing every url_clicks partition
+            clicked_at=click_data.clicked_at or datetime.utcnow()
         )
+        clicked_at = click.clicked_at
         
         self.db.add(click)
         self.db.commit()
-        self.db.refresh(click)
         
         # Update click counter in Redis
         click_key = f"clicks:{url_id}"
         self.redis.increment(click_key)
         
+        # Track unique visitors
+        if self.visitor_counter is not None and click_data.ip_address:
+            pipe = self.redis.pipeline()
+            self.visitor_counter.add_commands(pipe, url_id, click_data.ip_address, clicked_at)
+            pipe.execute()
+        
         return click
     
+    def record_clicks(
+        self,
+        clicks: List[Tuple[int, URLClickCreate]],
+        increment_counters: bool = True
+    ) -> int:
+        """Record a batch of clicks with one multi-row insert and one commit"""
+        if not clicks:
+            return 0
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                "url_id": url_id,
+                "ip_address": click_data.ip_address,
+                "user_agent": click_data.user_agent,
+                "referer": click_data.referer,
+                "country": click_data.country,
+                "city": click_data.city,
+                "clicked_at": click_data.clicked_at or now
+            }
+            for url_id, click_data in clicks
+        ]
+        
+        self.db.execute(insert(URLClick), rows)
+        self.db.commit()
+        
+        if not increment_counters:
+            return len(rows)
+        
+        # Update click counters and visitor sketches in Redis in a single round trip
+        counts = {}
+        pipe = self.redis.pipeline()
+        for url_id, click_data in clicks:
+            counts[url_id] = counts.get(url_id, 0) + 1
+            if self.visitor_counter is not None:
+                self.visitor_counter.add_commands(pipe, url_id, click_data.ip_address, click_data.clicked_at or now)
+        for url_id, count in counts.items():
+            pipe.incrby(f"clicks:{url_id}", count)
+        pipe.execute()
+        
+        return len(rows)
+    
     def get_url_analytics(self, url_id: int) -> dict:
-        """Get analytics for a URL"""
-        url = self.get_url_by_id(url_id)
+        """Get analytics for a URL from the click rollups, on a replica if configured"""
+        url = self.read_db.query(URL).filter(URL.id == url_id, URL.deleted_at.is_(None)).first()
         if not url:
             return {}
         
-        # Get total clicks
-        total_clicks = self.db.query(URLClick).filter(URLClick.url_id == url_id).count()
-        
-        # Get unique clicks (by IP)
-        unique_clicks = self.db.query(URLClick.ip_address).filter(
-            URLClick.url_id == url_id
-        ).distinct().count()
-        
-        # Get clicks by day (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        clicks_by_day = self.db.query(
-            func.date(URLClick.clicked_at).label('date'),
-            func.count(URLClick.id).label('count')
-        ).filter(
-            URLClick.url_id == url_id,
-            URLClick.clicked_at >= thirty_days_ago
-        ).group_by(
-            func.date(URLClick.clicked_at)
-        ).all()
-        
-        # Get clicks by country
-        clicks_by_country = self.db.query(
-            URLClick.country,
-            func.count(URLClick.id).label('count')
-        ).filter(
-            URLClick.url_id == url_id,
-            URLClick.country.isnot(None)
-        ).group_by(URLClick.country).all()
-        
-        # Get recent clicks
-        recent_clicks = self.db.query(URLClick).filter(
-            URLClick.url_id == url_id
-        ).order_by(URLClick.clicked_at.desc()).limit(10).all()
-        
-        return {
-            "total_clicks": total_clicks,
-            "unique_clicks": unique_clicks,
-            "clicks_by_day": [{"date": str(day.date), "count": day.count} for day in clicks_by_day],
-            "clicks_by_country": [{"country": country.country, "count": country.count} for country in clicks_by_country],
-            "recent_clicks": recent_clicks
-        }
+        return AnalyticsService(self.read_db, self.visitor_counter).get_url_analytics(url_id)
     
     def _cache_url(self, url: URL):
         """Cache URL in Redis"""
-        cache_key = f"url:{url.short_code}"
-        url_data = {
-            "id": url.id,
-            "original_url": url.original_url,
-            "short_code": url.short_code,
-            "custom_alias": url.custom_alias,
-            "title": url.title,
-            "description": url.description,
-            "is_active": url.is_active,
-            "expires_at": url.expires_at.isoformat() if url.expires_at else None,
-            "created_at": url.created_at.isoformat(),
-            "updated_at": url.updated_at.isoformat()
-        }
-        
-        import json
-        self.redis.set(cache_key, json.dumps(url_data), ex=3600)  # Cache for 1 hour
+        self.cache.set(url.short_code, self._cache_payload(url), self.ttl_policy.ttl_for(url.short_code, url.expires_at))
+    
+    def _cache_urls(self, urls: List[URL]):
+        """Cache many URLs in Redis in one pipeline"""
+        self.cache.set_many([
+            (url.short_code, self._cache_payload(url), self.ttl_policy.ttl_for(url.short_code, url.expires_at))
+            for url in urls
+        ])
+    
+    def _cache_not_found(self, short_code: str):
+        """Remember a miss briefly, for codes the filter couldn't rule out"""
+        if settings.negative_cache_ttl > 0:
+            self.cache.set(short_code, NOT_FOUND, settings.negative_cache_ttl)
+    
+    def _might_exist(self, short_codes: List[str]) -> List[bool]:
+        """False for codes the filter has definitely never seen"""
+        if self.short_code_filter is None or not short_codes:
+            return [True] * len(short_codes)
+        return self.short_code_filter.might_contain_many(short_codes)
+    
+    def _remember_codes(self, short_codes: List[str]):
+        """Add new codes to the filter"""
+        if self.short_code_filter is not None:
+            self.short_code_filter.add(short_codes)
+    
+    def _cache_payload(self, url: URL) -> bytes:
+        """Cache entry holding only the redirect fields"""
+        return encode_record(url)
+    
+    def _invalidate_local(self, short_code: str):
+        """Drop URL from the local cache of this and every other worker"""
+        if self.local_cache is not None:
+            self.local_cache.delete(short_code)
+            publish_invalidation(self.redis, short_code)
     
-    def is_url_expired(self, url: URL) -> bool:
+    def is_url_expired(self, url: Union[URL, RedirectRecord]) -> bool:
         """Check if URL has expired"""
         if not url.expires_at:
             return False
@@ -1,48 +1,198 @@
+import hashlib
 import string
-from typing import Optional
+from typing import Iterable, List, Optional
+from app.core.config import settings
+
+_ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+_BASE = len(_ALPHABET)
+
+# Lookup tables: value of every digit, and every two-digit pair for encoding
+_DIGIT_VALUES = {char: value for value, char in enumerate(_ALPHABET)}
+_PAIRS = [high + low for high in _ALPHABET for low in _ALPHABET]
+_PAIR_BASE = _BASE * _BASE
+
+# Custom aliases may also use hyphens and underscores
+_ALIAS_CHARACTERS = frozenset(_ALPHABET + "-_")
+
+
+def _to_base62(num: int) -> str:
+    if num < _BASE:
+        if num < 0:
+            raise ValueError("Cannot encode a negative number")
+        return _ALPHABET[num]
+    
+    # Two digits per division
+    chunks = []
+    while num:
+        num, remainder = divmod(num, _PAIR_BASE)
+        chunks.append(_PAIRS[remainder])
+    chunks.reverse()
+    return "".join(chunks).lstrip("0")
+
+
+def _from_base62(encoded: str) -> int:
+    num = 0
+    digit_values = _DIGIT_VALUES
+    try:
+        for char in encoded:
+            num = num * _BASE + digit_values[char]
+    except KeyError as e:
+        raise ValueError(f"Invalid character '{e.args[0]}' in encoded string") from None
+    return num
+
+
+class FeistelPermutation:
+    """
+    Keyed bijection on [0, 2**bits) built from a balanced Feistel network.
+    
+    Used to turn sequential counter values into non-sequential IDs without
+    collision checks: every input maps to a distinct output and the mapping
+    can be inverted with the same key.
+    """
+    
+    _MULTIPLIER = 0x9E3779B97F4A7C15
+    _MASK_64 = (1 << 64) - 1
+    
+    def __init__(self, key: bytes, bits: int = 34, rounds: int = 4):
+        if bits % 2 or bits < 2:
+            raise ValueError("Bit width must be a positive even number")
+        self.bits = bits
+        self.max_value = 1 << bits
+        self._half_bits = bits // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        
+        # One 64-bit round key per round, derived from the secret
+        digest = hashlib.blake2b(key, digest_size=8 * rounds, person=b"short-code").digest()
+        self._round_keys = [
+            int.from_bytes(digest[i * 8:(i + 1) * 8], "big") for i in range(rounds)
+        ]
+        
+        # Shortest base62 length that can hold every value
+        self.code_length = 1
+        while _BASE ** self.code_length < self.max_value:
+            self.code_length += 1
+    
+    def _round(self, half: int, round_key: int) -> int:
+        x = ((half ^ round_key) * self._MULTIPLIER) & self._MASK_64
+        return (x >> (64 - self._half_bits)) & self._half_mask
+    
+    def permute(self, value: int) -> int:
+        if not 0 <= value < self.max_value:
+            raise ValueError(f"Value {value} out of range for a {self.bits}-bit permutation")
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_key in self._round_keys:
+            left, right = right, left ^ self._round(right, round_key)
+        return (left << self._half_bits) | right
+    
+    def invert(self, value: int) -> int:
+        if not 0 <= value < self.max_value:
+            raise ValueError(f"Value {value} out of range for a {self.bits}-bit permutation")
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_key in reversed(self._round_keys):
+            left, right = right ^ self._round(left, round_key), left
+        return (left << self._half_bits) | right
 
 
 class URLEncoder:
     """Base62 URL encoder for generating short URLs"""
     
     # Base62 alphabet: 0-9, a-z, A-Z
-    ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
-    BASE = len(ALPHABET)
+    ALPHABET = _ALPHABET
+    BASE = _BASE
     
     @classmethod
-    def encode(cls, num: int) -> str:
-        """Encode a number to base62 string"""
-        if num == 0:
-            return cls.ALPHABET[0]
-        
-        encoded = ""
-        while num > 0:
-            encoded = cls.ALPHABET[num % cls.BASE] + encoded
-            num //= cls.BASE
+    def encode(
+        cls,
+        num: int,
+        permutation: Optional[FeistelPermutation] = None,
+        width: Optional[int] = None
+    ) -> str:
+        """
+        Encode a number to base62 string.
         
+        With a permutation the number is permuted first and the code is padded
+        to the permutation's fixed length. `width` left-pads with "0".
+        """
+        if permutation is not None:
+            num = permutation.permute(num)
+            width = max(width or 0, permutation.code_length)
+        encoded = _to_base62(num)
+        if width and len(encoded) < width:
+            encoded = encoded.rjust(width, "0")
         return encoded
     
     @classmethod
-    def decode(cls, encoded: str) -> int:
-        """Decode a base62 string to number"""
-        num = 0
-        for char in encoded:
-            if char not in cls.ALPHABET:
-                raise ValueError(f"Invalid character '{char}' in encoded string")
-            num = num * cls.BASE + cls.ALPHABET.index(char)
+    def decode(cls, encoded: str, permutation: Optional[FeistelPermutation] = None) -> int:
+        """Decode a base62 string to number, inverting the permutation if given"""
+        if permutation is not None and len(encoded) != permutation.code_length:
+            raise ValueError(f"Encoded string must be {permutation.code_length} characters long")
+        
+        num = _from_base62(encoded)
+        
+        if permutation is not None:
+            return permutation.invert(num)
         return num
     
+    @classmethod
+    def encode_many(
+        cls,
+        nums: Iterable[int],
+        permutation: Optional[FeistelPermutation] = None,
+        width: Optional[int] = None
+    ) -> List[str]:
+        """Encode many numbers in one call, e.g. for bulk imports and backfills"""
+        if permutation is not None:
+            nums = map(permutation.permute, nums)
+            width = max(width or 0, permutation.code_length)
+        
+        codes = list(map(_to_base62, nums))
+        if width:
+            codes = [code.rjust(width, "0") for code in codes]
+        return codes
+    
+    @classmethod
+    def decode_many(
+        cls,
+        codes: Iterable[str],
+        permutation: Optional[FeistelPermutation] = None
+    ) -> List[int]:
+        """Decode many base62 strings in one call"""
+        if permutation is not None:
+            return [cls.decode(code, permutation) for code in codes]
+        return list(map(_from_base62, codes))
+    
     @classmethod
     def is_valid_custom_alias(cls, alias: str) -> bool:
         """Check if custom alias contains only valid characters"""
-        return all(char in cls.ALPHABET for char in alias)
+        return _ALIAS_CHARACTERS.issuperset(alias)
+
+
+_permutation: Optional[FeistelPermutation] = None
+
+
+def get_permutation() -> FeistelPermutation:
+    """Get the permutation for short_code_mode="permuted", keyed from Settings"""
+    global _permutation
+    if _permutation is None:
+        secret = settings.short_code_secret or settings.secret_key
+        _permutation = FeistelPermutation(secret.encode(), bits=settings.short_code_bits)
+    return _permutation
 
 
 def generate_short_code(counter: int) -> str:
     """Generate a short code from a counter value"""
+    if settings.short_code_mode == "permuted":
+        return URLEncoder.encode(counter, permutation=get_permutation())
     return URLEncoder.encode(counter)
 
 
+def generate_short_codes(counters: List[int]) -> List[str]:
+    """Generate short codes for many counter values at once"""
+    if settings.short_code_mode == "permuted":
+        return URLEncoder.encode_many(counters, permutation=get_permutation())
+    return URLEncoder.encode_many(counters)
+
+
 def validate_url(url: str) -> bool:
     """Basic URL validation"""
     import re
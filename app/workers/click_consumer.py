@@ -0,0 +1,162 @@
+"""
+Click stream consumer.
+
+Reads clicks appended by the redirect handler (CLICK_RECORDING_MODE=stream)
+from a Redis stream consumer group and bulk-loads them into url_clicks. Entries
+are acknowledged only after the batch is committed, so a crashed consumer's
+pending entries are reclaimed by another consumer after CLICK_CONSUMER_CLAIM_IDLE_MS.
+Delivery is at-least-once. Run as many consumers as needed; they share the group:
+
+    python -m app.workers.click_consumer
+"""
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Callable, List, Optional, Tuple
+import redis
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.redis_client import RedisClient, get_redis_client
+from app.services.click_stream import decode_click
+from app.services.url_service import URLService
+
+logger = logging.getLogger(__name__)
+
+
+class ClickStreamConsumer:
+    """Consumer group member that moves clicks from the stream into Postgres"""
+    
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        session_factory: Callable[[], Session] = SessionLocal,
+        stream: Optional[str] = None,
+        group: Optional[str] = None,
+        consumer_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        block_ms: Optional[int] = None,
+        claim_idle_ms: Optional[int] = None
+    ):
+        self.redis = redis_client
+        self.session_factory = session_factory
+        self.stream = stream or settings.click_stream_key
+        self.group = group or settings.click_stream_group
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or settings.click_consumer_batch_size
+        self.block_ms = block_ms or settings.click_consumer_block_ms
+        self.claim_idle_ms = claim_idle_ms or settings.click_consumer_claim_idle_ms
+        
+        self._claim_cursor = "0-0"
+        self._running = False
+        
+        # Counters
+        self.processed = 0
+        self.malformed = 0
+        self.deleted = 0
+        self.claimed = 0
+    
+    def ensure_group(self):
+        """Create the consumer group (and stream) if it doesn't exist yet"""
+        try:
+            self.redis.redis_client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    def run(self):
+        """Consume until stopped by SIGINT/SIGTERM"""
+        self.ensure_group()
+        self._running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        
+        logger.info("Consumer %s reading %s as group %s", self.consumer_name, self.stream, self.group)
+        while self._running:
+            try:
+                self.run_once()
+            except Exception:
+                # Unacked entries stay pending and are reclaimed once idle
+                logger.exception("Failed to process click batch")
+                time.sleep(1)
+    
+    def run_once(self) -> int:
+        """Process one batch; returns the number of clicks written"""
+        # Recover entries left pending by consumers that died mid-batch
+        entries = self._claim_stale()
+        if not entries:
+            entries = self._read_new()
+        if not entries:
+            return 0
+        return self._process(entries)
+    
+    def _claim_stale(self) -> List[Tuple[str, dict]]:
+        result = self.redis.redis_client.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer_name,
+            min_idle_time=self.claim_idle_ms,
+            start_id=self._claim_cursor,
+            count=self.batch_size
+        )
+        self._claim_cursor, entries = result[0], result[1]
+        self.claimed += len(entries)
+        return entries
+    
+    def _read_new(self) -> List[Tuple[str, dict]]:
+        response = self.redis.redis_client.xreadgroup(
+            self.group,
+            self.consumer_name,
+            {self.stream: ">"},
+            count=self.batch_size,
+            block=self.block_ms
+        )
+        if not response:
+            return []
+        return response[0][1]
+    
+    def _process(self, entries: List[Tuple[str, dict]]) -> int:
+        clicks = []
+        for entry_id, fields in entries:
+            if not fields:
+                # Redis 6.2 XAUTOCLAIM returns entries trimmed from the stream
+                # with nil fields; ack them so they stop being reclaimed
+                logger.warning("Dropping click entry %s deleted from the stream", entry_id)
+                self.deleted += 1
+                continue
+            try:
+                clicks.append(decode_click(fields))
+            except (KeyError, ValueError):
+                logger.error("Dropping malformed click entry %s: %r", entry_id, fields)
+                self.malformed += 1
+        
+        if clicks:
+            db = self.session_factory()
+            try:
+                # Counters were already bumped by the producer
+                URLService(db, self.redis).record_clicks(clicks, increment_counters=False)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        
+        # Ack only after the batch is committed
+        self.redis.redis_client.xack(self.stream, self.group, *[entry_id for entry_id, _ in entries])
+        self.processed += len(clicks)
+        return len(clicks)
+    
+    def _stop(self, signum, frame):
+        logger.info("Stopping consumer %s", self.consumer_name)
+        self._running = False
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    ClickStreamConsumer(get_redis_client()).run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
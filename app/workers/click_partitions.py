@@ -0,0 +1,61 @@
+"""
+Click partition maintenance job.
+
+Creates url_clicks partitions ahead of time and drops the ones past the
+retention window. Run it alongside the rollup job. Clicks that arrive for a
+day with no partition go to url_clicks_default and are moved out (with a
+warning) once their partition is created; keep the premake window longer
+than any expected outage so that stays rare:
+
+    python -m app.workers.click_partitions
+"""
+import logging
+import signal
+import time
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.click_partitions import ClickPartitionManager
+
+logger = logging.getLogger(__name__)
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    _running = False
+
+
+def run():
+    """Maintain partitions until stopped by SIGINT/SIGTERM"""
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    
+    while _running:
+        db = SessionLocal()
+        try:
+            ClickPartitionManager(
+                db,
+                interval=settings.click_partition_interval,
+                premake_days=settings.click_partition_premake_days,
+                retention_days=settings.click_retention_days
+            ).run()
+        except Exception:
+            logger.exception("Click partition maintenance failed")
+            db.rollback()
+        finally:
+            db.close()
+        
+        # Sleep in short steps so a stop signal is handled promptly
+        deadline = time.monotonic() + settings.click_partition_maintenance_interval
+        while _running and time.monotonic() < deadline:
+            time.sleep(1.0)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Click rollup job.
+
+Folds new url_clicks rows into the url_click_rollups aggregates read by the
+analytics endpoint, once they are CLICK_ROLLUP_SETTLE_SECONDS old. Safe to run
+more than one instance (they serialize on the watermark row), but one is
+enough:
+
+    python -m app.workers.click_rollup
+"""
+import logging
+import signal
+import time
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.analytics_service import AnalyticsService
+from app.services.unique_visitors import get_visitor_counter
+
+logger = logging.getLogger(__name__)
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    _running = False
+
+
+def run():
+    """Roll up clicks until stopped by SIGINT/SIGTERM"""
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    visitor_counter = get_visitor_counter()
+    
+    while _running:
+        db = SessionLocal()
+        try:
+            processed = AnalyticsService(db, visitor_counter).rollup_pending(
+                settings.click_rollup_batch_size, settings.click_rollup_settle_seconds
+            )
+        except Exception:
+            logger.exception("Click rollup failed")
+            db.rollback()
+            processed = 0
+        finally:
+            db.close()
+        
+        if processed:
+            logger.info("Rolled up %d clicks", processed)
+        # Keep going while there is a backlog, otherwise wait for new clicks
+        if processed < settings.click_rollup_batch_size:
+            time.sleep(settings.click_rollup_interval)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
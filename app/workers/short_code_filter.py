@@ -0,0 +1,48 @@
+"""
+Short code filter rebuild job.
+
+Builds the Bloom filter of existing short codes from the database and swaps
+it in. Run it once before enabling SHORT_CODE_FILTER_ENABLED, and then
+periodically (e.g. daily) so deleted codes stop matching:
+
+    python -m app.workers.short_code_filter
+"""
+import logging
+import sys
+import time
+from app.cache.short_code_filter import get_short_code_filter
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def run() -> int:
+    short_code_filter = get_short_code_filter()
+    if short_code_filter is None:
+        logger.error("Short code filter is disabled (SHORT_CODE_FILTER_ENABLED=false)")
+        return 1
+    
+    db = SessionLocal()
+    try:
+        start_time = time.monotonic()
+        added = short_code_filter.rebuild(db)
+    finally:
+        db.close()
+    
+    if added is None:
+        logger.warning("Another rebuild is in progress")
+        return 1
+    logger.info(
+        "Rebuilt short code filter with %d codes (%d bits, %d hashes) in %.1fs",
+        added, short_code_filter.bits, short_code_filter.hashes, time.monotonic() - start_time
+    )
+    return 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    sys.exit(run())
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
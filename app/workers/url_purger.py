@@ -0,0 +1,65 @@
+"""
+Deleted URL purge job.
+
+Removes soft-deleted URLs with their clicks and analytics rows, in bounded
+chunks. One instance is enough:
+
+    python -m app.workers.url_purger
+"""
+import logging
+import signal
+import time
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.redis_client import get_redis_client
+from app.services.url_purger import URLPurger
+
+logger = logging.getLogger(__name__)
+
+# Deleted URLs picked up per pass
+PURGE_BATCH = 100
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    _running = False
+
+
+def run():
+    """Purge deleted URLs until stopped by SIGINT/SIGTERM"""
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    redis_client = get_redis_client()
+    
+    while _running:
+        db = SessionLocal()
+        try:
+            purged = URLPurger(
+                db,
+                redis_client,
+                chunk_size=settings.url_purge_chunk_size,
+                grace_seconds=settings.url_purge_grace_seconds
+            ).purge_pending(PURGE_BATCH)
+        except Exception:
+            logger.exception("URL purge failed")
+            db.rollback()
+            purged = 0
+        finally:
+            db.close()
+        
+        if purged:
+            logger.info("Purged %d deleted URLs", purged)
+        # Keep going while there is a backlog, otherwise wait for new deletions
+        if purged < PURGE_BATCH:
+            time.sleep(settings.url_purge_interval)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Redirect throughput under concurrency: the previous async routes over the
+blocking URLService versus the AsyncURLService path.
+
+Redis is simulated with a fixed per-round-trip latency (a cache hit plus a
+pipelined click publish per redirect, as in "stream" click recording), so
+the benchmark needs no servers and only measures how well I/O overlaps.
+
+Run with:
+    python -m tests.bench_async
+"""
+import asyncio
+import time
+from unittest.mock import patch
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.responses import RedirectResponse
+from app.api.deps import get_async_url_service
+from app.api.urls import router
+from app.cache.redirect_record import RedirectRecord, decode_record, encode_record
+from app.schemas.url import URLClickCreate
+from app.services.async_url_service import AsyncURLService
+from app.services.click_stream import publish_click
+from app.services.url_service import URLService
+
+LATENCY = 0.002  # Seconds per Redis round trip
+CONCURRENCY = 50
+REQUESTS = 500
+
+CACHED_URL = encode_record(RedirectRecord(1, "abc123", "https://example.com/", True, None))
+
+
+class QueuedPipeline:
+    """Pipeline stand-in that accepts any queued command"""
+    
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+class BlockingPipeline(QueuedPipeline):
+    def execute(self):
+        time.sleep(LATENCY)
+
+
+class AsyncPipeline(QueuedPipeline):
+    async def execute(self):
+        await asyncio.sleep(LATENCY)
+
+
+class BlockingRedis:
+    def get_bytes(self, key):
+        time.sleep(LATENCY)
+        return CACHED_URL
+    
+    def pipeline(self, transaction=False):
+        return BlockingPipeline()
+
+
+class AsyncRedis:
+    async def get_with_ttl(self, key):
+        await asyncio.sleep(LATENCY)
+        return CACHED_URL, 3_600_000
+    
+    async def expire(self, key, seconds):
+        await asyncio.sleep(LATENCY)
+    
+    def pipeline(self, transaction=False):
+        return AsyncPipeline()
+
+
+def legacy_app() -> FastAPI:
+    """The previous redirect route: async def over the blocking service"""
+    legacy_router = APIRouter()
+    
+    @legacy_router.get("/{short_code}")
+    async def redirect_to_original_url(
+        short_code: str,
+        request: Request,
+        url_service: URLService = Depends(lambda: URLService(None, BlockingRedis()))
+    ):
+        url = decode_record(short_code, url_service.cache.get(short_code))
+        click_data = URLClickCreate(
+            ip_address=request.client.host,
+            user_agent=request.headers.get("user-agent"),
+            referer=request.headers.get("referer")
+        )
+        publish_click(url_service.redis, url.id, click_data)
+        return RedirectResponse(url=url.original_url, status_code=302)
+    
+    app = FastAPI()
+    app.include_router(legacy_router)
+    return app
+
+
+def async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_url_service] = lambda: AsyncURLService(None, AsyncRedis())
+    return app
+
+
+async def request(app):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/abc123",
+        "raw_path": b"/abc123",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"short.ly"), (b"user-agent", b"bench")],
+        "client": ("203.0.113.7", 50000),
+        "server": ("short.ly", 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+    
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    
+    await app(scope, receive, send)
+    assert status == [302]
+
+
+async def run(app) -> float:
+    """Serve REQUESTS redirects, CONCURRENCY at a time; returns requests/second"""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    
+    async def limited():
+        async with semaphore:
+            await request(app)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def bench(label: str, app) -> float:
+    throughput = asyncio.run(run(app))
+    print(f"{label:<40} {throughput:>10.0f} req/s")
+    return throughput
+
+
+def main():
+    print(
+        f"{REQUESTS} redirects, {CONCURRENCY} concurrent, "
+        f"{LATENCY * 1000:.0f}ms per Redis round trip, one worker"
+    )
+    with patch("app.api.urls.settings.click_recording_mode", "stream"):
+        legacy = bench("async def + blocking URLService (legacy)", legacy_app())
+        current = bench("AsyncURLService", async_app())
+    print(f"{'':<40} {current / legacy:>10.1f}x throughput")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
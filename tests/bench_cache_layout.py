@@ -0,0 +1,94 @@
+"""
+Redis memory per cached URL for the "keys" and "buckets" redirect cache
+layouts.
+
+Writes URLS entries under a scratch prefix for each layout against the Redis
+at REDIS_URL, measures the change in used_memory, and deletes them again.
+Buckets are sized for ENTRIES_PER_BUCKET URLs each. Bucketed entries only get
+the compact listpack encoding if they fit hash-max-listpack-value; the
+benchmark reports the server's setting and the encoding buckets ended up with.
+
+Run with:
+    python -m tests.bench_cache_layout
+"""
+import random
+import string
+import redis
+from app.cache.redirect_cache import RedirectCache
+from app.cache.redirect_record import RedirectRecord, encode_record
+from app.db.redis_client import RedisClient
+
+URLS = 100_000
+ENTRIES_PER_BUCKET = 100
+CHUNK = 1000
+TTL = 3600
+
+
+def sample_entries() -> list:
+    random.seed(0)
+    entries = []
+    for num in range(URLS):
+        path = "".join(random.choice(string.ascii_lowercase + "/-") for _ in range(random.randint(10, 80)))
+        record = RedirectRecord(num + 1, f"{num:07d}", f"https://example.com/{path}", True, None)
+        entries.append((record.short_code, encode_record(record), TTL))
+    return entries
+
+
+def used_memory(client: redis.Redis) -> int:
+    return client.info("memory")["used_memory"]
+
+
+def measure(redis_client: RedisClient, layout: str, entries: list) -> float:
+    """Bytes of Redis memory per cached URL"""
+    client = redis_client.redis_client
+    cache = RedirectCache(
+        redis_client,
+        layout=layout,
+        buckets=max(1, URLS // ENTRIES_PER_BUCKET),
+        max_ttl=TTL,
+        key_prefix=f"bench:cache_layout:{layout}"
+    )
+    keys = {cache.key(short_code) for short_code, _, _ in entries}
+    try:
+        before = used_memory(client)
+        for start in range(0, len(entries), CHUNK):
+            cache.set_many(entries[start:start + CHUNK])
+        per_url = (used_memory(client) - before) / len(entries)
+        encoding = client.object("encoding", next(iter(keys)))
+        print(f"{layout + ' (' + encoding + ')':<40} {per_url:>10.0f} bytes/URL")
+        return per_url
+    finally:
+        keys = list(keys)
+        for start in range(0, len(keys), CHUNK):
+            client.delete(*keys[start:start + CHUNK])
+
+
+def main():
+    entries = sample_entries()
+    redis_client = RedisClient()
+    client = redis_client.redis_client
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        print("Redis not reachable at REDIS_URL; nothing to measure")
+        return
+    
+    largest = max(len(value) for _, value, _ in entries) + 4
+    try:
+        listpack_value = int(client.config_get("hash-max-listpack-value")["hash-max-listpack-value"])
+    except redis.ResponseError:
+        listpack_value = None
+    print(
+        f"{URLS} URLs, {ENTRIES_PER_BUCKET} per bucket, largest bucketed value {largest} bytes, "
+        f"hash-max-listpack-value {listpack_value if listpack_value is not None else 'unknown'}"
+    )
+    if listpack_value is not None and listpack_value < largest:
+        print(f"Raise hash-max-listpack-value to at least {largest} for listpack-encoded buckets")
+    
+    keys = measure(redis_client, "keys", entries)
+    buckets = measure(redis_client, "buckets", entries)
+    print(f"{'':<40} {keys / buckets:>10.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
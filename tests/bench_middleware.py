@@ -0,0 +1,183 @@
+"""
+Per-request overhead of the middleware stack on a redirect.
+
+Requests are driven straight through the ASGI app (no sockets). The first
+runs use a limiter that answers instantly, so the numbers are middleware cost
+only. If the Redis at REDIS_URL is reachable, EdgeMiddleware is then run with
+the real GCRA limiter, one request at a time and CONCURRENCY at a time; with
+the limiter awaited instead of blocking the event loop, concurrent requests
+overlap their Redis round trips.
+
+Run with:
+    python -m tests.bench_middleware
+"""
+import asyncio
+import time
+import redis
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+from app.core.middleware import EdgeMiddleware
+from app.core.rate_limiter import (
+    AsyncRateLimiter, RateLimitPolicy, RateLimitPolicyTable, RateLimitResult, rate_limit_key
+)
+from app.core.security_middleware import SECURITY_HEADERS
+from app.db.redis_client import AsyncRedisClient, RedisClient
+
+REQUESTS = 5000
+REPEAT = 5
+CONCURRENCY = 50
+
+
+class InstantLimiter:
+    """Limiter stand-in that always allows"""
+    
+    result = RateLimitResult(True, 600, 599, 0.1, 0.0)
+    
+    async def check(self, key, limit, window=60, burst=None):
+        return self.result
+
+
+POLICIES = RateLimitPolicyTable(
+    [RateLimitPolicy("redirect", r"^/api/v1/urls/[^/]+$", frozenset({"GET"}), 600, 60, 1200)],
+    default=RateLimitPolicy("default", "", limit=100)
+)
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/api/v1/urls/{short_code}")
+    async def redirect(short_code: str):
+        return RedirectResponse("https://example.com/", status_code=301)
+    
+    return app
+
+
+def legacy_app() -> FastAPI:
+    """The previous stack of three @app.middleware("http") functions"""
+    app = make_app()
+    limiter = InstantLimiter()
+    
+    async def security_middleware(request: Request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+    
+    async def rate_limit_middleware(request: Request, call_next):
+        policy = POLICIES.match(request.method, request.url.path, request.headers.get("X-API-Key"))
+        result = await limiter.check(
+            rate_limit_key(policy, request.client.host), policy.limit, policy.window, policy.burst
+        )
+        if not result.allowed:
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        response = await call_next(request)
+        response.headers.update(result.headers())
+        return response
+    
+    async def add_process_time_header(request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        return response
+    
+    app.middleware("http")(security_middleware)
+    app.middleware("http")(rate_limit_middleware)
+    app.middleware("http")(add_process_time_header)
+    return app
+
+
+def edge_app(limiter=None, policies: RateLimitPolicyTable = POLICIES) -> FastAPI:
+    app = make_app()
+    app.add_middleware(EdgeMiddleware, limiter=limiter or InstantLimiter(), policies=policies)
+    return app
+
+
+async def drive(app, requests: int, concurrency: int = 1) -> float:
+    """Send requests through the ASGI app and return seconds per request"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/urls/abc123",
+        "raw_path": b"/api/v1/urls/abc123",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"short.ly"), (b"user-agent", b"bench")],
+        "client": ("203.0.113.7", 50000),
+        "server": ("short.ly", 80),
+    }
+    
+    request_message = {"type": "http.request", "body": b"", "more_body": False}
+    disconnect = asyncio.Event()
+    
+    def make_receive():
+        messages = [request_message]
+        
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Starlette listens for a disconnect once the body is read
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+        
+        return receive
+    
+    statuses = []
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+    
+    async def worker(count: int):
+        for _ in range(count):
+            await app(dict(scope), make_receive(), send)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    assert statuses == [301] * (requests // concurrency * concurrency)
+    return elapsed / requests
+
+
+def bench(label: str, app, concurrency: int = 1) -> float:
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(drive(app, 100, concurrency))  # Warm up
+        best = min(loop.run_until_complete(drive(app, REQUESTS, concurrency)) for _ in range(REPEAT))
+    finally:
+        loop.close()
+    print(f"{label:<40} {best * 1e6:>10.1f} us/request")
+    return best
+
+
+def redis_app() -> FastAPI:
+    """EdgeMiddleware with the GCRA limiter, with a quota the benchmark can't exhaust"""
+    policies = RateLimitPolicyTable([], default=RateLimitPolicy("bench", "", limit=10**9))
+    return edge_app(AsyncRateLimiter(AsyncRedisClient()), policies)
+
+
+def main():
+    print(f"{REQUESTS} redirects per run, best of {REPEAT}")
+    bare = bench("no middleware", make_app())
+    legacy = bench("@app.middleware('http') x3 (legacy)", legacy_app())
+    edge = bench("EdgeMiddleware", edge_app())
+    print(f"{'overhead (legacy)':<40} {(legacy - bare) * 1e6:>10.1f} us/request")
+    print(f"{'overhead (EdgeMiddleware)':<40} {(edge - bare) * 1e6:>10.1f} us/request")
+    print(f"{'':<40} {legacy / edge:>10.1f}x faster per request")
+    
+    try:
+        RedisClient().redis_client.ping()
+    except redis.ConnectionError:
+        print("Redis not reachable at REDIS_URL; skipping the Redis limiter runs")
+        return
+    # A fresh app per run, as redis.asyncio connections belong to one event loop
+    serial = bench("EdgeMiddleware + Redis limiter", redis_app())
+    concurrent = bench(f"  ... {CONCURRENCY} concurrent requests", redis_app(), CONCURRENCY)
+    print(f"{'':<40} {serial / concurrent:>10.1f}x throughput with concurrency")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
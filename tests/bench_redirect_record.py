@@ -0,0 +1,132 @@
+"""
+Redirect cache entries: the previous JSON payload decoded into a URL model
+versus the binary RedirectRecord.
+
+Payload sizes are always reported. If Redis is reachable at REDIS_URL, the
+benchmark also writes SAMPLE_SIZE entries of each kind under a scratch
+prefix, reports MEMORY USAGE per key, and deletes them again.
+
+Run with:
+    python -m tests.bench_redirect_record
+"""
+import json
+import random
+import string
+import timeit
+from datetime import datetime, timedelta
+import redis
+from app.cache.redirect_record import decode_record, encode_record
+from app.core.config import settings
+from app.models.url import URL
+
+SAMPLE_SIZE = 10000
+REPEAT = 5
+KEY_PREFIX = "bench:redirect_record"
+
+
+def legacy_payload(url: URL) -> str:
+    """The JSON cache entry written before RedirectRecord"""
+    return json.dumps({
+        "id": url.id,
+        "original_url": url.original_url,
+        "short_code": url.short_code,
+        "custom_alias": url.custom_alias,
+        "title": url.title,
+        "description": url.description,
+        "is_active": url.is_active,
+        "expires_at": url.expires_at.isoformat() if url.expires_at else None,
+        "created_at": url.created_at.isoformat(),
+        "updated_at": url.updated_at.isoformat()
+    })
+
+
+def legacy_decode(payload: str) -> URL:
+    url_data = json.loads(payload)
+    for field in ("expires_at", "created_at", "updated_at"):
+        if url_data.get(field):
+            url_data[field] = datetime.fromisoformat(url_data[field])
+    return URL(**url_data)
+
+
+def sample_urls() -> list:
+    random.seed(0)
+    now = datetime(2026, 1, 1)
+    urls = []
+    for num in range(SAMPLE_SIZE):
+        path = "".join(random.choice(string.ascii_lowercase + "/-") for _ in range(random.randint(10, 80)))
+        urls.append(URL(
+            id=random.randrange(1, 2**34),
+            original_url=f"https://example.com/{path}",
+            short_code=f"{num:07d}",
+            custom_alias=None,
+            title="Example page" if num % 2 else None,
+            description=None,
+            is_active=True,
+            expires_at=now + timedelta(days=30) if num % 4 == 0 else None,
+            created_at=now,
+            updated_at=now
+        ))
+    return urls
+
+
+def bench(label: str, func, ops: int) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=REPEAT)) / ops
+    print(f"{label:<40} {best * 1e9:>10.0f} ns/op")
+    return best
+
+
+def memory_usage(client: redis.Redis, payloads: list, prefix: str) -> float:
+    """Average MEMORY USAGE of one key per payload"""
+    keys = [f"{KEY_PREFIX}:{prefix}:{num}" for num in range(len(payloads))]
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key, payload in zip(keys, payloads):
+            pipe.set(key, payload, ex=3600)
+        pipe.execute()
+        for key in keys:
+            pipe.memory_usage(key, samples=0)
+        return sum(pipe.execute()) / len(keys)
+    finally:
+        client.delete(*keys)
+
+
+def main():
+    urls = sample_urls()
+    legacy = [legacy_payload(url) for url in urls]
+    records = [encode_record(url) for url in urls]
+    codes = [url.short_code for url in urls]
+    
+    for url, payload in zip(urls, records):
+        assert decode_record(url.short_code, payload) == (
+            url.id, url.short_code, url.original_url, url.is_active, url.expires_at
+        )
+    
+    print(f"{SAMPLE_SIZE} URLs, 10-80 character paths, best of {REPEAT}")
+    legacy_size = sum(len(payload.encode()) for payload in legacy) / SAMPLE_SIZE
+    record_size = sum(len(payload) for payload in records) / SAMPLE_SIZE
+    print(f"{'payload, JSON (legacy)':<40} {legacy_size:>10.0f} bytes")
+    print(f"{'payload, RedirectRecord':<40} {record_size:>10.0f} bytes")
+    
+    client = redis.from_url(settings.redis_url)
+    try:
+        legacy_memory = memory_usage(client, legacy, "legacy")
+        record_memory = memory_usage(client, records, "record")
+    except redis.ConnectionError:
+        print("Redis not reachable; skipping MEMORY USAGE")
+    else:
+        print(f"{'Redis memory per key, JSON (legacy)':<40} {legacy_memory:>10.0f} bytes")
+        print(f"{'Redis memory per key, RedirectRecord':<40} {record_memory:>10.0f} bytes")
+        print(f"{'':<40} {legacy_memory / record_memory:>10.1f}x smaller")
+    
+    baseline = bench("decode, JSON + URL model (legacy)", lambda: [legacy_decode(payload) for payload in legacy], SAMPLE_SIZE)
+    current = bench(
+        "decode, RedirectRecord",
+        lambda: [decode_record(code, payload) for code, payload in zip(codes, records)],
+        SAMPLE_SIZE
+    )
+    print(f"{'':<40} {baseline / current:>10.1f}x faster")
+    bench("encode, RedirectRecord", lambda: [encode_record(url) for url in urls], SAMPLE_SIZE)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
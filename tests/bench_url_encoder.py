@@ -0,0 +1,105 @@
+"""
+Micro-benchmarks for short code encoding.
+
+Run with:
+    python -m tests.bench_url_encoder
+"""
+import random
+import string
+import timeit
+from app.utils.url_encoder import URLEncoder, FeistelPermutation
+
+SAMPLE_SIZE = 10000
+REPEAT = 5
+
+
+class LegacyURLEncoder:
+    """The original string-prepending encoder, kept as a baseline"""
+    
+    ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+    BASE = len(ALPHABET)
+    
+    @classmethod
+    def encode(cls, num: int) -> str:
+        if num == 0:
+            return cls.ALPHABET[0]
+        encoded = ""
+        while num > 0:
+            encoded = cls.ALPHABET[num % cls.BASE] + encoded
+            num //= cls.BASE
+        return encoded
+    
+    @classmethod
+    def decode(cls, encoded: str) -> int:
+        num = 0
+        for char in encoded:
+            if char not in cls.ALPHABET:
+                raise ValueError(f"Invalid character '{char}' in encoded string")
+            num = num * cls.BASE + cls.ALPHABET.index(char)
+        return num
+    
+    @classmethod
+    def is_valid_custom_alias(cls, alias: str) -> bool:
+        return all(char in cls.ALPHABET for char in alias)
+
+
+def bench(label: str, func, ops: int) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=REPEAT)) / ops
+    print(f"{label:<40} {best * 1e9:>10.0f} ns/op")
+    return best
+
+
+def compare(label: str, before, after, ops: int):
+    baseline = bench(f"{label} (legacy)", before, ops)
+    current = bench(f"{label}", after, ops)
+    print(f"{'':<40} {baseline / current:>10.1f}x faster")
+
+
+def main():
+    random.seed(0)
+    ids = [random.randrange(1, 2**34) for _ in range(SAMPLE_SIZE)]
+    codes = URLEncoder.encode_many(ids)
+    aliases = ["".join(random.choice(string.ascii_letters) for _ in range(12)) for _ in range(SAMPLE_SIZE)]
+    permutation = FeistelPermutation(b"benchmark-secret", bits=34)
+    permuted_codes = URLEncoder.encode_many(ids, permutation=permutation)
+    
+    assert codes == [LegacyURLEncoder.encode(num) for num in ids]
+    
+    print(f"{SAMPLE_SIZE} random IDs below 2**34, best of {REPEAT}")
+    compare(
+        "encode",
+        lambda: [LegacyURLEncoder.encode(num) for num in ids],
+        lambda: [URLEncoder.encode(num) for num in ids],
+        SAMPLE_SIZE
+    )
+    compare(
+        "encode_many",
+        lambda: [LegacyURLEncoder.encode(num) for num in ids],
+        lambda: URLEncoder.encode_many(ids),
+        SAMPLE_SIZE
+    )
+    compare(
+        "decode",
+        lambda: [LegacyURLEncoder.decode(code) for code in codes],
+        lambda: [URLEncoder.decode(code) for code in codes],
+        SAMPLE_SIZE
+    )
+    compare(
+        "decode_many",
+        lambda: [LegacyURLEncoder.decode(code) for code in codes],
+        lambda: URLEncoder.decode_many(codes),
+        SAMPLE_SIZE
+    )
+    compare(
+        "is_valid_custom_alias",
+        lambda: [LegacyURLEncoder.is_valid_custom_alias(alias) for alias in aliases],
+        lambda: [URLEncoder.is_valid_custom_alias(alias) for alias in aliases],
+        SAMPLE_SIZE
+    )
+    bench("encode (permuted)", lambda: [URLEncoder.encode(num, permutation=permutation) for num in ids], SAMPLE_SIZE)
+    bench("encode_many (permuted)", lambda: URLEncoder.encode_many(ids, permutation=permutation), SAMPLE_SIZE)
+    bench("decode (permuted)", lambda: [URLEncoder.decode(code, permutation=permutation) for code in permuted_codes], SAMPLE_SIZE)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,189 @@
+import random
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base
+from app.models.url import URL, URLClick, URLClickRollup, URLClickVisitor
+from app.services.analytics_service import AnalyticsService
+from app.services.unique_visitors import UniqueVisitorCounter
+
+
+def raw_scan(db, url_id):
+    """The original analytics queries over raw url_clicks"""
+    first_day = (datetime.utcnow() - timedelta(days=30)).date()
+    clicks = db.query(URLClick).filter(URLClick.url_id == url_id).all()
+    
+    by_day, by_country, by_referer = {}, {}, {}
+    for click in clicks:
+        day = str(click.clicked_at.date())
+        if click.clicked_at.date() >= first_day:
+            by_day[day] = by_day.get(day, 0) + 1
+        if click.country:
+            by_country[click.country] = by_country.get(click.country, 0) + 1
+        if click.referer:
+            by_referer[click.referer] = by_referer.get(click.referer, 0) + 1
+    
+    return {
+        "total_clicks": db.query(URLClick).filter(URLClick.url_id == url_id).count(),
+        "unique_clicks": db.query(URLClick.ip_address).filter(
+            URLClick.url_id == url_id,
+            URLClick.ip_address.isnot(None)
+        ).distinct().count(),
+        "clicks_by_day": by_day,
+        "clicks_by_country": by_country,
+        "clicks_by_referer": by_referer,
+    }
+
+
+def summarize(analytics):
+    return {
+        "total_clicks": analytics["total_clicks"],
+        "unique_clicks": analytics["unique_clicks"],
+        "clicks_by_day": {item["date"]: item["count"] for item in analytics["clicks_by_day"]},
+        "clicks_by_country": {item["country"]: item["count"] for item in analytics["clicks_by_country"]},
+        "clicks_by_referer": {item["referer"]: item["count"] for item in analytics["clicks_by_referer"]},
+    }
+
+
+class TestAnalyticsService:
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+    
+    @pytest.fixture
+    def clicks(self, db):
+        random.seed(1)
+        now = datetime.utcnow()
+        for url_id in (1, 2):
+            db.add(URL(id=url_id, original_url="https://example.com", short_code=str(url_id)))
+        for _ in range(500):
+            db.add(URLClick(
+                url_id=random.choice([1, 2]),
+                ip_address=random.choice([None, "10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"]),
+                country=random.choice([None, "US", "DE", "FR"]),
+                referer=random.choice([None, "https://google.com", "https://t.co"]),
+                clicked_at=now - timedelta(minutes=random.randrange(60 * 24 * 45))
+            ))
+        db.commit()
+    
+    def test_matches_raw_scan_without_rollups(self, db, clicks):
+        """Test analytics are exact before the rollup job has run"""
+        analytics = AnalyticsService(db).get_url_analytics(1)
+        assert summarize(analytics) == raw_scan(db, 1)
+    
+    def test_matches_raw_scan_after_partial_rollup(self, db, clicks):
+        """Test rollups plus the unprocessed tail match the raw scan"""
+        service = AnalyticsService(db)
+        assert service.rollup_pending(batch_size=120, settle_seconds=0) == 120
+        assert service.rollup_pending(batch_size=120, settle_seconds=0) == 120
+        
+        for url_id in (1, 2):
+            assert summarize(service.get_url_analytics(url_id)) == raw_scan(db, url_id)
+    
+    def test_matches_raw_scan_after_full_rollup(self, db, clicks):
+        """Test analytics read from rollups once everything is processed"""
+        service = AnalyticsService(db)
+        while service.rollup_pending(batch_size=100, settle_seconds=0):
+            pass
+        
+        for url_id in (1, 2):
+            assert summarize(service.get_url_analytics(url_id)) == raw_scan(db, url_id)
+        assert service.rollup_pending() == 0
+    
+    def test_rollup_buckets(self, db):
+        """Test hourly, daily and all-time rollups are maintained"""
+        clicked_at = datetime(2024, 3, 5, 14, 25)
+        for ip in ["10.0.0.1", "10.0.0.1", "10.0.0.2"]:
+            db.add(URLClick(url_id=1, ip_address=ip, country="US", clicked_at=clicked_at))
+        db.commit()
+        
+        AnalyticsService(db).rollup_pending(settle_seconds=0)
+        
+        totals = {
+            row.granularity: (row.bucket_start, row.clicks, row.unique_clicks)
+            for row in db.query(URLClickRollup).filter(URLClickRollup.dimension == "total")
+        }
+        assert totals["hour"] == (datetime(2024, 3, 5, 14), 3, 2)
+        assert totals["day"] == (datetime(2024, 3, 5), 3, 2)
+        assert totals["all"][1:] == (3, 2)
+        
+        countries = db.query(func.sum(URLClickRollup.clicks)).filter(
+            URLClickRollup.dimension == "country",
+            URLClickRollup.granularity == "all"
+        ).scalar()
+        assert countries == 3
+    
+    def test_late_commits_are_not_skipped(self, db):
+        """Test a click committed after higher IDs is still rolled up"""
+        clicked_at = datetime(2024, 3, 5, 14, 25)
+        now = datetime.utcnow()
+        # ID 6 was taken by an insert that hasn't committed yet
+        for click_id in [1, 2, 3, 4, 5, 7, 8]:
+            db.add(URLClick(id=click_id, url_id=1, clicked_at=clicked_at))
+        db.commit()
+        service = AnalyticsService(db)
+        
+        assert service.rollup_pending(now=now) == 0
+        db.add(URLClick(id=6, url_id=1, clicked_at=clicked_at))
+        db.commit()
+        assert service.rollup_pending(now=now + timedelta(seconds=30)) == 0
+        assert service.rollup_pending(now=now + timedelta(seconds=61)) == 8
+        
+        total = db.query(URLClickRollup).filter(
+            URLClickRollup.granularity == "all", URLClickRollup.dimension == "total"
+        ).one()
+        assert total.clicks == 8
+        assert service.get_url_analytics(1)["total_clicks"] == 8
+    
+    def test_hyperloglog_uniques(self, db, clicks):
+        """Test uniques come from the sketches and the visitor table is skipped"""
+        visitor_counter = Mock()
+        visitor_counter.count.return_value = 4
+        visitor_counter.count_range.return_value = 3
+        visitor_counter.count_by_day.side_effect = lambda url_id, days: {day: 1 for day in days}
+        service = AnalyticsService(db, visitor_counter=visitor_counter)
+        
+        while service.rollup_pending(batch_size=100, settle_seconds=0):
+            pass
+        analytics = service.get_url_analytics(1)
+        
+        assert db.query(URLClickVisitor).count() == 0
+        assert analytics["unique_clicks"] == 4
+        assert analytics["unique_clicks_last_30_days"] == 3
+        assert all(item["unique"] == 1 for item in analytics["clicks_by_day"])
+        assert analytics["total_clicks"] == raw_scan(db, 1)["total_clicks"]
+
+
+class TestUniqueVisitorCounter:
+    def test_add_commands(self):
+        """Test a click updates the all-time and per-day sketches"""
+        pipe = Mock()
+        UniqueVisitorCounter(Mock()).add_commands(pipe, 7, "10.0.0.1", datetime(2024, 3, 5, 14))
+        
+        pipe.pfadd.assert_any_call("hll:7", "10.0.0.1")
+        pipe.pfadd.assert_any_call("hll:7:2024-03-05", "10.0.0.1")
+        assert pipe.expire.call_args[0][0] == "hll:7:2024-03-05"
+    
+    def test_add_commands_without_ip(self):
+        """Test clicks without an IP don't touch the sketches"""
+        pipe = Mock()
+        UniqueVisitorCounter(Mock()).add_commands(pipe, 7, None)
+        pipe.pfadd.assert_not_called()
+    
+    def test_count_range_merges_days(self):
+        """Test a date range is counted with one multi-key PFCOUNT"""
+        mock_redis = Mock()
+        mock_redis.redis_client.pfcount.return_value = 42
+        
+        result = UniqueVisitorCounter(mock_redis).count_range(7, date(2024, 3, 1), date(2024, 3, 3))
+        
+        assert result == 42
+        mock_redis.redis_client.pfcount.assert_called_once_with(
+            "hll:7:2024-03-01", "hll:7:2024-03-02", "hll:7:2024-03-03"
+        )
\ No newline at end of file
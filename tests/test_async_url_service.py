@@ -0,0 +1,323 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.deps import get_async_url_service
+from app.api.urls import router
+from app.cache.local import LocalCache
+from app.cache.redirect_record import NOT_FOUND_BYTES, RedirectRecord, decode_record, encode_record
+from app.cache.short_code_filter import NOT_FOUND
+from app.cache.stampede import StampedeGuard
+from app.cache.ttl_policy import CacheTTLPolicy
+from app.core.config import settings
+from app.models.url import URL
+from app.schemas.url import URLClickCreate
+from app.services.async_url_service import AsyncURLService
+
+
+def make_url(**overrides):
+    fields = dict(
+        id=1,
+        original_url="https://example.com",
+        short_code="abc123",
+        custom_alias=None,
+        title=None,
+        description=None,
+        is_active=True,
+        expires_at=None,
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1)
+    )
+    fields.update(overrides)
+    return URL(**fields)
+
+
+class TestAsyncURLService:
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.scalar = AsyncMock(return_value=None)
+        db.execute = AsyncMock(return_value=Mock())
+        db.execute.return_value.first.return_value = None
+        db.get = AsyncMock(return_value=None)
+        db.commit = AsyncMock()
+        return db
+    
+    @pytest.fixture
+    def mock_redis(self):
+        redis_client = Mock()
+        redis_client.get = AsyncMock(return_value=None)
+        redis_client.get_with_ttl = AsyncMock(return_value=(None, -2))
+        redis_client.set = AsyncMock()
+        redis_client.expire = AsyncMock()
+        redis_client.acquire_lock = AsyncMock(return_value=True)
+        redis_client.release_lock = AsyncMock(return_value=True)
+        redis_client.pipeline.return_value.execute = AsyncMock()
+        return redis_client
+    
+    @pytest.mark.asyncio
+    async def test_get_url_from_local_cache(self, mock_db, mock_redis):
+        """Test local cache hits don't touch Redis or the database"""
+        local_cache = LocalCache()
+        url = make_url()
+        local_cache.set("abc123", url)
+        service = AsyncURLService(mock_db, mock_redis, local_cache=local_cache)
+        
+        assert await service.get_redirect_target("abc123") is url
+        mock_redis.get_with_ttl.assert_not_awaited()
+        mock_db.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_get_url_from_redis(self, mock_db, mock_redis):
+        """Test Redis entries written by the sync service are readable"""
+        mock_redis.get_with_ttl.return_value = (
+            encode_record(RedirectRecord(1, "abc123", "https://example.com", True, datetime(2030, 1, 1))),
+            3_600_000
+        )
+        service = AsyncURLService(mock_db, mock_redis)
+        
+        url = await service.get_redirect_target("abc123")
+        
+        assert url == RedirectRecord(1, "abc123", "https://example.com", True, datetime(2030, 1, 1))
+        mock_db.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_legacy_cache_entry_reloaded(self, mock_db, mock_redis):
+        """Test JSON entries from before the binary format are reloaded"""
+        mock_redis.get_with_ttl.return_value = (b'{"id": 1, "original_url": "https://example.com"}', 3_600_000)
+        row = Mock()
+        row._asdict.return_value = {"id": 1, "original_url": "https://example.com", "is_active": True, "expires_at": None}
+        mock_db.execute.return_value.first.return_value = row
+        service = AsyncURLService(mock_db, mock_redis)
+        
+        url = await service.get_redirect_target("abc123")
+        
+        assert url.original_url == "https://example.com"
+        mock_db.execute.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_hot_entry_renewed(self, mock_db, mock_redis):
+        """Test hot entries get their TTL extended as they are read"""
+        mock_redis.get_with_ttl.return_value = (
+            encode_record(RedirectRecord(1, "hot", "https://example.com", True, None)), 10_000
+        )
+        service = AsyncURLService(mock_db, mock_redis)
+        service.ttl_policy = CacheTTLPolicy(min_ttl=300, max_ttl=3600, renew_hits=3)
+        service.stampede_guard = StampedeGuard(early_refresh_beta=0)
+        
+        for _ in range(3):
+            await service.get_redirect_target("hot")
+        
+        mock_redis.expire.assert_awaited_once_with("url:hot", 1200)
+        assert service.ttl_policy.stats()["hits"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_from_database(self, mock_db, mock_redis):
+        """Test cache misses read only the redirect columns and cache them"""
+        row = Mock()
+        row._asdict.return_value = {
+            "id": 1,
+            "original_url": "https://example.com",
+            "is_active": True,
+            "expires_at": datetime(2030, 1, 1)
+        }
+        mock_db.execute.return_value.first.return_value = row
+        service = AsyncURLService(mock_db, mock_redis)
+        
+        url = await service.get_redirect_target("abc123")
+        
+        assert url.short_code == "abc123"
+        assert url.expires_at == datetime(2030, 1, 1)
+        query = str(mock_db.execute.await_args.args[0])
+        assert "urls.title" not in query and "urls.original_url" in query
+        key, payload = mock_redis.set.await_args.args
+        assert key == "url:abc123"
+        assert decode_record("abc123", payload) == url
+        # The load held the per-key lock
+        lock_key, token, _ = mock_redis.acquire_lock.await_args.args
+        assert lock_key == "lock:url:abc123"
+        mock_redis.release_lock.assert_awaited_once_with(lock_key, token)
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_waits_for_lock_holder(self, mock_db, mock_redis):
+        """Test a worker that loses the lock serves the holder's cache entry"""
+        mock_redis.acquire_lock.return_value = False
+        mock_redis.get_bytes = AsyncMock(side_effect=[
+            None, encode_record(RedirectRecord(1, "abc123", "https://example.com", True, None))
+        ])
+        service = AsyncURLService(mock_db, mock_redis)
+        
+        url = await service.get_redirect_target("abc123")
+        
+        assert url.original_url == "https://example.com"
+        mock_db.execute.assert_not_awaited()
+        mock_redis.release_lock.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_coalesces_misses(self, mock_db, mock_redis):
+        """Test concurrent misses for one code run one query"""
+        row = Mock()
+        row._asdict.return_value = {"id": 1, "original_url": "https://example.com", "is_active": True, "expires_at": None}
+        
+        async def slow_execute(query):
+            await asyncio.sleep(0.01)
+            result = Mock()
+            result.first.return_value = row
+            return result
+        mock_db.execute = AsyncMock(side_effect=slow_execute)
+        service = AsyncURLService(mock_db, mock_redis)
+        
+        urls = await asyncio.gather(*(service.get_redirect_target("abc123") for _ in range(5)))
+        
+        assert all(url.original_url == "https://example.com" for url in urls)
+        mock_db.execute.assert_awaited_once()
+        mock_redis.acquire_lock.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_early_refresh(self, mock_db, mock_redis):
+        """Test an entry picked for early refresh is reloaded and re-cached"""
+        mock_redis.get_with_ttl.return_value = (
+            encode_record(RedirectRecord(1, "abc123", "https://old.example.com", True, None)), 50
+        )
+        row = Mock()
+        row._asdict.return_value = {"id": 1, "original_url": "https://example.com", "is_active": True, "expires_at": None}
+        mock_db.execute.return_value.first.return_value = row
+        service = AsyncURLService(mock_db, mock_redis)
+        service.stampede_guard = StampedeGuard()
+        
+        with patch.object(service.stampede_guard, "should_refresh_early", return_value=True):
+            url = await service.get_redirect_target("abc123")
+        
+        assert url.original_url == "https://example.com"
+        assert mock_redis.set.await_args.args[0] == "url:abc123"
+        
+        # Another worker is already refreshing it: serve the cached entry
+        mock_db.execute.reset_mock()
+        mock_redis.acquire_lock.return_value = False
+        with patch.object(service.stampede_guard, "should_refresh_early", return_value=True):
+            url = await service.get_redirect_target("abc123")
+        
+        assert url.original_url == "https://old.example.com"
+        mock_db.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_database_hits_cached_locally(self, mock_db, mock_redis):
+        """Test a database hit is kept in the local cache as a detached record"""
+        row = Mock()
+        row._asdict.return_value = {"id": 1, "original_url": "https://example.com", "is_active": True, "expires_at": None}
+        mock_db.execute.return_value.first.return_value = row
+        local_cache = LocalCache()
+        service = AsyncURLService(mock_db, mock_redis, local_cache=local_cache)
+        
+        url = await service.get_redirect_target("abc123")
+        
+        assert local_cache.get("abc123") == url == RedirectRecord(1, "abc123", "https://example.com", True, None)
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_from_replica(self, mock_db, mock_redis):
+        """Test cache misses are served by the replica when it has the URL"""
+        row = Mock()
+        row._asdict.return_value = {"id": 1, "original_url": "https://example.com", "is_active": True, "expires_at": None}
+        read_db = Mock()
+        read_db.execute = AsyncMock(return_value=Mock())
+        read_db.execute.return_value.first.return_value = row
+        service = AsyncURLService(mock_db, mock_redis, read_db=read_db)
+        
+        url = await service.get_redirect_target("abc123")
+        
+        assert url.original_url == "https://example.com"
+        mock_db.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_replica_lag(self, mock_db, mock_redis):
+        """Test a replica miss falls back to the primary"""
+        read_db = Mock()
+        read_db.execute = AsyncMock(return_value=Mock())
+        read_db.execute.return_value.first.return_value = None
+        service = AsyncURLService(mock_db, mock_redis, read_db=read_db)
+        
+        assert await service.get_redirect_target("abc123") is None
+        read_db.execute.assert_awaited_once()
+        mock_db.execute.assert_awaited_once()
+        # The miss is cached briefly
+        mock_redis.set.assert_awaited_once_with("url:abc123", NOT_FOUND, ex=settings.negative_cache_ttl)
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_cached_miss(self, mock_db, mock_redis):
+        mock_redis.get_with_ttl.return_value = (NOT_FOUND_BYTES, 60_000)
+        service = AsyncURLService(mock_db, mock_redis)
+        
+        assert await service.get_redirect_target("abc123") is None
+        mock_db.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_get_redirect_target_filtered_miss(self, mock_db, mock_redis):
+        """Test codes the filter has never seen skip the database"""
+        service = AsyncURLService(mock_db, mock_redis)
+        service.short_code_filter = Mock()
+        service.short_code_filter.contains_result.return_value = False
+        
+        assert await service.get_redirect_target("typo") is None
+        assert await service.get_url_by_short_code("typo") is None
+        
+        mock_db.execute.assert_not_awaited()
+        mock_db.scalar.assert_not_awaited()
+        mock_redis.set.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_record_click(self, mock_db, mock_redis):
+        """Test a click is committed and counted in one pipeline"""
+        with patch("app.services.unique_visitors.settings.unique_visitor_counting", "hll"):
+            service = AsyncURLService(mock_db, mock_redis)
+        
+        click = await service.record_click(1, URLClickCreate(ip_address="1.2.3.4"))
+        
+        mock_db.add.assert_called_once_with(click)
+        mock_db.commit.assert_awaited_once()
+        assert click.clicked_at is not None
+        pipe = mock_redis.pipeline.return_value
+        pipe.incr.assert_called_once_with("clicks:1")
+        pipe.pfadd.assert_any_call("hll:1", "1.2.3.4")
+        pipe.execute.assert_awaited_once()
+
+
+class TestAsyncRoutes:
+    @pytest.fixture
+    def service(self):
+        service = Mock()
+        service.get_redirect_target = AsyncMock(return_value=make_url())
+        service.get_url_by_short_code = AsyncMock(return_value=make_url())
+        service.get_click_count = AsyncMock(return_value=7)
+        service.record_click = AsyncMock()
+        service.is_url_expired.return_value = False
+        return service
+    
+    @pytest.fixture
+    def client(self, service):
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_async_url_service] = lambda: service
+        return TestClient(app)
+    
+    def test_redirect_records_click(self, client, service):
+        with patch("app.api.urls.settings.click_recording_mode", "sync"):
+            response = client.get("/abc123", follow_redirects=False)
+        
+        assert response.status_code == 302
+        assert response.headers["location"] == "https://example.com"
+        url_id, click_data = service.record_click.await_args.args
+        assert url_id == 1
+        assert click_data.ip_address == "testclient"
+    
+    def test_info_includes_click_count(self, client, service):
+        response = client.get("/abc123/info")
+        
+        assert response.status_code == 200
+        assert response.json()["click_count"] == 7
+    
+    def test_missing_url(self, client, service):
+        service.get_redirect_target.return_value = None
+        
+        assert client.get("/nope", follow_redirects=False).status_code == 404
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+import redis
+from unittest.mock import AsyncMock, Mock, patch
+from app.cache.local import LocalCache
+from app.cache.invalidation import InvalidationSubscriber, publish_invalidation
+
+
+class TestInvalidationSubscriber:
+    @pytest.fixture
+    def local_cache(self):
+        cache = LocalCache(max_size=10, ttl=60)
+        cache.set("abc", 1)
+        cache.set("xyz", 2)
+        return cache
+    
+    def _mock_client(self, messages):
+        pubsub = Mock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.ping = AsyncMock()
+        pubsub.close = AsyncMock()
+        pubsub.get_message = AsyncMock(side_effect=messages)
+        client = Mock()
+        client.pubsub.return_value = pubsub
+        client.close = AsyncMock()
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_applies_invalidations(self, local_cache):
+        """Test published short codes are dropped from the local cache"""
+        client = self._mock_client([
+            {"type": "message", "data": "abc"},
+            None,
+            asyncio.CancelledError()
+        ])
+        subscriber = InvalidationSubscriber(local_cache)
+        
+        with pytest.raises(asyncio.CancelledError):
+            await subscriber._listen(client.pubsub())
+        
+        assert subscriber.invalidations == 1
+        assert local_cache.get("abc") is None
+        assert local_cache.get("xyz") == 2
+        client.pubsub().ping.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_subscribe_resets_cache(self, local_cache):
+        """Test (re)subscribing clears and resumes the local cache"""
+        local_cache.suspended = True
+        client = self._mock_client([asyncio.CancelledError()])
+        subscriber = InvalidationSubscriber(local_cache)
+        
+        with patch("app.cache.invalidation.aioredis.from_url", return_value=client):
+            with pytest.raises(asyncio.CancelledError):
+                await subscriber.run()
+        
+        client.pubsub().subscribe.assert_awaited_once_with("url:invalidate")
+        assert len(local_cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_connection_loss_suspends_cache(self, local_cache):
+        """Test the local cache is cleared and bypassed while disconnected"""
+        client = self._mock_client([redis.ConnectionError("gone")])
+        subscriber = InvalidationSubscriber(local_cache)
+        
+        with patch("app.cache.invalidation.aioredis.from_url", return_value=client), \
+                patch("app.cache.invalidation.asyncio.sleep", AsyncMock(side_effect=asyncio.CancelledError)):
+            with pytest.raises(asyncio.CancelledError):
+                await subscriber.run()
+        
+        assert subscriber.connected == False
+        assert subscriber.reconnects == 1
+        assert local_cache.suspended == True
+        assert len(local_cache) == 0
+        
+        local_cache.set("abc", 1)
+        assert local_cache.get("abc") is None
+
+
+class TestPublishInvalidation:
+    def test_publish(self):
+        """Test invalidations are published on the configured channel"""
+        mock_redis = Mock()
+        publish_invalidation(mock_redis, "abc")
+        mock_redis.publish.assert_called_once_with("url:invalidate", "abc")
+    
+    def test_publish_failure_is_swallowed(self):
+        """Test a Redis outage does not fail the write path"""
+        mock_redis = Mock()
+        mock_redis.publish.side_effect = redis.ConnectionError("gone")
+        publish_invalidation(mock_redis, "abc")
\ No newline at end of file
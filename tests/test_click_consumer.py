@@ -0,0 +1,117 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from app.schemas.url import URLClickCreate
+from app.services.click_stream import encode_click, decode_click, publish_click
+from app.workers.click_consumer import ClickStreamConsumer
+
+
+class TestClickStreamEncoding:
+    def test_encode_decode(self):
+        """Test clicks survive a round trip through stream fields"""
+        clicked_at = datetime(2024, 1, 1, 12, 30)
+        click_data = URLClickCreate(
+            ip_address="192.168.1.1",
+            referer="https://google.com",
+            clicked_at=clicked_at
+        )
+        
+        fields = encode_click(42, click_data)
+        assert "user_agent" not in fields  # None values are omitted
+        
+        url_id, decoded = decode_click(fields)
+        assert url_id == 42
+        assert decoded == click_data
+    
+    def test_publish_click(self):
+        """Test publishing appends to the stream and bumps the counter in one pipeline"""
+        mock_redis = Mock()
+        pipe = mock_redis.pipeline.return_value
+        
+        publish_click(mock_redis, 7, URLClickCreate(ip_address="10.0.0.1"))
+        
+        assert pipe.xadd.call_args[0][0] == "clicks:stream"
+        assert pipe.xadd.call_args[0][1]["url_id"] == "7"
+        pipe.incr.assert_called_once_with("clicks:7")
+        pipe.execute.assert_called_once()
+
+
+class TestClickStreamConsumer:
+    @pytest.fixture
+    def mock_redis(self):
+        mock_redis = Mock()
+        mock_redis.redis_client.xautoclaim.return_value = ["0-0", [], []]
+        return mock_redis
+    
+    @pytest.fixture
+    def consumer(self, mock_redis):
+        return ClickStreamConsumer(mock_redis, session_factory=Mock, consumer_name="test")
+    
+    def _entries(self, count):
+        return [
+            (f"1-{i}", encode_click(i, URLClickCreate(ip_address="10.0.0.1")))
+            for i in range(count)
+        ]
+    
+    def test_writes_then_acks(self, consumer, mock_redis):
+        """Test new entries are written in one batch and acked afterwards"""
+        entries = self._entries(3)
+        mock_redis.redis_client.xreadgroup.return_value = [["clicks:stream", entries]]
+        
+        with patch("app.workers.click_consumer.URLService") as mock_service:
+            assert consumer.run_once() == 3
+        
+        clicks = mock_service.return_value.record_clicks.call_args[0][0]
+        assert [url_id for url_id, _ in clicks] == [0, 1, 2]
+        assert mock_service.return_value.record_clicks.call_args[1] == {"increment_counters": False}
+        mock_redis.redis_client.xack.assert_called_once_with(
+            "clicks:stream", "click-writers", "1-0", "1-1", "1-2"
+        )
+    
+    def test_failed_write_is_not_acked(self, consumer, mock_redis):
+        """Test entries stay pending when the database write fails"""
+        mock_redis.redis_client.xreadgroup.return_value = [["clicks:stream", self._entries(2)]]
+        
+        with patch("app.workers.click_consumer.URLService") as mock_service:
+            mock_service.return_value.record_clicks.side_effect = Exception("db down")
+            with pytest.raises(Exception):
+                consumer.run_once()
+        
+        mock_redis.redis_client.xack.assert_not_called()
+    
+    def test_malformed_entries_are_acked(self, consumer, mock_redis):
+        """Test malformed entries are dropped instead of blocking the stream"""
+        mock_redis.redis_client.xreadgroup.return_value = [["clicks:stream", [("1-0", {"bogus": "x"})]]]
+        
+        with patch("app.workers.click_consumer.URLService") as mock_service:
+            assert consumer.run_once() == 0
+        
+        mock_service.return_value.record_clicks.assert_not_called()
+        mock_redis.redis_client.xack.assert_called_once_with("clicks:stream", "click-writers", "1-0")
+        assert consumer.malformed == 1
+    
+    def test_deleted_entries_are_acked(self, consumer, mock_redis):
+        """Test claimed entries trimmed from the stream are acked, not retried"""
+        entries = [("0-1", None), ("0-2", {})] + self._entries(1)
+        mock_redis.redis_client.xautoclaim.return_value = ["0-0", entries, []]
+        
+        with patch("app.workers.click_consumer.URLService") as mock_service:
+            assert consumer.run_once() == 1
+        
+        assert len(mock_service.return_value.record_clicks.call_args[0][0]) == 1
+        mock_redis.redis_client.xack.assert_called_once_with(
+            "clicks:stream", "click-writers", "0-1", "0-2", "1-0"
+        )
+        assert consumer.deleted == 2
+        assert consumer.malformed == 0
+    
+    def test_claims_stale_entries_first(self, consumer, mock_redis):
+        """Test entries abandoned by dead consumers are reprocessed before new ones"""
+        mock_redis.redis_client.xautoclaim.return_value = ["1-5", self._entries(1), []]
+        
+        with patch("app.workers.click_consumer.URLService"):
+            assert consumer.run_once() == 1
+        
+        mock_redis.redis_client.xreadgroup.assert_not_called()
+        assert consumer.claimed == 1
+        assert consumer._claim_cursor == "1-5"
\ No newline at end of file
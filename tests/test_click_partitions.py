@@ -0,0 +1,105 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from app.services.click_partitions import (
+    ClickPartition,
+    ClickPartitionManager,
+    expired_partitions,
+    next_period_start,
+    parse_bound,
+    plan_partitions,
+)
+
+NOW = datetime(2026, 10, 17, 15, 30)
+
+
+def day(month, day_of_month):
+    return datetime(2026, month, day_of_month)
+
+
+class TestPartitionPlanning:
+    def test_parse_bound(self):
+        assert parse_bound(
+            "FOR VALUES FROM ('2026-10-17 00:00:00') TO ('2026-10-18 00:00:00')"
+        ) == [day(10, 17), day(10, 18)]
+        assert parse_bound("FOR VALUES FROM (MINVALUE) TO ('2026-10-18 00:00:00')") == [None, day(10, 18)]
+    
+    def test_next_period_start(self):
+        assert next_period_start(NOW, "day") == day(10, 18)
+        assert next_period_start(NOW, "month") == day(11, 1)
+        assert next_period_start(datetime(2026, 12, 31, 23), "month") == datetime(2027, 1, 1)
+    
+    def test_plan_from_empty(self):
+        """Test the current day through the premake horizon is planned"""
+        planned = plan_partitions([], NOW, "day", premake_days=2)
+        
+        assert [(p.start, p.end) for p in planned] == [
+            (day(10, 17), day(10, 18)),
+            (day(10, 18), day(10, 19)),
+            (day(10, 19), day(10, 20)),
+        ]
+        assert planned[0].name == "url_clicks_p20261017"
+    
+    def test_plan_continues_from_newest_partition(self):
+        existing = [
+            ClickPartition("url_clicks_legacy", None, day(10, 16)),
+            ClickPartition("url_clicks_p20261016", day(10, 16), day(10, 18)),
+        ]
+        
+        planned = plan_partitions(existing, NOW, "day", premake_days=1)
+        
+        assert [p.start for p in planned] == [day(10, 18)]
+        assert plan_partitions(existing, NOW, "day", premake_days=0) == []
+    
+    def test_plan_monthly_after_daily(self):
+        """Test switching intervals extends contiguously without overlaps"""
+        existing = [ClickPartition("url_clicks_p20261017", day(10, 17), day(10, 18))]
+        
+        planned = plan_partitions(existing, NOW, "month", premake_days=20)
+        
+        assert [(p.start, p.end) for p in planned] == [
+            (day(10, 18), day(11, 1)),
+            (day(11, 1), day(12, 1)),
+        ]
+    
+    def test_plan_rejects_unknown_interval(self):
+        with pytest.raises(ValueError):
+            plan_partitions([], NOW, "week")
+    
+    def test_expired_partitions(self):
+        existing = [
+            ClickPartition("url_clicks_legacy", None, day(7, 1)),
+            ClickPartition("url_clicks_p20260718", day(7, 18), day(7, 19)),
+            ClickPartition("url_clicks_p20260719", day(7, 19), day(7, 20)),
+        ]
+        
+        # Cutoff is 2026-07-19 15:30
+        assert [p.name for p in expired_partitions(existing, NOW, 90)] == [
+            "url_clicks_legacy", "url_clicks_p20260718"
+        ]
+        assert expired_partitions(existing, NOW, 0) == []
+
+
+class TestClickPartitionManager:
+    @pytest.fixture
+    def manager(self):
+        manager = ClickPartitionManager(Mock(), retention_days=90)
+        manager.partitions = Mock(return_value=[
+            ClickPartition("url_clicks_legacy", None, day(7, 1)),
+            ClickPartition("url_clicks_p20260701", day(7, 1), day(7, 2)),
+        ])
+        return manager
+    
+    def test_drop_expired(self, manager):
+        manager._has_unrolled_clicks = Mock(return_value=False)
+        
+        assert manager.drop_expired(NOW) == ["url_clicks_legacy", "url_clicks_p20260701"]
+        statements = [str(call.args[0]) for call in manager.db.execute.call_args_list]
+        assert "DROP TABLE url_clicks_legacy" in statements
+        assert manager.db.commit.call_count == 2
+    
+    def test_keeps_partitions_not_rolled_up(self, manager):
+        """Test clicks the rollup job hasn't seen are never dropped"""
+        manager._has_unrolled_clicks = Mock(side_effect=[True, False])
+        
+        assert manager.drop_expired(NOW) == ["url_clicks_p20260701"]
\ No newline at end of file
@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import Mock
+from app.schemas.url import URLClickCreate
+from app.services.click_writer import ClickBatchWriter
+
+
+class TestClickBatchWriter:
+    @pytest.fixture
+    def written(self):
+        return []
+    
+    @pytest.fixture
+    def make_writer(self, written):
+        def make(**kwargs):
+            writer = ClickBatchWriter(session_factory=Mock, redis_client=Mock(), **kwargs)
+            writer._write_batch = lambda batch: written.append(list(batch))
+            return writer
+        return make
+    
+    @pytest.mark.asyncio
+    async def test_flushes_in_batches(self, make_writer, written):
+        """Test clicks are written in batches of batch_size"""
+        writer = make_writer(batch_size=2, flush_interval=60)
+        await writer.start()
+        
+        for url_id in range(5):
+            assert await writer.submit(url_id, URLClickCreate()) == True
+        await writer.stop()
+        
+        assert [len(batch) for batch in written] == [2, 2, 1]
+        assert writer.flushed == 5
+        assert writer.stats()["queue_depth"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_submit_sets_click_time(self, make_writer, written):
+        """Test click time is captured when queued, not when written"""
+        writer = make_writer()
+        await writer.start()
+        await writer.submit(1, URLClickCreate())
+        await writer.stop()
+        
+        assert written[0][0][1].clicked_at is not None
+    
+    @pytest.mark.asyncio
+    async def test_drop_newest(self, make_writer):
+        """Test new clicks are rejected when the queue is full"""
+        writer = make_writer(max_queue_size=2, drop_policy="drop_newest")
+        await writer.start()
+        
+        # The flusher does not run until we yield, so the queue fills up
+        writer._task.cancel()
+        results = [await writer.submit(url_id, URLClickCreate()) for url_id in range(3)]
+        
+        assert results == [True, True, False]
+        assert writer.dropped == 1
+        assert [item[0] for item in writer.queue._queue] == [0, 1]
+    
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self, make_writer):
+        """Test the oldest click is discarded when the queue is full"""
+        writer = make_writer(max_queue_size=2, drop_policy="drop_oldest")
+        await writer.start()
+        
+        writer._task.cancel()
+        results = [await writer.submit(url_id, URLClickCreate()) for url_id in range(3)]
+        
+        assert results == [True, True, True]
+        assert writer.dropped == 1
+        assert [item[0] for item in writer.queue._queue] == [1, 2]
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_counted(self, make_writer):
+        """Test write errors are counted and do not stop the flusher"""
+        writer = make_writer(batch_size=1)
+        writer._write_batch = Mock(side_effect=[Exception("db down"), None])
+        await writer.start()
+        
+        await writer.submit(1, URLClickCreate())
+        await writer.submit(2, URLClickCreate())
+        await writer.stop()
+        
+        assert writer.failed == 1
+        assert writer.flushed == 1
+    
+    def test_invalid_drop_policy(self):
+        """Test unknown drop policies are rejected"""
+        with pytest.raises(ValueError):
+            ClickBatchWriter(session_factory=Mock, redis_client=Mock(), drop_policy="nope")
\ No newline at end of file
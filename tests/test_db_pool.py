@@ -0,0 +1,50 @@
+import pytest
+import sqlite3
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.db.pool import TimedQueuePool
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestTimedQueuePool:
+    def test_records_checkouts(self, engine):
+        """Test each checkout's wait is recorded"""
+        for _ in range(3):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        
+        stats = engine.pool.stats()
+        assert stats["checkouts"] == 3
+        assert stats["checked_out"] == 0
+        assert stats["max_wait_ms"] >= stats["avg_wait_ms"] >= 0
+    
+    def test_records_timeouts(self, engine):
+        """Test checkouts that give up waiting for a connection are counted"""
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            assert engine.pool.stats()["checked_out"] == 1
+        
+        assert engine.pool.stats()["timeouts"] == 1
+    
+    def test_stats_survive_dispose(self, engine):
+        """Test the counters carry over when the engine recreates its pool"""
+        with engine.connect():
+            pass
+        
+        engine.dispose()
+        
+        assert engine.pool.stats()["checkouts"] == 1
\ No newline at end of file
@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import Mock
+from app.services.id_allocator import IDAllocator
+
+
+class FakeCounter:
+    """Shared counter leased by several allocators"""
+    
+    def __init__(self):
+        self.value = 0
+        self.leases = 0
+    
+    def lease(self, count):
+        self.value += count
+        self.leases += 1
+        return self.value
+
+
+class TestIDAllocator:
+    def test_next_id_leases_blocks(self):
+        """Test IDs come from locally leased blocks"""
+        counter = FakeCounter()
+        allocator = IDAllocator(counter.lease, block_size=3)
+        
+        ids = [allocator.next_id() for _ in range(7)]
+        
+        assert ids == [1, 2, 3, 4, 5, 6, 7]
+        assert counter.leases == 3
+        assert allocator.stats()["remaining_in_block"] == 2
+    
+    def test_workers_never_collide(self):
+        """Test allocators sharing a counter hand out disjoint IDs"""
+        counter = FakeCounter()
+        workers = [IDAllocator(counter.lease, block_size=10) for _ in range(3)]
+        
+        ids = [worker.next_id() for _ in range(25) for worker in workers]
+        
+        assert len(ids) == len(set(ids))
+    
+    def test_allocate_many(self):
+        """Test allocating more IDs than remain in the current block"""
+        counter = FakeCounter()
+        allocator = IDAllocator(counter.lease, block_size=5)
+        allocator.next_id()
+        
+        ids = allocator.allocate(12)
+        
+        assert ids == list(range(2, 14))
+        assert counter.leases == 2
+        assert allocator.next_id() == 14
+    
+    def test_invalid_block_size(self):
+        """Test block size must be positive"""
+        with pytest.raises(ValueError):
+            IDAllocator(Mock(), block_size=0)
\ No newline at end of file
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+from app.cache.local import LocalCache
+
+
+class TestLocalCache:
+    def test_get_set(self):
+        """Test basic get/set and hit/miss counters"""
+        cache = LocalCache(max_size=10, ttl=60)
+        
+        assert cache.get("abc") is None
+        cache.set("abc", "value")
+        assert cache.get("abc") == "value"
+        
+        assert cache.hits == 1
+        assert cache.misses == 1
+    
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = LocalCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = LocalCache(max_size=10, ttl=5)
+        
+        with patch("app.cache.local.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("app.cache.local.time.monotonic", return_value=104.0):
+            assert cache.get("a") == 1
+        with patch("app.cache.local.time.monotonic", return_value=105.0):
+            assert cache.get("a") is None
+        
+        assert cache.expirations == 1
+        assert len(cache) == 0
+    
+    def test_delete(self):
+        """Test explicit invalidation"""
+        cache = LocalCache(max_size=10, ttl=60)
+        cache.set("a", 1)
+        
+        assert cache.delete("a") == True
+        assert cache.delete("a") == False
+        assert cache.get("a") is None
\ No newline at end of file
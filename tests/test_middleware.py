@@ -0,0 +1,111 @@
+import redis
+from unittest.mock import AsyncMock, Mock
+from fastapi import FastAPI
+from fastapi.responses import RedirectResponse
+from fastapi.testclient import TestClient
+from app.core.middleware import EdgeMiddleware
+from app.core.rate_limiter import RateLimitPolicy, RateLimitPolicyTable, RateLimitResult
+
+
+def make_client(limiter=None, **kwargs):
+    table = RateLimitPolicyTable(
+        [
+            RateLimitPolicy("partner", r"^/ping$", limit=1000, api_key="secret"),
+            RateLimitPolicy("health", r"^/health$"),
+            RateLimitPolicy("ping", r"^/ping$", frozenset({"GET"}), 5, 60, 10),
+        ],
+        default=RateLimitPolicy("default", "", limit=100)
+    )
+    app = FastAPI()
+    app.add_middleware(EdgeMiddleware, limiter=limiter, policies=table, **kwargs)
+    app.get("/ping")(lambda: {"ok": True})
+    app.get("/health")(lambda: {"status": "healthy"})
+    app.get("/go")(lambda: RedirectResponse("https://example.com", status_code=301))
+    return TestClient(app)
+
+
+def make_limiter(result):
+    limiter = Mock()
+    limiter.check = AsyncMock(return_value=result)
+    return limiter
+
+
+class TestEdgeMiddleware:
+    def test_security_and_timing_headers(self):
+        """Test security headers and X-Process-Time are added to responses"""
+        client = make_client()
+        
+        response = client.get("/go", follow_redirects=False)
+        
+        assert response.status_code == 301
+        assert response.headers["location"] == "https://example.com"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["Content-Security-Policy"] == "default-src 'self'"
+        assert float(response.headers["X-Process-Time"]) >= 0
+    
+    def test_headers_can_be_disabled(self):
+        """Test the layer is a pass-through with nothing to add"""
+        client = make_client(security_headers=False, process_time=False)
+        
+        response = client.get("/ping")
+        
+        assert "X-Frame-Options" not in response.headers
+        assert "X-Process-Time" not in response.headers
+    
+    def test_allowed_request_gets_rate_limit_headers(self):
+        """Test allowed responses carry the remaining quota"""
+        limiter = make_limiter(RateLimitResult(True, 5, 4, 12.0, 0.0))
+        client = make_client(limiter)
+        
+        response = client.get("/ping", headers={"X-Forwarded-For": "1.2.3.4, 10.0.0.1"})
+        
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Remaining"] == "4"
+        limiter.check.assert_awaited_once_with("rate_limit:gcra:ping:1.2.3.4", 5, 60, 10)
+    
+    def test_denied_request_returns_429(self):
+        """Test denied requests are rejected without reaching the app"""
+        limiter = make_limiter(RateLimitResult(False, 5, 0, 120.0, 1.5))
+        client = make_client(limiter)
+        
+        response = client.get("/ping")
+        
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Rate limit exceeded. Please try again later."}
+        assert response.headers["Retry-After"] == "2"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert "X-Process-Time" in response.headers
+    
+    def test_exempt_route_skips_limiter(self):
+        """Test exempt routes never reach Redis"""
+        limiter = make_limiter(RateLimitResult(True, 5, 4, 12.0, 0.0))
+        client = make_client(limiter)
+        
+        response = client.get("/health")
+        
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+        limiter.check.assert_not_called()
+    
+    def test_api_key_policy(self):
+        """Test API key policies share a quota per key, not per IP"""
+        limiter = make_limiter(RateLimitResult(True, 1000, 999, 0.1, 0.0))
+        client = make_client(limiter)
+        
+        client.get("/go", headers={"X-API-Key": "secret"}, follow_redirects=False)
+        client.get("/ping", headers={"X-API-Key": "secret"})
+        
+        assert limiter.check.call_args_list[0].args[0] == "rate_limit:gcra:default:testclient"
+        assert limiter.check.call_args_list[1].args[0].startswith("rate_limit:gcra:partner:key:")
+    
+    def test_fails_open_when_redis_unavailable(self):
+        """Test requests pass through if the limiter can't reach Redis"""
+        limiter = Mock()
+        limiter.check = AsyncMock(side_effect=redis.ConnectionError())
+        client = make_client(limiter)
+        
+        response = client.get("/ping")
+        
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
\ No newline at end of file
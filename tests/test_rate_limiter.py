@@ -0,0 +1,240 @@
+import pytest
+import redis
+from unittest.mock import AsyncMock, Mock, patch
+from app.core.rate_limiter import (
+    AsyncLocalRateLimiter, AsyncRateLimiter, LocalRateLimiter, RateLimiter,
+    RateLimitResult, RateLimitPolicy, default_policy_table, rate_limit_key
+)
+
+
+def make_redis(reply):
+    """Redis client whose registered script returns a fixed reply"""
+    script = Mock(return_value=reply)
+    redis_client = Mock()
+    redis_client.redis_client.register_script.return_value = script
+    return redis_client, script
+
+
+class TestRateLimiter:
+    def test_check_sends_interval_and_capacity(self):
+        """Test limit and burst are converted to GCRA parameters"""
+        redis_client, script = make_redis([1, 199, 600, 0])
+        limiter = RateLimiter(redis_client)
+        
+        result = limiter.check("rate_limit:gcra:1.2.3.4", limit=100, window=60, burst=200)
+        
+        script.assert_called_once_with(
+            keys=["rate_limit:gcra:1.2.3.4"], args=[600.0, 120000.0, 1, 0]
+        )
+        assert result == RateLimitResult(True, 100, 199, 0.6, 0.0)
+    
+    def test_burst_defaults_to_limit(self):
+        """Test the burst capacity falls back to the sustained limit"""
+        redis_client, script = make_redis([1, 9, 6000, 0])
+        limiter = RateLimiter(redis_client)
+        
+        limiter.check("key", limit=10, window=60)
+        
+        assert script.call_args.kwargs["args"] == [6000.0, 60000.0, 1, 0]
+    
+    def test_is_rate_limited(self):
+        """Test the boolean API reflects the script's decision"""
+        redis_client, _ = make_redis([0, 0, 120000, 600])
+        limiter = RateLimiter(redis_client)
+        
+        assert limiter.is_rate_limited("key", limit=100) is True
+    
+    def test_get_rate_limit_info_does_not_consume(self):
+        """Test reading the quota runs the script with zero cost"""
+        redis_client, script = make_redis([1, 150, 30000, 0])
+        limiter = RateLimiter(redis_client)
+        
+        info = limiter.get_rate_limit_info("key", limit=100, burst=200)
+        
+        assert script.call_args.kwargs["args"][2] == 0
+        assert info["remaining"] == 150
+        assert info["reset_after"] == 30.0
+    
+    def test_headers(self):
+        """Test headers are rounded up and Retry-After only set when denied"""
+        allowed = RateLimitResult(True, 100, 5, 1.2, 0.0)
+        denied = RateLimitResult(False, 100, 0, 120.0, 0.4)
+        
+        assert allowed.headers() == {
+            "X-RateLimit-Limit": "100",
+            "X-RateLimit-Remaining": "5",
+            "X-RateLimit-Reset": "2"
+        }
+        assert denied.headers()["Retry-After"] == "1"
+
+
+class FakeLimiter:
+    """Redis limiter stand-in with a fixed quota and no refill"""
+    
+    def __init__(self, quota):
+        self.quota = quota
+        self.redis_calls = 0
+        self.reported = 0
+    
+    def check(self, key, limit, window=60, burst=None, pending=0):
+        self.redis_calls += 1
+        self.reported += pending
+        self.quota = max(self.quota - pending, 0)
+        if self.quota == 0:
+            return RateLimitResult(False, limit, 0, 60.0, 30.0)
+        self.quota -= 1
+        return RateLimitResult(True, limit, self.quota, 1.0, 0.0)
+
+
+class FakeAsyncLimiter(FakeLimiter):
+    async def check(self, key, limit, window=60, burst=None, pending=0):
+        return FakeLimiter.check(self, key, limit, window, burst, pending)
+
+
+class TestAsyncRateLimiter:
+    @pytest.mark.asyncio
+    async def test_check_awaits_script(self):
+        """Test the GCRA script runs through redis.asyncio"""
+        script = AsyncMock(return_value=[1, 199, 600, 0])
+        redis_client = Mock()
+        redis_client.redis_client.register_script.return_value = script
+        limiter = AsyncRateLimiter(redis_client)
+        
+        result = await limiter.check("key", limit=100, window=60, burst=200)
+        
+        script.assert_awaited_once_with(keys=["key"], args=[600.0, 120000.0, 1, 0])
+        assert result == RateLimitResult(True, 100, 199, 0.6, 0.0)
+        assert limiter.stats()["redis_calls"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_local_tier(self):
+        """Test the async local tier admits between syncs and reports pending requests"""
+        redis_limiter = FakeAsyncLimiter(quota=1000)
+        limiter = AsyncLocalRateLimiter(redis_limiter, max_pending=10, sync_threshold=5)
+        
+        results = [await limiter.check("ip", limit=100) for _ in range(22)]
+        
+        assert all(result.allowed for result in results)
+        assert redis_limiter.redis_calls == 2
+        assert redis_limiter.reported == 10
+    
+    @pytest.mark.asyncio
+    async def test_local_tier_restores_pending_when_redis_fails(self):
+        redis_limiter = FakeAsyncLimiter(quota=1000)
+        limiter = AsyncLocalRateLimiter(redis_limiter, max_pending=2, sync_threshold=0)
+        for _ in range(3):
+            await limiter.check("ip", limit=100)
+        
+        redis_limiter.check = AsyncMock(side_effect=redis.ConnectionError())
+        with pytest.raises(redis.ConnectionError):
+            await limiter.check("ip", limit=100)
+        
+        assert limiter._buckets["ip"].pending == 2
+
+
+class TestLocalRateLimiter:
+    def test_admits_locally_between_syncs(self):
+        """Test most requests are admitted without a Redis call"""
+        redis_limiter = FakeLimiter(quota=1000)
+        limiter = LocalRateLimiter(redis_limiter, max_pending=10, sync_threshold=5)
+        
+        results = [limiter.check("ip", limit=100) for _ in range(22)]
+        
+        assert all(result.allowed for result in results)
+        # One sync, then ten local admits per sync
+        assert redis_limiter.redis_calls == 2
+        assert redis_limiter.reported == 10
+        assert limiter.stats()["redis_calls_avoided"] == 20
+    
+    def test_syncs_every_request_near_the_limit(self):
+        """Test clients close to their limit are checked against Redis"""
+        redis_limiter = FakeLimiter(quota=5)
+        limiter = LocalRateLimiter(redis_limiter, max_pending=10, sync_threshold=10)
+        
+        results = [limiter.check("ip", limit=100) for _ in range(6)]
+        
+        assert [result.allowed for result in results] == [True] * 5 + [False]
+        assert redis_limiter.redis_calls == 6
+    
+    def test_denies_locally_until_retry_after(self):
+        """Test a denied client doesn't reach Redis until Retry-After passes"""
+        redis_limiter = FakeLimiter(quota=0)
+        limiter = LocalRateLimiter(redis_limiter)
+        
+        first = limiter.check("ip", limit=100)
+        second = limiter.check("ip", limit=100)
+        
+        assert not first.allowed and not second.allowed
+        assert redis_limiter.redis_calls == 1
+        assert second.retry_after <= 30.0
+    
+    def test_stale_view_is_resynced(self):
+        """Test the local view expires after the sync interval"""
+        redis_limiter = FakeLimiter(quota=1000)
+        limiter = LocalRateLimiter(redis_limiter, sync_interval=0)
+        
+        limiter.check("ip", limit=100)
+        limiter.check("ip", limit=100)
+        
+        assert redis_limiter.redis_calls == 2
+    
+    def test_pending_restored_when_redis_fails(self):
+        """Test unreported requests survive a failed sync"""
+        redis_limiter = FakeLimiter(quota=1000)
+        limiter = LocalRateLimiter(redis_limiter, max_pending=2, sync_threshold=0)
+        for _ in range(3):
+            limiter.check("ip", limit=100)
+        
+        redis_limiter.check = Mock(side_effect=redis.ConnectionError())
+        with pytest.raises(redis.ConnectionError):
+            limiter.check("ip", limit=100)
+        
+        assert limiter._buckets["ip"].pending == 2
+    
+    def test_lru_eviction(self):
+        """Test the number of tracked keys is bounded"""
+        limiter = LocalRateLimiter(FakeLimiter(quota=1000), max_keys=2)
+        
+        for key in ("a", "b", "c"):
+            limiter.check(key, limit=100)
+        
+        assert list(limiter._buckets) == ["b", "c"]
+        assert limiter.stats()["evictions"] == 1
+
+
+class TestRateLimitPolicies:
+    def test_default_table_routes(self):
+        """Test built-in policies are matched by method and path"""
+        table = default_policy_table()
+        
+        assert table.match("GET", "/health").exempt
+        assert table.match("GET", "/docs").exempt
+        assert table.match("POST", "/api/v1/urls/").name == "create"
+        assert table.match("POST", "/api/v1/urls/bulk").name == "bulk_create"
+        assert table.match("GET", "/api/v1/urls/abc123").name == "redirect"
+        assert table.match("GET", "/api/v1/urls/abc123/info").name == "redirect"
+        assert table.match("GET", "/api/v1/urls/7/analytics").name == "analytics"
+        assert table.match("DELETE", "/api/v1/urls/7").name == "default"
+    
+    def test_custom_api_key_policy(self):
+        """Test configured policies take precedence for their API key only"""
+        custom = [{
+            "name": "partner", "path": "^/api/v1/urls/?$",
+            "methods": ["post"], "limit": 1000, "api_key": "secret"
+        }]
+        with patch("app.core.rate_limiter.settings.rate_limit_policies", custom):
+            table = default_policy_table()
+        
+        assert table.match("POST", "/api/v1/urls/", "secret").name == "partner"
+        assert table.match("POST", "/api/v1/urls/", "other").name == "create"
+        assert table.match("POST", "/api/v1/urls/").name == "create"
+    
+    def test_rate_limit_key(self):
+        """Test API key policies key by a hash of the key, others by IP"""
+        by_ip = RateLimitPolicy("ping", r"^/ping$", limit=5)
+        by_key = RateLimitPolicy("partner", r"^/ping$", limit=1000, api_key="secret")
+        
+        assert rate_limit_key(by_ip, "1.2.3.4", "secret") == "rate_limit:gcra:ping:1.2.3.4"
+        key = rate_limit_key(by_key, "1.2.3.4", "secret")
+        assert key.startswith("rate_limit:gcra:partner:key:")
+        assert "secret" not in key
\ No newline at end of file
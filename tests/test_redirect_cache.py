@@ -0,0 +1,138 @@
+import os
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.cache.redirect_cache import (
+    RENEW_SCRIPT, SET_SCRIPT, AsyncRedirectCache, RedirectCache, pack_entry, unpack_entry
+)
+from app.db.redis_client import AsyncRedisClient
+
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL")
+
+requires_redis = pytest.mark.skipif(
+    not TEST_REDIS_URL, reason="TEST_REDIS_URL is not set"
+)
+
+
+class TestRedirectCache:
+    def test_entry_deadline(self):
+        """Test bucketed values carry their deadline and read as misses after it"""
+        data = pack_entry(b"record", 60, now=1000.0)
+        
+        assert unpack_entry(data, now=1000.5) == (b"record", 59500)
+        assert unpack_entry(data, now=1060.0) == (None, -2)
+        assert unpack_entry(None, now=1000.0) == (None, -2)
+        assert unpack_entry(pack_entry("-", 60, now=1000.0), now=1000.0)[0] == b"-"
+    
+    def test_unknown_layout(self):
+        with pytest.raises(ValueError):
+            RedirectCache(Mock(), layout="sharded")
+    
+    def test_keys_layout(self):
+        """Test the default layout keeps one key per code"""
+        redis_client = Mock()
+        cache = RedirectCache(redis_client)
+        
+        cache.get("abc")
+        cache.set("abc", b"record", 300)
+        cache.delete("abc")
+        
+        redis_client.get_bytes.assert_called_once_with("url:abc")
+        redis_client.set.assert_called_once_with("url:abc", b"record", ex=300)
+        redis_client.delete.assert_called_once_with("url:abc")
+    
+    def test_bucket_keys(self):
+        """Test codes spread over a fixed set of buckets, stably"""
+        cache = RedirectCache(Mock(), layout="buckets", buckets=16)
+        keys = {cache.key(f"code{num}") for num in range(1000)}
+        
+        assert keys == {f"urlb:{bucket}" for bucket in range(16)}
+        assert cache.key("abc") == RedirectCache(Mock(), layout="buckets", buckets=16).key("abc")
+    
+    def test_buckets_layout(self):
+        """Test bucketed writes go through the sweeping script with a deadline"""
+        redis_client = Mock()
+        cache = RedirectCache(redis_client, layout="buckets", buckets=16, max_ttl=86400)
+        script = redis_client.redis_client.register_script.return_value
+        key = cache.key("abc")
+        
+        with patch("app.cache.redirect_cache.time.time", return_value=1000.0):
+            cache.set("abc", b"record", 300)
+            redis_client.hget_bytes.return_value = script.call_args.kwargs["args"][1]
+            assert cache.get("abc") == b"record"
+        with patch("app.cache.redirect_cache.time.time", return_value=1300.0):
+            assert cache.get("abc") is None
+        cache.delete("abc")
+        
+        script.assert_called_once_with(keys=[key], args=["abc", pack_entry(b"record", 300, 1000.0), 1000, 86400])
+        redis_client.hget_bytes.assert_called_with(key, "abc")
+        redis_client.hdel.assert_called_once_with(key, "abc")
+        redis_client.set.assert_not_called()
+    
+    def test_set_many_pipelines(self):
+        redis_client = Mock()
+        cache = RedirectCache(redis_client, layout="buckets", buckets=16)
+        script = redis_client.redis_client.register_script.return_value
+        
+        cache.set_many([("abc", b"a", 300), ("def", b"b", 600)])
+        
+        pipe = redis_client.pipeline.return_value
+        assert [call.kwargs["client"] for call in script.call_args_list] == [pipe, pipe]
+        pipe.execute.assert_called_once()
+
+
+class TestAsyncRedirectCache:
+    @pytest.mark.asyncio
+    async def test_buckets_layout(self):
+        """Test TTLs come from the stored deadline and renewals rewrite the entry if unchanged"""
+        redis_client = Mock()
+        redis_client.hget_bytes = AsyncMock(return_value=pack_entry(b"record", 300, now=1000.0))
+        scripts = {SET_SCRIPT: AsyncMock(), RENEW_SCRIPT: AsyncMock()}
+        redis_client.redis_client.register_script.side_effect = scripts.get
+        cache = AsyncRedirectCache(redis_client, layout="buckets", buckets=16, max_ttl=86400)
+        
+        with patch("app.cache.redirect_cache.time.time", return_value=1100.0):
+            assert await cache.get_with_ttl("abc") == (b"record", 200000)
+            await cache.renew("abc", b"record", 600)
+        
+        scripts[RENEW_SCRIPT].assert_awaited_once_with(
+            keys=[cache.key("abc")], args=["abc", b"record", pack_entry(b"record", 600, 1100.0), 86400]
+        )
+        scripts[SET_SCRIPT].assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_keys_layout_renews_with_expire(self):
+        redis_client = Mock()
+        redis_client.expire = AsyncMock()
+        cache = AsyncRedirectCache(redis_client)
+        
+        await cache.renew("abc", b"record", 600)
+        
+        redis_client.expire.assert_awaited_once_with("url:abc", 600)
+    
+    @requires_redis
+    @pytest.mark.asyncio
+    async def test_renew_skips_deleted_and_updated_entries(self):
+        """Test a renewal racing a delete or update doesn't write back the stale value"""
+        with patch("app.db.redis_client.settings.redis_url", TEST_REDIS_URL):
+            redis_client = AsyncRedisClient()
+        cache = AsyncRedirectCache(
+            redis_client, layout="buckets", buckets=16, key_prefix="test:redirect_cache"
+        )
+        try:
+            await cache.set("abc", b"old", 60)
+            stale, _ = await cache.get_with_ttl("abc")
+            await cache.delete("abc")
+            await cache.renew("abc", stale, 600)
+            assert await cache.get("abc") is None
+            
+            await cache.set("abc", b"old", 60)
+            stale, _ = await cache.get_with_ttl("abc")
+            await cache.set("abc", b"new", 60)
+            await cache.renew("abc", stale, 600)
+            assert await cache.get_with_ttl("abc") == (b"new", pytest.approx(60000, abs=2000))
+            
+            await cache.renew("abc", b"new", 600)
+            assert (await cache.get_with_ttl("abc"))[1] > 60000
+        finally:
+            await redis_client.redis_client.delete(cache.key("abc"))
+            await redis_client.redis_client.aclose()
\ No newline at end of file
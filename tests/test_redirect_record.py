@@ -0,0 +1,41 @@
+import json
+from datetime import datetime
+from app.cache.redirect_record import (
+    NOT_FOUND_BYTES, RECORD_VERSION, RedirectRecord, decode_record, encode_record
+)
+from app.models.url import URL
+
+
+class TestRedirectRecord:
+    def test_round_trip(self):
+        """Test records with and without an expiry survive encoding"""
+        records = [
+            RedirectRecord(1, "abc", "https://example.com", True, None),
+            RedirectRecord(2**40, "def", "https://example.com/ünïcode?q=1", False, datetime(2030, 1, 1, 12, 30, 0, 123456)),
+            RedirectRecord(3, "ghi", "https://example.com", True, datetime(1969, 12, 31)),
+        ]
+        for record in records:
+            assert decode_record(record.short_code, encode_record(record)) == record
+    
+    def test_encodes_url_model(self):
+        url = URL(id=7, short_code="abc", original_url="https://example.com", is_active=True, title="Ignored")
+        
+        assert decode_record("abc", encode_record(url)) == RedirectRecord(7, "abc", "https://example.com", True, None)
+    
+    def test_compact(self):
+        """Test the entry is the header plus the target URL"""
+        payload = encode_record(RedirectRecord(1, "abc", "https://example.com", True, None))
+        
+        assert payload[0] == RECORD_VERSION
+        assert len(payload) == 10 + len("https://example.com")
+    
+    def test_other_formats_are_not_records(self):
+        """Test legacy JSON, the miss sentinel and damaged entries decode as None"""
+        payload = encode_record(RedirectRecord(1, "abc", "https://example.com", True, datetime(2030, 1, 1)))
+        
+        assert decode_record("abc", json.dumps({"id": 1}).encode()) is None
+        assert decode_record("abc", NOT_FOUND_BYTES) is None
+        assert decode_record("abc", b"") is None
+        assert decode_record("abc", bytes([RECORD_VERSION + 1]) + payload[1:]) is None
+        assert decode_record("abc", payload[:12]) is None
+        assert decode_record("abc", payload[:18] + b"\xff") is None
\ No newline at end of file
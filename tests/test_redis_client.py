@@ -0,0 +1,50 @@
+import os
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.db.redis_client import AsyncRedisClient
+
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL")
+
+requires_redis = pytest.mark.skipif(
+    not TEST_REDIS_URL, reason="TEST_REDIS_URL is not set"
+)
+
+
+class TestAsyncRedisClient:
+    @pytest.mark.asyncio
+    async def test_memory_stats_one_round_trip(self):
+        """Test both INFO sections share a pipeline and are reused briefly"""
+        redis_client = AsyncRedisClient()
+        redis_client.redis_client = Mock()
+        pipe = redis_client.redis_client.pipeline.return_value
+        pipe.execute = AsyncMock(return_value=[
+            {"used_memory": 1024, "maxmemory": 4096, "maxmemory_policy": "allkeys-lru"},
+            {"keyspace_hits": 3, "keyspace_misses": 1, "expired_keys": 5, "evicted_keys": 0}
+        ])
+        
+        stats = await redis_client.memory_stats()
+        
+        assert stats["keyspace_hit_ratio"] == 0.75
+        assert stats["maxmemory_policy"] == "allkeys-lru"
+        assert [c.args for c in pipe.info.call_args_list] == [("memory",), ("stats",)]
+        assert await redis_client.memory_stats() == stats
+        pipe.execute.assert_awaited_once()
+        
+        # Refreshed once stale
+        with patch("app.db.redis_client.MEMORY_STATS_TTL", 0):
+            await redis_client.memory_stats()
+        assert pipe.execute.await_count == 2
+    
+    @requires_redis
+    @pytest.mark.asyncio
+    async def test_memory_stats(self):
+        """Test the pipelined INFO replies are parsed"""
+        with patch("app.db.redis_client.settings.redis_url", TEST_REDIS_URL):
+            redis_client = AsyncRedisClient()
+        try:
+            stats = await redis_client.memory_stats()
+        finally:
+            await redis_client.redis_client.aclose()
+        
+        assert stats["used_memory"] > 0
+        assert 0.0 <= stats["keyspace_hit_ratio"] <= 1.0
\ No newline at end of file
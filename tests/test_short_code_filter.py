@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import Mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.cache.short_code_filter import ShortCodeFilter, filter_size
+from app.db.database import Base
+from app.models.url import URL
+
+
+@pytest.fixture
+def redis_client():
+    redis_client = Mock()
+    redis_client.redis_client.set.return_value = True
+    return redis_client
+
+
+@pytest.fixture
+def short_code_filter(redis_client):
+    return ShortCodeFilter(redis_client, capacity=1000, error_rate=0.01)
+
+
+class TestShortCodeFilter:
+    def test_filter_size(self):
+        """Test the standard Bloom filter sizing"""
+        assert filter_size(1000, 0.01) == (9586, 7)
+        assert filter_size(10 ** 12, 0.01)[0] == 2 ** 32
+    
+    def test_key_encodes_geometry(self, short_code_filter):
+        assert short_code_filter.key == "shortcodes:bloom:9586:7"
+    
+    def test_offsets(self, short_code_filter):
+        offsets = short_code_filter.offsets("abc123")
+        
+        assert offsets == short_code_filter.offsets("abc123")
+        assert len(offsets) == 7
+        assert all(0 <= offset < short_code_filter.bits for offset in offsets)
+        assert offsets != short_code_filter.offsets("abc124")
+    
+    def test_contains_commands(self, short_code_filter):
+        """Test a check is an EXISTS and one BITFIELD with a GET per hash"""
+        pipe = Mock()
+        short_code_filter.contains_commands(pipe, "abc123")
+        
+        pipe.exists.assert_called_once_with(short_code_filter.key)
+        args = pipe.execute_command.call_args.args
+        assert args[:2] == ("BITFIELD", short_code_filter.key)
+        assert len(args) == 2 + 3 * 7
+    
+    def test_contains_result(self, short_code_filter):
+        assert short_code_filter.contains_result(1, [1] * 7) == True
+        assert short_code_filter.contains_result(1, [1] * 6 + [0]) == False
+        # Not built yet: everything may exist
+        assert short_code_filter.contains_result(0, [0] * 7) == True
+        assert short_code_filter.stats()["rejected"] == 1
+        assert short_code_filter.stats()["unavailable"] == 1
+    
+    def test_might_contain_many(self, short_code_filter, redis_client):
+        redis_client.pipeline.return_value.execute.return_value = [1, [1] * 7, 1, [0] * 7]
+        
+        assert short_code_filter.might_contain_many(["a", "b"]) == [True, False]
+    
+    def test_add_writes_live_and_staging_filters(self, short_code_filter):
+        short_code_filter._add_script = Mock()
+        
+        short_code_filter.add(["a", "b"])
+        
+        kwargs = short_code_filter._add_script.call_args.kwargs
+        assert kwargs["keys"] == [short_code_filter.key, short_code_filter.staging_key]
+        assert kwargs["args"] == short_code_filter.offsets("a") + short_code_filter.offsets("b")
+    
+    def test_rebuild(self, short_code_filter, redis_client):
+        """Test a rebuild fills a staging filter from live URLs and swaps it in"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        for index in range(25):
+            db.add(URL(original_url="https://example.com", short_code=f"code{index}"))
+        db.commit()
+        short_code_filter._add_script = Mock()
+        
+        assert short_code_filter.rebuild(db, batch_size=10) == 25
+        
+        assert short_code_filter._add_script.call_count == 3
+        for call in short_code_filter._add_script.call_args_list:
+            assert call.kwargs["keys"] == [short_code_filter.staging_key]
+        redis_client.redis_client.setbit.assert_called_once_with(
+            short_code_filter.staging_key, short_code_filter.bits - 1, 0
+        )
+        redis_client.redis_client.rename.assert_called_once_with(
+            short_code_filter.staging_key, short_code_filter.key
+        )
+        redis_client.delete.assert_called_with(short_code_filter.lock_key)
+    
+    def test_rebuild_in_progress(self, short_code_filter, redis_client):
+        redis_client.redis_client.set.return_value = None
+        
+        assert short_code_filter.rebuild(Mock()) is None
+        redis_client.redis_client.rename.assert_not_called()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.cache.stampede import StampedeGuard
+
+
+class TestStampedeGuard:
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_coalesce(self):
+        """Test concurrent callers for one key share a single load"""
+        guard = StampedeGuard()
+        calls = 0
+        
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+        
+        results = await asyncio.gather(*(guard.do("abc", load) for _ in range(10)))
+        
+        assert results == ["value"] * 10
+        assert calls == 1
+        assert guard.coalesced == 9
+        assert guard.stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_different_keys_load_separately(self):
+        guard = StampedeGuard()
+        load = AsyncMock(return_value="value")
+        
+        await asyncio.gather(guard.do("a", load), guard.do("b", load))
+        
+        assert load.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_load_error_reaches_every_caller(self):
+        """Test a failed load raises in all waiting callers and isn't cached"""
+        guard = StampedeGuard()
+        
+        async def load():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database down")
+        
+        results = await asyncio.gather(*(guard.do("abc", load) for _ in range(3)), return_exceptions=True)
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await guard.do("abc", AsyncMock(return_value="value")) == "value"
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_loader_hands_over(self):
+        """Test a follower takes over when the loading request is cancelled"""
+        guard = StampedeGuard()
+        started = asyncio.Event()
+        
+        async def hanging_load():
+            started.set()
+            await asyncio.sleep(10)
+        
+        leader = asyncio.create_task(guard.do("abc", hanging_load))
+        await started.wait()
+        follower = asyncio.create_task(guard.do("abc", AsyncMock(return_value="value")))
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        assert await follower == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+    
+    @pytest.mark.asyncio
+    async def test_wait_for_times_out(self):
+        guard = StampedeGuard(lock_wait=0.05, lock_poll_interval=0.01)
+        
+        assert await guard.wait_for(AsyncMock(return_value=None)) is None
+        assert await guard.wait_for(AsyncMock(return_value="value")) == "value"
+        assert guard.lock_waits == 2
+        assert guard.lock_wait_timeouts == 1
+    
+    def test_early_refresh_probability(self):
+        """Test early refreshes grow likelier as the TTL runs out"""
+        guard = StampedeGuard(early_refresh_beta=1.0)
+        guard.load_seconds = 0.1
+        
+        def refresh_rate(ttl_seconds):
+            return sum(guard.should_refresh_early(ttl_seconds) for _ in range(10000)) / 10000
+        
+        # P(refresh) = exp(-ttl / (load_seconds * beta))
+        assert refresh_rate(10.0) == 0
+        assert 0.30 < refresh_rate(0.1) < 0.44
+        assert refresh_rate(0.01) > 0.85
+    
+    def test_early_refresh_disabled(self):
+        guard = StampedeGuard(early_refresh_beta=0)
+        
+        with patch("app.cache.stampede.random.random", return_value=0.9999):
+            assert not guard.should_refresh_early(0.001)
+    
+    def test_record_load_average(self):
+        guard = StampedeGuard()
+        guard.load_seconds = 0.0
+        
+        guard.record_load(1.0)
+        
+        assert guard.load_seconds == pytest.approx(0.1)
+        assert guard.loads == 1
\ No newline at end of file
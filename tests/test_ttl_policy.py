@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app.cache.redirect_record import NOT_FOUND_BYTES
+from app.cache.ttl_policy import CacheTTLPolicy
+
+
+class TestCacheTTLPolicy:
+    def test_ttl_grows_with_hits(self):
+        """Test each recent hit adds min_ttl seconds, up to max_ttl"""
+        policy = CacheTTLPolicy(min_ttl=300, max_ttl=3600)
+        
+        assert policy.ttl_for("cold") == 300
+        for _ in range(3):
+            policy.record_hit("warm")
+        assert policy.ttl_for("warm") == 1200
+        for _ in range(100):
+            policy.record_hit("hot")
+        assert policy.ttl_for("hot") == 3600
+    
+    def test_ttl_capped_at_expiry(self):
+        policy = CacheTTLPolicy(min_ttl=300, max_ttl=3600)
+        
+        assert policy.ttl_for("abc", datetime.utcnow() + timedelta(seconds=90)) <= 90
+        assert policy.ttl_for("abc", datetime.utcnow() + timedelta(days=1)) == 300
+        # Expired links are cached briefly to answer 410s
+        assert policy.ttl_for("abc", datetime.utcnow() - timedelta(days=1)) == 300
+    
+    def test_hits_expire_with_windows(self):
+        """Test hits count for one to two windows, then age out"""
+        policy = CacheTTLPolicy(hit_window=60)
+        
+        with patch("app.cache.ttl_policy.time.monotonic", return_value=policy._window_start + 1):
+            policy.record_hit("abc")
+        with patch("app.cache.ttl_policy.time.monotonic", return_value=policy._window_start + 61):
+            assert policy.recent_hits("abc") == 1
+        with patch("app.cache.ttl_policy.time.monotonic", return_value=policy._window_start + 121):
+            assert policy.recent_hits("abc") == 0
+    
+    def test_tracked_codes_bounded(self):
+        policy = CacheTTLPolicy(max_tracked=2)
+        
+        for short_code in ["a", "b", "c", "a"]:
+            policy.record_hit(short_code)
+        
+        assert policy.recent_hits("a") == 2
+        assert policy.recent_hits("c") == 0
+        assert policy.untracked == 1
+    
+    def test_renewal(self):
+        """Test only hot entries past half their TTL are renewed"""
+        policy = CacheTTLPolicy(min_ttl=300, max_ttl=3600, renew_hits=10)
+        for _ in range(5):
+            policy.record_hit("warm")
+        for _ in range(20):
+            policy.record_hit("hot")
+        
+        assert policy.renewal_ttl("warm", 10) is None
+        assert policy.renewal_ttl("hot", 3000) is None
+        assert policy.renewal_ttl("hot", 10) == 3600
+        assert policy.renewal_ttl("hot", 5, datetime.utcnow() + timedelta(seconds=20)) == 20
+        assert policy.renewals == 2
+    
+    def test_stats(self):
+        policy = CacheTTLPolicy()
+        
+        policy.record_lookup("abc", b"\x01")
+        policy.record_lookup("nope", NOT_FOUND_BYTES)
+        policy.record_lookup("def", None)
+        policy.record_lookup("abc", b"\x01")
+        
+        stats = policy.stats()
+        assert stats["hits"] == 2
+        assert stats["negative_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(0.75)
+        assert policy.recent_hits("abc") == 2
\ No newline at end of file
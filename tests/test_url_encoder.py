@@ -1,5 +1,6 @@
 import pytest
-from app.utils.url_encoder import URLEncoder, generate_short_code, validate_url
+from unittest.mock import patch
+from app.utils.url_encoder import URLEncoder, FeistelPermutation, generate_short_code, validate_url
 
 
 class TestURLEncoder:
@@ -27,6 +28,32 @@ class TestURLEncoder:
         with pytest.raises(ValueError):
             URLEncoder.decode("test#")
     
+    def test_encode_fixed_width(self):
+        """Test fixed-width output is left-padded"""
+        assert URLEncoder.encode(1, width=6) == "000001"
+        assert URLEncoder.decode("000001") == 1
+        assert URLEncoder.encode(62**6, width=6) == "1000000"  # Never truncated
+    
+    def test_encode_negative(self):
+        """Test negative numbers are rejected"""
+        with pytest.raises(ValueError):
+            URLEncoder.encode(-1)
+    
+    def test_encode_decode_many(self):
+        """Test batch encoding matches single-item encoding"""
+        nums = list(range(0, 200000, 7)) + [62**8 + 12345]
+        
+        codes = URLEncoder.encode_many(nums)
+        
+        assert codes == [URLEncoder.encode(num) for num in nums]
+        assert URLEncoder.decode_many(codes) == nums
+        assert URLEncoder.encode_many([1, 62], width=3) == ["001", "010"]
+    
+    def test_decode_many_invalid(self):
+        """Test batch decoding rejects invalid characters"""
+        with pytest.raises(ValueError):
+            URLEncoder.decode_many(["abc", "ab#"])
+    
     def test_is_valid_custom_alias(self):
         """Test custom alias validation"""
         assert URLEncoder.is_valid_custom_alias("abc123") == True
@@ -40,6 +67,50 @@ class TestURLEncoder:
         assert URLEncoder.is_valid_custom_alias("") == True  # Empty is valid
 
 
+class TestFeistelPermutation:
+    @pytest.fixture
+    def permutation(self):
+        return FeistelPermutation(b"test-secret", bits=34)
+    
+    def test_round_trip(self, permutation):
+        """Test permuted codes decode back to the original ID"""
+        for num in [0, 1, 62, 1000, 123456789, 2**34 - 1]:
+            encoded = URLEncoder.encode(num, permutation=permutation)
+            assert URLEncoder.decode(encoded, permutation=permutation) == num
+    
+    def test_fixed_length(self, permutation):
+        """Test permuted codes always have the same length"""
+        assert permutation.code_length == 6
+        for num in [0, 1, 2**34 - 1]:
+            assert len(URLEncoder.encode(num, permutation=permutation)) == 6
+    
+    def test_bijective(self):
+        """Test the permutation never maps two IDs to the same value"""
+        permutation = FeistelPermutation(b"test-secret", bits=16)
+        values = {permutation.permute(num) for num in range(2**16)}
+        assert values == set(range(2**16))
+    
+    def test_non_sequential(self, permutation):
+        """Test consecutive IDs don't produce consecutive codes"""
+        values = [permutation.permute(num) for num in range(1, 10)]
+        assert values != sorted(values)
+    
+    def test_key_changes_codes(self):
+        """Test different secrets give different codes"""
+        a = FeistelPermutation(b"secret-a")
+        b = FeistelPermutation(b"secret-b")
+        assert a.permute(12345) != b.permute(12345)
+    
+    def test_out_of_range(self, permutation):
+        """Test IDs outside the bit width are rejected"""
+        with pytest.raises(ValueError):
+            permutation.permute(2**34)
+        with pytest.raises(ValueError):
+            URLEncoder.decode("abc", permutation=permutation)
+        with pytest.raises(ValueError):
+            URLEncoder.decode("ZZZZZZ", permutation=permutation)
+
+
 class TestGenerateShortCode:
     def test_generate_short_code(self):
         """Test short code generation"""
@@ -47,6 +118,14 @@ class TestGenerateShortCode:
         assert generate_short_code(1) == "1"
         assert generate_short_code(61) == "Z"
         assert generate_short_code(62) == "10"
+    
+    def test_generate_permuted_short_code(self):
+        """Test permuted short code generation"""
+        with patch("app.utils.url_encoder.settings.short_code_mode", "permuted"):
+            codes = [generate_short_code(num) for num in range(1, 100)]
+        
+        assert len(set(codes)) == len(codes)
+        assert all(len(code) == 6 for code in codes)
 
 
 class TestValidateURL:
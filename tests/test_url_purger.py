@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base
+from app.models.url import URL, URLClick, URLClickRollup
+from app.services.analytics_service import AnalyticsService
+from app.services.url_purger import URLPurger
+from app.services.url_service import URLService
+
+
+class TestURLPurger:
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        return engine
+    
+    @pytest.fixture
+    def db(self, engine):
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+    
+    @pytest.fixture
+    def urls(self, db):
+        now = datetime.utcnow()
+        for url_id in (1, 2):
+            db.add(URL(id=url_id, original_url="https://example.com", short_code=f"code{url_id}"))
+            for minute in range(25):
+                db.add(URLClick(url_id=url_id, ip_address="10.0.0.1", clicked_at=now - timedelta(minutes=minute)))
+        db.commit()
+        AnalyticsService(db).rollup_pending(settle_seconds=0)
+    
+    def soft_delete(self, db, url_id, ago=timedelta(hours=2)):
+        url_service = URLService(db, Mock())
+        assert url_service.delete_url(url_id)
+        db.query(URL).filter(URL.id == url_id).update({URL.deleted_at: datetime.utcnow() - ago})
+        db.commit()
+    
+    def test_delete_hides_url_without_loading_clicks(self, db, urls):
+        loaded = []
+        event.listen(db, "loaded_as_persistent", lambda session, instance: loaded.append(type(instance)))
+        
+        self.soft_delete(db, 1)
+        
+        assert URLClick not in loaded
+        assert URLService(db, Mock()).get_url_by_id(1) is None
+        assert db.query(URLClick).filter(URLClick.url_id == 1).count() == 25
+    
+    def test_purge_in_chunks(self, db, engine, urls):
+        """Test clicks and rollups go in bounded set-based deletes, then the URL"""
+        self.soft_delete(db, 1)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        
+        assert URLPurger(db, chunk_size=10).purge_pending() == 1
+        
+        click_deletes = [s for s in statements if s.startswith("DELETE FROM url_clicks")]
+        assert len(click_deletes) == 3
+        assert db.get(URL, 1) is None
+        assert db.query(URLClick).filter(URLClick.url_id == 1).count() == 0
+        assert db.query(URLClickRollup).filter(URLClickRollup.url_id == 1).count() == 0
+        # Other URLs are untouched
+        assert db.query(URLClick).filter(URLClick.url_id == 2).count() == 25
+        assert db.query(URLClickRollup).filter(URLClickRollup.url_id == 2).count() > 0
+    
+    def test_grace_period(self, db, urls):
+        """Test recently deleted URLs wait so in-flight clicks can land"""
+        self.soft_delete(db, 1, ago=timedelta(minutes=5))
+        
+        assert URLPurger(db, grace_seconds=3600).purge_pending() == 0
+        assert URLPurger(db, grace_seconds=60).purge_pending() == 1
+    
+    def test_never_purges_live_urls(self, db, urls):
+        URLPurger(db).purge_url(2)
+        
+        assert db.get(URL, 2) is not None
+    
+    def test_clears_redis_counters(self, db, urls):
+        redis_client = Mock()
+        self.soft_delete(db, 1)
+        
+        with patch("app.services.unique_visitors.settings.unique_visitor_counting", "hll"):
+            URLPurger(db, redis_client).purge_pending()
+        
+        pipe = redis_client.pipeline.return_value
+        pipe.delete.assert_any_call("clicks:1")
+        pipe.delete.assert_any_call("hll:1")
+        pipe.execute.assert_called_once()
+    
+    def test_deleted_short_code_is_reusable(self, db, urls):
+        self.soft_delete(db, 1)
+        
+        db.add(URL(original_url="https://example.org", short_code="code1", custom_alias="code1"))
+        db.commit()
+        
+        db.add(URL(original_url="https://example.org", short_code="code1"))
+        with pytest.raises(IntegrityError):
+            db.commit()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import re
+import pytest
+from pydantic import ValidationError
+from app.core.security_middleware import SecurityMiddleware
+from app.core.url_scanner import URLScanner, compile_literals, normalize_domain
+from app.schemas.url import URLCreate
+
+
+def write_blocklist(path, lines):
+    path.write_text("\n".join(lines))
+    return str(path)
+
+
+class TestCompileLiterals:
+    def test_matches_like_separate_searches(self):
+        """Test the combined pattern agrees with searching each pattern"""
+        patterns = SecurityMiddleware.MALICIOUS_PATTERNS
+        compiled = compile_literals(patterns)
+        samples = [
+            "https://example.com/path?q=1",
+            "https://example.com/?x=<SCRIPT>alert(1)</script>",
+            "javascript:alert(1)",
+            "https://example.com/#<svg onload=alert(1)>",
+            "https://example.com/<sel",
+            "https://example.com/<select",
+            "https://example.com/metadata:x",
+            "https://example.com/<wb",
+        ]
+        for sample in samples:
+            expected = any(re.search(p, sample, re.IGNORECASE) for p in patterns)
+            assert bool(compiled.search(sample)) == expected, sample
+    
+    def test_empty(self):
+        """Test an empty pattern list matches nothing"""
+        assert compile_literals([]).search("anything") is None
+
+
+class TestURLScanner:
+    def test_clean_url(self):
+        scanner = URLScanner()
+        
+        assert scanner.scan("https://example.com/page?id=1") is None
+    
+    def test_malicious_pattern(self):
+        scanner = URLScanner()
+        
+        assert scanner.scan("https://example.com/?q=<IFRAME src=x>") == "contains '<iframe'"
+    
+    def test_blocked_host_and_subdomains(self):
+        """Test listed domains block their subdomains but not lookalikes"""
+        scanner = URLScanner(blocked_domains=["evil.example", "localhost"])
+        
+        assert scanner.scan("http://localhost:8000/") == "domain 'localhost' is blocked"
+        assert scanner.scan("https://evil.example/x") == "domain 'evil.example' is blocked"
+        assert scanner.scan("https://a.b.EVIL.example./x") == "domain 'evil.example' is blocked"
+        assert scanner.scan("https://notevil.example/x") is None
+        assert scanner.scan("https://example.com/?next=evil.example") is None
+    
+    def test_normalize_domain(self):
+        assert normalize_domain("0.0.0.0 Ads.Example.com  # tracker") == "ads.example.com"
+        assert normalize_domain("*.evil.example.") == "evil.example"
+        assert normalize_domain("# comment") is None
+        assert normalize_domain("   ") is None
+    
+    def test_blocklist_file_and_reload(self, tmp_path):
+        """Test the blocklist file is loaded and swapped in when it changes"""
+        path = write_blocklist(tmp_path / "blocklist.txt", ["# malware", "bad.example"])
+        scanner = URLScanner(blocklist_path=path)
+        
+        assert not scanner.is_safe("https://www.bad.example/")
+        assert not scanner.is_safe("http://127.0.0.1/")
+        assert scanner.reload_if_changed() is False
+        
+        write_blocklist(tmp_path / "blocklist.txt", ["worse.example"])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        assert scanner.reload_if_changed() is True
+        assert scanner.is_safe("https://www.bad.example/")
+        assert not scanner.is_safe("https://worse.example/")
+        assert scanner.stats()["reloads"] == 2
+    
+    def test_missing_blocklist_keeps_builtins(self, tmp_path):
+        """Test a missing file doesn't prevent startup"""
+        scanner = URLScanner(blocklist_path=str(tmp_path / "missing.txt"))
+        
+        assert not scanner.is_safe("http://localhost/")
+        assert scanner.stats()["reload_errors"] == 1
+
+
+class TestURLCreateValidation:
+    def test_rejects_unsafe_url(self):
+        with pytest.raises(ValidationError) as exc_info:
+            URLCreate(original_url="https://example.com/?q=<script>")
+        
+        assert "URL is not allowed" in str(exc_info.value)
+    
+    def test_security_middleware_validate_url(self):
+        assert SecurityMiddleware.validate_url("https://example.com/")
+        assert not SecurityMiddleware.validate_url("ftp://example.com/")
+        assert not SecurityMiddleware.validate_url("http://localhost/admin")
\ No newline at end of file
@@ -1,9 +1,13 @@
 import pytest
 from unittest.mock import Mock, patch
+from sqlalchemy.dialects import postgresql
 from datetime import datetime, timedelta
 from app.services.url_service import URLService
 from app.schemas.url import URLCreate, URLUpdate, URLClickCreate
 from app.models.url import URL, URLClick, Counter
+from app.cache.local import LocalCache
+from app.cache.short_code_filter import NOT_FOUND
+from app.core.config import settings
 
 
 class TestURLService:
@@ -52,14 +56,14 @@ class TestURLService:
         mock_db.add.assert_called_once()
         mock_db.commit.assert_called_once()
     
-    def test_create_url_without_custom_alias(self, url_service, mock_db):
+    def test_create_url_without_custom_alias(self, mock_db, mock_redis):
         """Test creating URL without custom alias"""
         url_data = URLCreate(original_url="https://example.com")
         
-        # Mock counter
-        mock_counter = Mock()
-        mock_counter.value = 0
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_counter
+        # Mock ID allocator
+        mock_allocator = Mock()
+        mock_allocator.next_id.return_value = 1
+        url_service = URLService(mock_db, mock_redis, id_allocator=mock_allocator)
         mock_db.add = Mock()
         mock_db.commit = Mock()
         mock_db.refresh = Mock()
@@ -70,49 +74,140 @@ class TestURLService:
         mock_url.short_code = "1"
         mock_url.original_url = "https://example.com"
         mock_url.custom_alias = None
+        mock_url.is_active = True
+        mock_url.expires_at = None
         
-        with patch('app.services.url_service.URL', return_value=mock_url):
+        with patch('app.services.url_service.URL', return_value=mock_url) as mock_url_class:
             result = url_service.create_url(url_data)
         
         assert result.short_code == "1"
-        assert mock_counter.value == 1  # Counter should be incremented
+        assert mock_url_class.call_args[1]["short_code"] == "1"
+        mock_allocator.next_id.assert_called_once()  # No counter row round trip
     
-    def test_get_url_by_short_code_with_cache(self, url_service, mock_redis):
-        """Test getting URL from cache"""
-        short_code = "test-code"
-        cached_data = '{"id": 1, "original_url": "https://example.com", "short_code": "test-code"}'
+    def test_create_urls(self, mock_db, mock_redis):
+        """Test bulk creation allocates, inserts and caches in one step each"""
+        mock_allocator = Mock()
+        mock_allocator.allocate.return_value = [1, 2]
+        url_service = URLService(mock_db, mock_redis, id_allocator=mock_allocator)
+        
+        urls_data = [
+            URLCreate(original_url="https://example.com/a"),
+            URLCreate(original_url="https://example.com/b", custom_alias="taken"),
+            URLCreate(original_url="https://example.com/c", custom_alias="fresh"),
+            URLCreate(original_url="https://example.com/d", custom_alias="fresh"),
+            URLCreate(original_url="https://example.com/e"),
+        ]
         
-        mock_redis.get.return_value = cached_data
+        # "taken" already exists
+        existing = Mock()
+        existing.custom_alias = "taken"
+        mock_db.query.return_value.filter.return_value = [existing]
         
-        with patch('app.services.url_service.URL') as mock_url_class:
+        inserted = []
+        for short_code, custom_alias in [("1", None), ("fresh", "fresh"), ("2", None)]:
             mock_url = Mock()
-            mock_url_class.return_value = mock_url
-            
-            result = url_service.get_url_by_short_code(short_code)
+            mock_url.short_code = short_code
+            mock_url.custom_alias = custom_alias
+            mock_url.expires_at = None
+            inserted.append(mock_url)
+        mock_db.scalars.return_value.all.return_value = inserted
+        
+        with patch.object(url_service, "_cache_payload", return_value="{}"):
+            results = url_service.create_urls(urls_data)
         
-        assert result == mock_url
-        mock_redis.get.assert_called_once_with(f"url:{short_code}")
+        assert [url.short_code if url else None for url, _ in results] == ["1", None, "fresh", None, "2"]
+        assert results[1][1] == "Custom alias already exists"
+        assert results[3][1] == "Custom alias already exists"
+        
+        mock_allocator.allocate.assert_called_once_with(2)
+        rows = mock_db.scalars.call_args[0][1]
+        assert [row["short_code"] for row in rows] == ["1", "fresh", "2"]
+        mock_db.commit.assert_called_once()
+        assert mock_redis.pipeline.return_value.set.call_count == 3
+        mock_redis.pipeline.return_value.execute.assert_called_once()
     
-    def test_get_url_by_short_code_from_database(self, url_service, mock_db, mock_redis):
-        """Test getting URL from database when not in cache"""
-        short_code = "test-code"
+    def test_create_urls_conflict(self, url_service, mock_db, mock_redis):
+        """Test aliases taken concurrently fail alone instead of the whole batch"""
+        mock_db.query.return_value.filter.return_value = []
+        mock_url = Mock()
+        mock_url.short_code = "free"
+        mock_url.custom_alias = "free"
+        mock_url.expires_at = None
+        # "raced" lost to a concurrent insert, so ON CONFLICT DO NOTHING skipped it
+        mock_db.scalars.return_value.all.return_value = [mock_url]
         
-        # Mock cache miss
-        mock_redis.get.return_value = None
+        with patch.object(url_service, "_cache_payload", return_value=b"record"):
+            results = url_service.create_urls([
+                URLCreate(original_url="https://example.com/a", custom_alias="raced"),
+                URLCreate(original_url="https://example.com/b", custom_alias="free"),
+            ])
         
-        # Mock database result
+        assert results == [(None, "Custom alias already exists"), (mock_url, None)]
+        assert "ON CONFLICT DO NOTHING" in str(mock_db.scalars.call_args[0][0].compile(dialect=postgresql.dialect()))
+        mock_db.commit.assert_called_once()
+        mock_db.rollback.assert_not_called()
+    
+    def test_create_urls_alias_matches_generated_code(self, mock_db, mock_redis):
+        """Test an alias equal to a generated code in the same batch fails alone"""
+        mock_allocator = Mock()
+        mock_allocator.allocate.return_value = [1]
+        url_service = URLService(mock_db, mock_redis, id_allocator=mock_allocator)
+        mock_db.query.return_value.filter.return_value = []
         mock_url = Mock()
-        mock_url.id = 1
-        mock_url.short_code = short_code
-        mock_url.original_url = "https://example.com"
+        mock_url.short_code = "abc"
+        mock_url.custom_alias = None
+        mock_url.expires_at = None
+        # Both rows use short code "abc"; ON CONFLICT DO NOTHING kept the generated one
+        mock_db.scalars.return_value.all.return_value = [mock_url]
         
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_url
+        with patch.object(url_service, "_cache_payload", return_value=b"record"), \
+                patch("app.services.url_service.generate_short_codes", return_value=["abc"]):
+            results = url_service.create_urls([
+                URLCreate(original_url="https://example.com/a"),
+                URLCreate(original_url="https://example.com/b", custom_alias="abc"),
+            ])
+        
+        assert results == [(mock_url, None), (None, "Custom alias already exists")]
+    
+    def test_create_url_alias_ruled_out_by_filter(self, url_service, mock_db):
+        """Test a new alias skips the existence query and joins the filter"""
+        url_service.short_code_filter = Mock()
+        url_service.short_code_filter.might_contain_many.return_value = [False]
+        
+        with patch.object(url_service, "_cache_url"):
+            url = url_service.create_url(URLCreate(original_url="https://example.com", custom_alias="fresh"))
         
-        result = url_service.get_url_by_short_code(short_code)
+        mock_db.query.assert_not_called()
+        url_service.short_code_filter.add.assert_called_once_with([url.short_code])
+    
+    def test_get_url_analytics_uses_replica(self, mock_db, mock_redis):
+        """Test analytics queries run on the replica"""
+        read_db = Mock()
+        url_service = URLService(mock_db, mock_redis, read_db=read_db)
+        
+        with patch("app.services.url_service.AnalyticsService") as analytics:
+            analytics.return_value.get_url_analytics.return_value = {"total_clicks": 3}
+            assert url_service.get_url_analytics(1) == {"total_clicks": 3}
         
-        assert result == mock_url
-        mock_redis.get.assert_called_once_with(f"url:{short_code}")
-        mock_db.query.assert_called_once()
+        assert analytics.call_args.args[0] is read_db
+        mock_db.query.assert_not_called()
+    
+    def test_delete_url_invalidates_local_cache(self, mock_db, mock_redis):
+        """Test deleting a URL drops it from the local cache"""
+        local_cache = LocalCache(max_size=10, ttl=60)
+        url_service = URLService(mock_db, mock_redis, local_cache=local_cache)
+        
+        mock_url = Mock()
+        mock_url.short_code = "test-code"
+        local_cache.set("test-code", mock_url)
+        mock_db.query.return_value.filter.return_value.first.return_value = mock_url
+        
+        assert url_service.delete_url(1) == True
+        assert isinstance(mock_url.deleted_at, datetime)
+        mock_db.delete.assert_not_called()
+        assert local_cache.get("test-code") is None
+        mock_redis.set.assert_called_once_with("url:test-code", NOT_FOUND, ex=settings.negative_cache_ttl)
+        mock_redis.publish.assert_called_once_with("url:invalidate", "test-code")
     
     def test_record_click(self, url_service, mock_db, mock_redis):
         """Test recording a click"""
@@ -139,6 +234,26 @@ class TestURLService:
         mock_db.commit.assert_called_once()
         mock_redis.increment.assert_called_once_with(f"clicks:{url_id}")
     
+    def test_record_clicks(self, url_service, mock_db, mock_redis):
+        """Test recording a batch of clicks"""
+        clicks = [
+            (1, URLClickCreate(ip_address="192.168.1.1")),
+            (2, URLClickCreate(ip_address="192.168.1.2")),
+            (1, URLClickCreate(ip_address="192.168.1.3")),
+        ]
+        pipe = mock_redis.pipeline.return_value
+        
+        assert url_service.record_clicks(clicks) == 3
+        
+        mock_db.execute.assert_called_once()
+        rows = mock_db.execute.call_args[0][1]
+        assert [row["url_id"] for row in rows] == [1, 2, 1]
+        assert all(row["clicked_at"] is not None for row in rows)
+        mock_db.commit.assert_called_once()
+        pipe.incrby.assert_any_call("clicks:1", 2)
+        pipe.incrby.assert_any_call("clicks:2", 1)
+        pipe.execute.assert_called_once()
+    
     def test_is_url_expired(self, url_service):
         """Test URL expiration check"""
         # Not expired